@@ -0,0 +1,176 @@
+"""
+Benchmark of `jsonable_encoder` on the payloads of chat completion spans.
+
+Usage:
+    python benchmarks/jsonable_encoder.py [--repeat 200]
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pydantic
+
+from opik import jsonable_encoder
+
+
+class _FunctionCall(pydantic.BaseModel):
+    name: str
+    arguments: str
+
+
+class _ToolCall(pydantic.BaseModel):
+    id: str
+    type: str = "function"
+    function: _FunctionCall
+
+
+class _Message(pydantic.BaseModel):
+    role: str
+    content: Optional[str]
+    tool_calls: Optional[List[_ToolCall]] = None
+
+
+class _Choice(pydantic.BaseModel):
+    index: int
+    message: _Message
+    finish_reason: str
+
+
+class _Usage(pydantic.BaseModel):
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class _ChatCompletion(pydantic.BaseModel):
+    id: str
+    created: int
+    model: str
+    choices: List[_Choice]
+    usage: _Usage
+
+
+def _conversation(turns: int) -> List[Dict[str, Any]]:
+    messages: List[Dict[str, Any]] = [
+        {"role": "system", "content": "You are a helpful assistant. " * 20}
+    ]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question number {i}? " * 10})
+        messages.append(
+            {
+                "role": "assistant",
+                "content": f"Answer number {i}. " * 40,
+                "name": None,
+            }
+        )
+    return messages
+
+
+def _chat_input(turns: int) -> Dict[str, Any]:
+    return {
+        "messages": _conversation(turns),
+        "model": "gpt-4o",
+        "temperature": 0.2,
+        "max_tokens": 512,
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": f"tool_{i}",
+                    "description": "Looks up the data in the knowledge base.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string"},
+                            "limit": {"type": "integer", "default": 10},
+                        },
+                        "required": ["query"],
+                    },
+                },
+            }
+            for i in range(5)
+        ],
+        "metadata": {
+            "created_at": datetime.datetime.now(datetime.timezone.utc),
+            "tags": ("production", "chat"),
+        },
+    }
+
+
+def _chat_output() -> Dict[str, Any]:
+    completion = _ChatCompletion(
+        id="chatcmpl-123",
+        created=1700000000,
+        model="gpt-4o-2024-08-06",
+        choices=[
+            _Choice(
+                index=0,
+                message=_Message(
+                    role="assistant",
+                    content="The answer is 42. " * 30,
+                    tool_calls=[
+                        _ToolCall(
+                            id="call-1",
+                            function=_FunctionCall(
+                                name="tool_1", arguments='{"query": "answer"}'
+                            ),
+                        )
+                    ],
+                ),
+                finish_reason="stop",
+            )
+        ],
+        usage=_Usage(prompt_tokens=1200, completion_tokens=150, total_tokens=1350),
+    )
+    return {"output": completion}
+
+
+def _rag_input(documents: int) -> Dict[str, Any]:
+    return {
+        "query": "What is the refund policy?",
+        "documents": [
+            {
+                "id": f"doc-{i}",
+                "score": 0.9 - i * 0.01,
+                "text": "Lorem ipsum dolor sit amet. " * 50,
+                "metadata": {"source": f"kb/{i}.md", "page": i, "chunk": [i, i + 1]},
+            }
+            for i in range(documents)
+        ],
+    }
+
+
+_PAYLOADS: Dict[str, Callable[[], Any]] = {
+    "chat input, 3 turns": lambda: _chat_input(turns=3),
+    "chat input, 50 turns": lambda: _chat_input(turns=50),
+    "chat completion output": _chat_output,
+    "retrieval input, 20 documents": lambda: _rag_input(documents=20),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    arguments = parser.parse_args()
+
+    for name, create_payload in _PAYLOADS.items():
+        payload = create_payload()
+        jsonable_encoder.jsonable_encoder(payload)  # warm up
+
+        timings = []
+        for _ in range(arguments.repeat):
+            start = time.perf_counter()
+            jsonable_encoder.jsonable_encoder(payload)
+            timings.append((time.perf_counter() - start) * 1e6)
+
+        print(
+            f"{name:<32} {statistics.median(timings):9.1f} us "
+            f"(min {min(timings):.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
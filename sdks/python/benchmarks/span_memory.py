@@ -0,0 +1,88 @@
+"""
+Benchmark of the memory retained and the time spent per span created by `@track`.
+
+A tracked function creates `--spans` child spans. The streamer has no consumers,
+so all the messages stay in the queue, the way they do when the data is produced
+faster than it's sent. The time is measured in a separate run, without
+tracemalloc, which slows down the allocations.
+
+Usage:
+    python benchmarks/span_memory.py [--spans 5000]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from unittest import mock
+
+# local installation, so the client doesn't report the missing API key
+os.environ.setdefault("OPIK_URL_OVERRIDE", "http://localhost:5173/api")
+os.environ.setdefault("OPIK_SENTRY_ENABLE", "false")
+
+import opik  # noqa: E402
+from opik.api_objects import opik_client  # noqa: E402
+from opik.message_processing import (  # noqa: E402
+    message_queue,
+    streamer,
+    streamer_constructors,
+)
+
+
+@opik.track
+def _leaf(x):
+    return x
+
+
+@opik.track
+def _root(spans):
+    for i in range(spans):
+        _leaf(i)
+
+
+def _drain(queue: message_queue.MessageQueue) -> None:
+    while not queue.empty():
+        queue.get()
+        queue.task_done()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--spans", type=int, default=5000)
+    arguments = parser.parse_args()
+
+    queue = message_queue.MessageQueue()
+    streamer_ = streamer.Streamer(
+        message_queue=queue, queue_consumers=[], batch_manager=None
+    )
+
+    with mock.patch.object(
+        streamer_constructors, "construct_online_streamer", return_value=streamer_
+    ):
+        _root(1)  # warm up, creates the cached client
+        _drain(queue)
+
+        start = time.perf_counter()
+        _root(arguments.spans)
+        elapsed = time.perf_counter() - start
+        _drain(queue)
+
+        tracemalloc.start()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        _root(arguments.spans)
+        memory_after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"spans created:   {arguments.spans}")
+        print(f"queued messages: {queue.qsize()}")
+        print(
+            f"memory per span: {(memory_after - memory_before) / arguments.spans:.0f} bytes"
+        )
+        print(f"time per span:   {elapsed / arguments.spans * 1e6:.2f} us")
+
+        _drain(queue)
+        opik_client.get_client_cached().end()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Micro-benchmark of the per-call overhead of the `@track` decorator.
+
+The messages are passed to a message processor which drops them, so the numbers show
+the time spent in the decorator itself (input capture, span creation, context handling
+and putting the messages to the queue), not the time of sending the data.
+
+Usage:
+    python benchmarks/track_overhead.py [--calls 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+from unittest import mock
+
+# local installation, so the client doesn't report the missing API key
+os.environ.setdefault("OPIK_URL_OVERRIDE", "http://localhost:5173/api")
+os.environ.setdefault("OPIK_SENTRY_ENABLE", "false")
+
+import opik  # noqa: E402
+from opik.api_objects import opik_client  # noqa: E402
+from opik.decorator import inspect_helpers  # noqa: E402
+from opik.message_processing import (  # noqa: E402
+    message_processors,
+    messages,
+    streamer_constructors,
+)
+
+
+class _DroppingMessageProcessor(message_processors.BaseMessageProcessor):
+    def process(self, message: messages.BaseMessage) -> None:
+        pass
+
+
+@opik.track
+def _positional(a, b, c):
+    return a
+
+
+@opik.track
+def _with_defaults(a, b=1, *, c=2, d=None):
+    return a
+
+
+@opik.track
+def _var_arguments(a, *args, **kwargs):
+    return a
+
+
+@opik.track
+def _nested_leaf(x):
+    return x
+
+
+@opik.track
+def _nested_root(x):
+    return _nested_leaf(_nested_leaf(x))
+
+
+def _untracked(a, b, c):
+    return a
+
+
+_CASES: Dict[str, Callable[[], object]] = {
+    "untracked function (baseline)": lambda: _untracked(1, 2, c=3),
+    "input capture only": lambda: inspect_helpers.extract_inputs(
+        _untracked, (1, 2), {"c": 3}
+    ),
+    "positional arguments": lambda: _positional(1, 2, c=3),
+    "arguments with defaults": lambda: _with_defaults(1, c=3),
+    "*args and **kwargs": lambda: _var_arguments(1, 2, 3, key="value"),
+    "trace with 3 nested spans": lambda: _nested_root(1),
+}
+
+
+def _measure(case: Callable[[], object], calls: int, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            case()
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+
+    return timings
+
+
+def _print_timings(name: str, timings: List[float]) -> None:
+    print(
+        f"{name:<32} {statistics.median(timings):8.2f} us/call "
+        f"(min {min(timings):.2f})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    streamer = streamer_constructors.construct_streamer(
+        message_processor=_DroppingMessageProcessor(),
+        n_consumers=1,
+        use_batching=True,
+    )
+
+    with mock.patch.object(
+        streamer_constructors, "construct_online_streamer", return_value=streamer
+    ):
+        for name, case in _CASES.items():
+            case()  # warm up, creates the cached client
+            timings = _measure(case, calls=arguments.calls, repeat=arguments.repeat)
+            _print_timings(name, timings)
+
+        opik.set_tracing_active(False)
+        timings = _measure(
+            _CASES["positional arguments"],
+            calls=arguments.calls,
+            repeat=arguments.repeat,
+        )
+        _print_timings("tracking disabled at runtime", timings)
+        opik.set_tracing_active(True)
+
+        opik_client.get_client_cached().end()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from . import _logging, environment, error_tracking, package_version
+from .api_objects.async_opik_client import AsyncOpik
 from .api_objects.dataset import Dataset
 from .api_objects.experiment.experiment_item import (
     ExperimentItemContent,
@@ -10,6 +11,7 @@ from .api_objects.span import Span
 from .api_objects.trace import Trace
 from .configurator.configure import configure
 from .decorator.tracker import flush_tracker, track
+from .decorator.tracing_runtime_config import is_tracing_active, set_tracing_active
 from .evaluation import evaluate, evaluate_experiment, evaluate_prompt
 from .integrations.sagemaker import auth as sagemaker_auth
 from .plugins.pytest.decorator import llm_unit
@@ -27,7 +29,10 @@ __all__ = [
     "ExperimentItemReferences",
     "track",
     "flush_tracker",
+    "is_tracing_active",
+    "set_tracing_active",
     "Opik",
+    "AsyncOpik",
     "Trace",
     "Span",
     "Dataset",
@@ -0,0 +1,267 @@
+from typing import List, Optional
+
+from . import base_opik_client, opik_query_language, rest_pagination
+from ..message_processing import async_streamer, streamer_constructors, message_queue
+from ..rest_api import client as rest_api_client
+from ..rest_api.types import dataset_public, trace_public, span_public, project_public
+from .. import (
+    config,
+    httpx_client,
+    rest_client_configurator,
+)
+
+OPIK_API_REQUESTS_TIMEOUT_SECONDS = 30.0
+
+
+class AsyncOpik(base_opik_client.BaseOpikClient):
+    _streamer: async_streamer.AsyncStreamer
+
+    def __init__(
+        self,
+        project_name: Optional[str] = None,
+        workspace: Optional[str] = None,
+        host: Optional[str] = None,
+        api_key: Optional[str] = None,
+        batching: bool = True,
+        _show_misconfiguration_message: bool = True,
+    ) -> None:
+        """
+        Initialize an asyncio-native Opik client. The data is sent to the Opik server by the tasks
+        of the event loop the client is first used in, without background threads, and the read
+        methods are coroutines, so many of them can be awaited concurrently.
+
+        Logging traces and spans is synchronous and never blocks. Pending data is not sent
+        automatically when the process exits, `await client.end()` must be called before
+        the event loop is stopped. The client must be used from a single event loop.
+
+        Args:
+            project_name: The name of the project. If not provided, traces and spans will be logged to the `Default Project`.
+            workspace: The name of the workspace. If not provided, `default` will be used.
+            host: The host URL for the Opik server. If not provided, it will default to `https://www.comet.com/opik/api`.
+            api_key: The API key for Opik. This parameter is ignored for local installations.
+            batching: Whether to group traces, spans, their updates and feedback scores into batches
+                before sending them to the Opik server.
+            _show_misconfiguration_message: intended for internal usage in specific conditions only.
+                Print a warning message if the Opik server is not configured properly.
+        Returns:
+            None
+        """
+        config_ = config.get_from_user_inputs(
+            project_name=project_name,
+            workspace=workspace,
+            url_override=host,
+            api_key=api_key,
+        )
+
+        config_.check_for_known_misconfigurations(
+            show_misconfiguration_message=_show_misconfiguration_message,
+        )
+        self._config = config_
+
+        self._workspace: str = config_.workspace
+        self._project_name: str = config_.project_name
+        self._flush_timeout: Optional[int] = config_.default_flush_timeout
+        self._project_name_most_recent_trace: Optional[str] = None
+        self._use_batching = batching
+
+        self._initialize_streamer(
+            base_url=config_.url_override,
+            workers=config_.background_workers,
+            api_key=config_.api_key,
+            check_tls_certificate=config_.check_tls_certificate,
+            use_batching=self._use_batching,
+        )
+
+    @property
+    def config(self) -> config.OpikConfig:
+        """
+        Returns:
+            config.OpikConfig: Read-only copy of the configuration of the Opik client.
+        """
+        return self._config.model_copy()
+
+    def _initialize_streamer(
+        self,
+        base_url: str,
+        workers: int,
+        api_key: Optional[str],
+        check_tls_certificate: bool,
+        use_batching: bool,
+    ) -> None:
+        self._httpx_client = httpx_client.get_async(
+            workspace=self._workspace,
+            api_key=api_key,
+            check_tls_certificate=check_tls_certificate,
+            compression=self._config.request_compression,
+            compression_threshold_bytes=self._config.request_compression_threshold_bytes,
+        )
+        self._rest_client = rest_api_client.AsyncOpikApi(
+            base_url=base_url,
+            httpx_client=self._httpx_client,
+        )
+        self._rest_client._client_wrapper._timeout = OPIK_API_REQUESTS_TIMEOUT_SECONDS  # See https://github.com/fern-api/fern/issues/5321
+        rest_client_configurator.configure(self._rest_client)
+        self._streamer = streamer_constructors.construct_async_online_streamer(
+            rest_client=self._rest_client,
+            use_batching=use_batching,
+            max_concurrent_messages=workers,
+            max_queue_size=self._config.message_queue_max_size,
+            max_queue_size_bytes=self._config.message_queue_max_size_bytes,
+            backpressure_policy=self._config.message_queue_backpressure_policy,
+            spill_directory=self._config.message_queue_spill_directory,
+            max_in_flight_batch_requests=self._config.background_max_in_flight_batch_requests,
+        )
+
+    async def auth_check(self) -> None:
+        """
+        Checks if current API key user has an access to the configured workspace and its content.
+        """
+        self._streamer.start()
+        await self._rest_client.check.access(
+            request={}  # empty body for future backward compatibility
+        )
+
+    async def flush(self, timeout: Optional[int] = None) -> bool:
+        """
+        Wait until all the pending messages are sent.
+
+        Args:
+            timeout (Optional[int]): The timeout for flushing. If no timeout is set,
+                the default value from the Opik configuration will be used.
+
+        Returns:
+            bool: False if the timeout expired before all the messages were sent.
+        """
+        timeout = timeout if timeout is not None else self._flush_timeout
+        return await self._streamer.flush(timeout)
+
+    async def end(self, timeout: Optional[int] = None) -> None:
+        """
+        End the Opik session: submit all pending messages, stop the streamer tasks
+        and close the connections to the Opik server.
+
+        Args:
+            timeout (Optional[int]): The timeout for submitting the pending messages. If no timeout is set,
+                the default value from the Opik configuration will be used.
+
+        Returns:
+            None
+        """
+        timeout = timeout if timeout is not None else self._flush_timeout
+        await self._streamer.close(timeout)
+        await self._httpx_client.aclose()
+
+    def get_message_queue_stats(self) -> message_queue.MessageQueueStats:
+        """
+        Returns the statistics of the queue of messages waiting to be sent to the backend,
+        including the number of messages dropped or spilled to disk because the queue was full.
+        """
+        return self._streamer.get_message_queue_stats()
+
+    async def search_traces(
+        self,
+        project_name: Optional[str] = None,
+        filter_string: Optional[str] = None,
+        max_results: int = 1000,
+        truncate: bool = True,
+    ) -> List[trace_public.TracePublic]:
+        """
+        Search for traces in the given project. The arguments are the same as in :meth:`opik.Opik.search_traces`.
+        """
+        self._streamer.start()
+
+        filters = opik_query_language.OpikQueryLanguage(filter_string).parsed_filters
+        project_name = project_name or self._project_name
+
+        async def fetch_page(page: int, size: int) -> List[trace_public.TracePublic]:
+            page_traces = await self._rest_client.traces.get_traces_by_project(
+                project_name=project_name,
+                filters=filters,
+                page=page,
+                size=size,
+                truncate=truncate,
+            )
+            return page_traces.content or []
+
+        return await rest_pagination.fetch_pages(fetch_page, max_results=max_results)
+
+    async def search_spans(
+        self,
+        project_name: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        filter_string: Optional[str] = None,
+        max_results: int = 1000,
+        truncate: bool = True,
+    ) -> List[span_public.SpanPublic]:
+        """
+        Search for spans in the given project or trace. The arguments are the same as in :meth:`opik.Opik.search_spans`.
+        """
+        self._streamer.start()
+
+        filters = opik_query_language.OpikQueryLanguage(filter_string).parsed_filters
+        project_name = project_name or self._project_name
+
+        async def fetch_page(page: int, size: int) -> List[span_public.SpanPublic]:
+            page_spans = await self._rest_client.spans.get_spans_by_project(
+                project_name=project_name,
+                trace_id=trace_id,
+                filters=filters,
+                page=page,
+                size=size,
+                truncate=truncate,
+            )
+            return page_spans.content or []
+
+        return await rest_pagination.fetch_pages(fetch_page, max_results=max_results)
+
+    async def get_trace_content(self, id: str) -> trace_public.TracePublic:
+        """
+        Args:
+            id (str): trace id
+        Returns:
+            trace_public.TracePublic: pydantic model object with all the data associated with the trace found.
+            Raises an error if trace was not found.
+        """
+        self._streamer.start()
+        return await self._rest_client.traces.get_trace_by_id(id)
+
+    async def get_span_content(self, id: str) -> span_public.SpanPublic:
+        """
+        Args:
+            id (str): span id
+        Returns:
+            span_public.SpanPublic: pydantic model object with all the data associated with the span found.
+            Raises an error if span was not found.
+        """
+        self._streamer.start()
+        return await self._rest_client.spans.get_span_by_id(id)
+
+    async def get_project(self, id: str) -> project_public.ProjectPublic:
+        """
+        Fetches a project by its unique identifier.
+
+        Parameters:
+            id (str): project if (uuid).
+
+        Returns:
+            project_public.ProjectPublic: pydantic model object with all the data associated with the project found.
+            Raises an error if project was not found
+        """
+        self._streamer.start()
+        return await self._rest_client.projects.get_project_by_id(id)
+
+    async def get_dataset(self, name: str) -> dataset_public.DatasetPublic:
+        """
+        Fetches a dataset by its name.
+
+        Args:
+            name: The name of the dataset
+
+        Returns:
+            dataset_public.DatasetPublic: pydantic model object with all the data associated with the dataset found.
+            Raises an error if dataset was not found.
+        """
+        self._streamer.start()
+        return await self._rest_client.datasets.get_dataset_by_identifier(
+            dataset_name=name
+        )
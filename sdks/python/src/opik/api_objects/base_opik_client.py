@@ -0,0 +1,403 @@
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..types import SpanType, FeedbackScoreDict, ErrorInfoDict, LLMProvider
+from . import constants, helpers, span, trace, validation_helpers
+from ..message_processing import async_streamer, messages, streamer
+from ..message_processing.batching import sequence_splitter
+from .. import (
+    config,
+    datetime_helpers,
+    id_helpers,
+    llm_usage,
+    url_helpers,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BaseOpikClient:
+    """
+    Logging of traces, spans and feedback scores shared by `Opik` and `AsyncOpik`.
+    It only puts the messages into the streamer, so it is synchronous for both of them.
+
+    The subclasses must set the attributes declared below in their constructors.
+    """
+
+    _config: config.OpikConfig
+    _workspace: str
+    _project_name: str
+    _project_name_most_recent_trace: Optional[str]
+    _streamer: Union[streamer.Streamer, async_streamer.AsyncStreamer]
+
+    def _display_trace_url(self, trace_id: str, project_name: str) -> None:
+        project_url = url_helpers.get_project_url_by_trace_id(
+            trace_id=trace_id,
+            url_override=self._config.url_override,
+        )
+        if (
+            self._project_name_most_recent_trace is None
+            or self._project_name_most_recent_trace != project_name
+        ):
+            LOGGER.info(
+                f'Started logging traces to the "{project_name}" project at {project_url}.'
+            )
+            self._project_name_most_recent_trace = project_name
+
+    def trace(
+        self,
+        id: Optional[str] = None,
+        name: Optional[str] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        input: Optional[Dict[str, Any]] = None,
+        output: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+        feedback_scores: Optional[List[FeedbackScoreDict]] = None,
+        project_name: Optional[str] = None,
+        error_info: Optional[ErrorInfoDict] = None,
+        thread_id: Optional[str] = None,
+        **ignored_kwargs: Any,
+    ) -> trace.Trace:
+        """
+        Create and log a new trace.
+
+        Args:
+            id: The unique identifier for the trace, if not provided a new ID will be generated. Must be a valid [UUIDv7](https://uuid7.com/) ID.
+            name: The name of the trace.
+            start_time: The start time of the trace. If not provided, the current local time will be used.
+            end_time: The end time of the trace.
+            input: The input data for the trace. This can be any valid JSON serializable object.
+            output: The output data for the trace. This can be any valid JSON serializable object.
+            metadata: Additional metadata for the trace. This can be any valid JSON serializable object.
+            tags: Tags associated with the trace.
+            feedback_scores: The list of feedback score dicts associated with the trace. Dicts don't require to have an `id` value.
+            project_name: The name of the project. If not set, the project name which was configured when Opik instance
+                was created will be used.
+            error_info: The dictionary with error information (typically used when the trace function has failed).
+            thread_id: Used to group multiple traces into a thread.
+                The identifier is user-defined and has to be unique per project.
+
+        Returns:
+            trace.Trace: The created trace object.
+        """
+        id = id if id is not None else id_helpers.generate_id()
+        start_time = (
+            start_time if start_time is not None else datetime_helpers.local_timestamp()
+        )
+
+        if project_name is None:
+            project_name = self._project_name
+
+        self._log_trace(
+            id=id,
+            name=name,
+            start_time=start_time,
+            end_time=end_time,
+            input=input,
+            output=output,
+            metadata=metadata,
+            tags=tags,
+            feedback_scores=feedback_scores,
+            project_name=project_name,
+            error_info=error_info,
+            thread_id=thread_id,
+        )
+
+        return trace.Trace(
+            id=id,
+            message_streamer=self._streamer,
+            project_name=project_name,
+        )
+
+    def span(
+        self,
+        trace_id: Optional[str] = None,
+        id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        name: Optional[str] = None,
+        type: SpanType = "general",
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        input: Optional[Dict[str, Any]] = None,
+        output: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+        usage: Optional[Union[Dict[str, Any], llm_usage.OpikUsage]] = None,
+        feedback_scores: Optional[List[FeedbackScoreDict]] = None,
+        project_name: Optional[str] = None,
+        model: Optional[str] = None,
+        provider: Optional[Union[str, LLMProvider]] = None,
+        error_info: Optional[ErrorInfoDict] = None,
+        total_cost: Optional[float] = None,
+    ) -> span.Span:
+        """
+        Create and log a new span.
+
+        Args:
+            trace_id: The unique identifier for the trace. If not provided, a new ID will be generated. Must be a valid [UUIDv7](https://uuid7.com/) ID.
+            id: The unique identifier for the span. If not provided, a new ID will be generated. Must be a valid [UUIDv7](https://uuid.ramsey.dev/en/stable/rfc4122/version8.html) ID.
+            parent_span_id: The unique identifier for the parent span.
+            name: The name of the span.
+            type: The type of the span. Default is "general".
+            start_time: The start time of the span. If not provided, the current local time will be used.
+            end_time: The end time of the span.
+            metadata: Additional metadata for the span. This can be any valid JSON serializable object.
+            input: The input data for the span. This can be any valid JSON serializable object.
+            output: The output data for the span. This can be any valid JSON serializable object.
+            tags: Tags associated with the span.
+            feedback_scores: The list of feedback score dicts associated with the span. Dicts don't require to have an `id` value.
+            project_name: The name of the project. If not set, the project name which was configured when Opik instance
+                was created will be used.
+            usage: Usage data for the span. In order for input, output and total tokens to be visible in the UI,
+                the usage must contain OpenAI-formatted keys (they can be passed additionaly to original usage on the top level of the dict):  prompt_tokens, completion_tokens and total_tokens.
+                If OpenAI-formatted keys were not found, Opik will try to calculate them automatically if the usage
+                format is recognized (you can see which provider's formats are recognized in opik.LLMProvider enum), but it is not guaranteed.
+            model: The name of LLM (in this case `type` parameter should be == `llm`)
+            provider: The provider of LLM. You can find providers officially supported by Opik for cost tracking
+                in `opik.LLMProvider` enum. If your provider is not here, please open an issue in our github - https://github.com/comet-ml/opik.
+                If your provider not in the list, you can still specify it but the cost tracking will not be available
+            error_info: The dictionary with error information (typically used when the span function has failed).
+            total_cost: The cost of the span in USD. This value takes priority over the cost calculated by Opik from the usage.
+
+        Returns:
+            span.Span: The created span object.
+        """
+        id = id if id is not None else id_helpers.generate_id()
+        start_time = (
+            start_time if start_time is not None else datetime_helpers.local_timestamp()
+        )
+
+        backend_compatible_usage, metadata = self._parse_usage(
+            usage=usage, provider=provider, metadata=metadata
+        )
+
+        if project_name is None:
+            project_name = self._project_name
+
+        if trace_id is None:
+            trace_id = id_helpers.generate_id()
+            # TODO: decide what needs to be passed to CreateTraceMessage.
+            # This version is likely not final.
+            create_trace_message = messages.CreateTraceMessage(
+                trace_id=trace_id,
+                project_name=project_name,
+                name=name,
+                start_time=start_time,
+                end_time=end_time,
+                input=input,
+                output=output,
+                metadata=metadata,
+                tags=tags,
+                error_info=error_info,
+                thread_id=None,
+            )
+            self._streamer.put(create_trace_message)
+
+        self._log_span(
+            id=id,
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            name=name,
+            type=type,
+            start_time=start_time,
+            end_time=end_time,
+            metadata=metadata,
+            input=input,
+            output=output,
+            tags=tags,
+            usage=backend_compatible_usage,
+            feedback_scores=feedback_scores,
+            project_name=project_name,
+            model=model,
+            provider=provider,
+            error_info=error_info,
+            total_cost=total_cost,
+        )
+
+        return span.Span(
+            id=id,
+            parent_span_id=parent_span_id,
+            trace_id=trace_id,
+            project_name=project_name,
+            message_streamer=self._streamer,
+        )
+
+    def _parse_usage(
+        self,
+        usage: Optional[Union[Dict[str, Any], llm_usage.OpikUsage]],
+        provider: Optional[Union[str, LLMProvider]],
+        metadata: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[Dict[str, int]], Optional[Dict[str, Any]]]:
+        backend_compatible_usage = validation_helpers.validate_and_parse_usage(
+            usage=usage,
+            logger=LOGGER,
+            provider=provider,
+        )
+
+        if backend_compatible_usage is not None:
+            metadata = helpers.add_usage_to_metadata(usage=usage, metadata=metadata)
+
+        return backend_compatible_usage, metadata
+
+    def _log_span(
+        self,
+        id: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        name: Optional[str],
+        type: SpanType,
+        start_time: datetime.datetime,
+        end_time: Optional[datetime.datetime],
+        metadata: Optional[Dict[str, Any]],
+        input: Optional[Dict[str, Any]],
+        output: Optional[Dict[str, Any]],
+        tags: Optional[List[str]],
+        usage: Optional[Dict[str, int]],
+        feedback_scores: Optional[List[FeedbackScoreDict]],
+        project_name: str,
+        model: Optional[str],
+        provider: Optional[Union[str, LLMProvider]],
+        error_info: Optional[ErrorInfoDict],
+        total_cost: Optional[float],
+    ) -> None:
+        create_span_message = messages.CreateSpanMessage(
+            span_id=id,
+            trace_id=trace_id,
+            project_name=project_name,
+            parent_span_id=parent_span_id,
+            name=name,
+            type=type,
+            start_time=start_time,
+            end_time=end_time,
+            input=input,
+            output=output,
+            metadata=metadata,
+            tags=tags,
+            usage=usage,
+            model=model,
+            provider=provider,
+            error_info=error_info,
+            total_cost=total_cost,
+        )
+        self._streamer.put(create_span_message)
+
+        if feedback_scores is not None:
+            for feedback_score in feedback_scores:
+                feedback_score["id"] = id
+
+            self.log_spans_feedback_scores(feedback_scores, project_name)
+
+    def _log_trace(
+        self,
+        id: str,
+        name: Optional[str],
+        start_time: datetime.datetime,
+        end_time: Optional[datetime.datetime],
+        input: Optional[Dict[str, Any]],
+        output: Optional[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]],
+        tags: Optional[List[str]],
+        feedback_scores: Optional[List[FeedbackScoreDict]],
+        project_name: str,
+        error_info: Optional[ErrorInfoDict],
+        thread_id: Optional[str],
+    ) -> None:
+        create_trace_message = messages.CreateTraceMessage(
+            trace_id=id,
+            project_name=project_name,
+            name=name,
+            start_time=start_time,
+            end_time=end_time,
+            input=input,
+            output=output,
+            metadata=metadata,
+            tags=tags,
+            error_info=error_info,
+            thread_id=thread_id,
+        )
+        self._streamer.put(create_trace_message)
+        self._display_trace_url(trace_id=id, project_name=project_name)
+
+        if feedback_scores is not None:
+            for feedback_score in feedback_scores:
+                feedback_score["id"] = id
+
+            self.log_traces_feedback_scores(feedback_scores, project_name)
+
+    def log_spans_feedback_scores(
+        self, scores: List[FeedbackScoreDict], project_name: Optional[str] = None
+    ) -> None:
+        """
+        Log feedback scores for spans.
+
+        Args:
+            scores (List[FeedbackScoreDict]): A list of feedback score dictionaries.
+                Specifying a span id via `id` key for each score is mandatory.
+            project_name: The name of the project in which the spans are logged. If not set, the project name
+                which was configured when Opik instance was created will be used.
+
+        Returns:
+            None
+        """
+        for batch in self._create_feedback_score_batches(scores, project_name):
+            self._streamer.put(messages.AddSpanFeedbackScoresBatchMessage(batch=batch))
+
+    def log_traces_feedback_scores(
+        self, scores: List[FeedbackScoreDict], project_name: Optional[str] = None
+    ) -> None:
+        """
+        Log feedback scores for traces.
+
+        Args:
+            scores (List[FeedbackScoreDict]): A list of feedback score dictionaries.
+                Specifying a trace id via `id` key for each score is mandatory.
+            project_name: The name of the project in which the traces are logged. If not set, the project name
+                which was configured when Opik instance was created will be used.
+
+        Returns:
+            None
+        """
+        for batch in self._create_feedback_score_batches(scores, project_name):
+            self._streamer.put(messages.AddTraceFeedbackScoresBatchMessage(batch=batch))
+
+    def _create_feedback_score_batches(
+        self, scores: List[FeedbackScoreDict], project_name: Optional[str]
+    ) -> List[List[messages.FeedbackScoreMessage]]:
+        score_messages = [
+            messages.FeedbackScoreMessage(
+                source=constants.FEEDBACK_SCORE_SOURCE_SDK,
+                project_name=project_name or self._project_name,
+                **score_dict,
+            )
+            for score_dict in scores
+            if validation_helpers.validate_feedback_score(score_dict, LOGGER)
+            is not None
+        ]
+
+        return sequence_splitter.split_into_batches(
+            score_messages,
+            max_payload_size_MB=config.MAX_BATCH_SIZE_MB,
+            max_length=constants.FEEDBACK_SCORES_MAX_BATCH_SIZE,
+        )
+
+    def get_project_url(self, project_name: Optional[str] = None) -> str:
+        """
+        Returns a URL to the project in the current workspace.
+        This method does not make any requests or perform any checks (e.g. that the project exists).
+        It only builds a URL string based on the data provided.
+
+        Parameters:
+            project_name (str): project name to return URL for.
+                If not provided, a default project name for the current Opik instance will be used.
+
+        Returns:
+            str: URL
+        """
+
+        project_name = project_name or self._project_name
+        return url_helpers.get_project_url_by_workspace(
+            workspace=self._workspace, project_name=project_name
+        )
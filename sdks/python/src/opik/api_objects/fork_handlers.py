@@ -0,0 +1,47 @@
+import logging
+import os
+import threading
+import weakref
+from typing import Any, List
+
+LOGGER = logging.getLogger(__name__)
+
+_clients: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_lock = threading.Lock()
+_handler_installed = False
+
+
+def register_reinitialize_after_fork(client: Any) -> None:
+    """
+    Makes sure that the client keeps sending data in the child processes created
+    with `os.fork()` (gunicorn with preloading, Celery prefork pool, multiprocessing
+    with the "fork" start method).
+
+    Only the thread calling `fork()` exists in the child, so the background threads
+    of the inherited streamer are gone and the connections of its HTTP client are shared
+    with the parent. The child reinitializes every client: it gets a new streamer with
+    an empty queue and a new HTTP client, the data logged before the fork is sent by the parent.
+    """
+    global _handler_installed
+
+    with _lock:
+        _clients.add(client)
+        if _handler_installed or not hasattr(os, "register_at_fork"):
+            return
+
+        os.register_at_fork(after_in_child=_reinitialize_clients)
+        _handler_installed = True
+
+
+def _reinitialize_clients() -> None:
+    global _lock
+
+    # the lock might have been held by another thread of the parent at the moment of fork
+    _lock = threading.Lock()
+
+    clients: List[Any] = list(_clients)
+    for client in clients:
+        try:
+            client.__internal_api__reinitialize_after_fork__()
+        except Exception:
+            LOGGER.debug("Failed to reinitialize Opik client after fork", exc_info=True)
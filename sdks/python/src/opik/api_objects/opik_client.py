@@ -1,29 +1,41 @@
 import functools
 import atexit
-import datetime
 import logging
+import warnings
 
-from typing import Optional, Any, Dict, List, Union
+from typing import Optional, Any, Dict, Iterator, List
 
 from .prompt import Prompt
 from .prompt.client import PromptClient
 
-from ..types import SpanType, FeedbackScoreDict, ErrorInfoDict, LLMProvider
 from . import (
+    base_opik_client,
     opik_query_language,
     span,
     trace,
     dataset,
     experiment,
     constants,
-    validation_helpers,
-    helpers,
+    signal_handlers,
+    fork_handlers,
+    rest_pagination,
 )
+from .span import span_data as span_data_module
 from .trace import migration as trace_migration
+from .trace import trace_data as trace_data_module
 from .experiment import helpers as experiment_helpers
 from .experiment import rest_operations as experiment_rest_operations
 from .dataset import rest_operations as dataset_rest_operations
-from ..message_processing import streamer_constructors, messages
+from ..message_processing import (
+    attachment_offload,
+    attachment_store,
+    forwarding,
+    local_sink,
+    streamer,
+    streamer_constructors,
+    message_queue,
+)
+from ..message_processing.batching import adaptive_controller
 from ..message_processing.batching import sequence_splitter
 
 from ..rest_api import client as rest_api_client
@@ -37,22 +49,26 @@ from .. import (
     url_helpers,
     rest_client_configurator,
     id_helpers,
-    llm_usage,
 )
 
 LOGGER = logging.getLogger(__name__)
 OPIK_API_REQUESTS_TIMEOUT_SECONDS = 30.0
 
 
-class Opik:
+class Opik(base_opik_client.BaseOpikClient):
+    _streamer: streamer.Streamer
+
     def __init__(
         self,
         project_name: Optional[str] = None,
         workspace: Optional[str] = None,
         host: Optional[str] = None,
         api_key: Optional[str] = None,
-        _use_batching: bool = False,
+        batching: bool = False,
+        _use_batching: Optional[bool] = None,
         _show_misconfiguration_message: bool = True,
+        _message_forwarding: bool = True,
+        _local_sink: bool = True,
     ) -> None:
         """
         Initialize an Opik object that can be used to log traces and spans manually to Opik server.
@@ -62,10 +78,21 @@ class Opik:
             workspace: The name of the workspace. If not provided, `default` will be used.
             host: The host URL for the Opik server. If not provided, it will default to `https://www.comet.com/opik/api`.
             api_key: The API key for Opik. This parameter is ignored for local installations.
-            _use_batching: intended for internal usage in specific conditions only.
-                Enabling it is unsafe and can lead to data loss.
+            batching: Whether to group traces, spans, their updates and feedback scores into batches
+                before sending them to the Opik server. Batching greatly reduces the number of requests.
+                Partial batches are sent at most a few seconds after the data is logged, updates are never
+                sent before the corresponding traces and spans are created, and all pending data is flushed
+                when the process exits or receives SIGTERM.
+            _use_batching: deprecated alias of `batching`, kept for backward compatibility.
+                Emits a `DeprecationWarning` when passed.
             _show_misconfiguration_message: intended for internal usage in specific conditions only.
                 Print a warning message if the Opik server is not configured properly.
+            _message_forwarding: intended for internal usage in specific conditions only.
+                Whether to forward the data to the uploader process if `message_forwarding_address`
+                is configured. Disabled by the uploader itself.
+            _local_sink: intended for internal usage in specific conditions only.
+                Whether to write the data to the files if `local_sink_directory` is configured.
+                Disabled by `opik upload` which sends these files to the backend.
         Returns:
             None
         """
@@ -86,16 +113,28 @@ class Opik:
         self._project_name: str = config_.project_name
         self._flush_timeout: Optional[int] = config_.default_flush_timeout
         self._project_name_most_recent_trace: Optional[str] = None
-        self._use_batching = _use_batching
+        if _use_batching is not None:
+            warnings.warn(
+                "`_use_batching` is deprecated, use `batching` instead.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            batching = _use_batching
+
+        self._use_batching = batching
+        self._message_forwarding = _message_forwarding
+        self._local_sink = _local_sink
 
         self._initialize_streamer(
             base_url=config_.url_override,
             workers=config_.background_workers,
             api_key=config_.api_key,
             check_tls_certificate=config_.check_tls_certificate,
-            use_batching=_use_batching,
+            use_batching=self._use_batching,
         )
         atexit.register(self.end, timeout=self._flush_timeout)
+        signal_handlers.register_flush_on_signals(self)
+        fork_handlers.register_reinitialize_after_fork(self)
 
     @property
     def config(self) -> config.OpikConfig:
@@ -117,6 +156,8 @@ class Opik:
             workspace=self._workspace,
             api_key=api_key,
             check_tls_certificate=check_tls_certificate,
+            compression=self._config.request_compression,
+            compression_threshold_bytes=self._config.request_compression_threshold_bytes,
         )
         self._rest_client = rest_api_client.OpikApi(
             base_url=base_url,
@@ -124,113 +165,119 @@ class Opik:
         )
         self._rest_client._client_wrapper._timeout = OPIK_API_REQUESTS_TIMEOUT_SECONDS  # See https://github.com/fern-api/fern/issues/5321
         rest_client_configurator.configure(self._rest_client)
+
+        attachment_offloader = (
+            attachment_offload.AttachmentOffloader(
+                store=attachment_store.LocalFileAttachmentStore(
+                    self._config.attachments_directory
+                ),
+                min_size_bytes=self._config.attachment_min_size_bytes,
+            )
+            if self._config.attachments_directory is not None
+            else None
+        )
+
+        if self._local_sink and self._config.local_sink_directory is not None:
+            self._streamer = streamer_constructors.construct_local_sink_streamer(
+                directory=self._config.local_sink_directory,
+                max_queue_size=self._config.message_queue_max_size,
+                max_queue_size_bytes=self._config.message_queue_max_size_bytes,
+                backpressure_policy=self._config.message_queue_backpressure_policy,
+                spill_directory=self._config.message_queue_spill_directory,
+                attachment_offloader=attachment_offloader,
+            )
+            return
+
+        if (
+            self._message_forwarding
+            and self._config.message_forwarding_address is not None
+        ):
+            self._streamer = streamer_constructors.construct_forwarding_streamer(
+                address=self._config.message_forwarding_address,
+                authkey=forwarding.get_authkey(self._config.message_forwarding_authkey),
+                max_queue_size=self._config.message_queue_max_size,
+                max_queue_size_bytes=self._config.message_queue_max_size_bytes,
+                backpressure_policy=self._config.message_queue_backpressure_policy,
+                spill_directory=self._config.message_queue_spill_directory,
+            )
+            return
+
         self._streamer = streamer_constructors.construct_online_streamer(
             n_consumers=workers,
             rest_client=self._rest_client,
             use_batching=use_batching,
+            max_queue_size=self._config.message_queue_max_size,
+            max_queue_size_bytes=self._config.message_queue_max_size_bytes,
+            backpressure_policy=self._config.message_queue_backpressure_policy,
+            spill_directory=self._config.message_queue_spill_directory,
+            spool_directory=self._config.spool_directory,
+            adaptive_batching=self._config.adaptive_batching,
+            max_in_flight_batch_requests=self._config.background_max_in_flight_batch_requests,
+            attachment_offloader=attachment_offloader,
         )
 
-    def _display_trace_url(self, trace_id: str, project_name: str) -> None:
-        project_url = url_helpers.get_project_url_by_trace_id(
-            trace_id=trace_id,
-            url_override=self._config.url_override,
-        )
-        if (
-            self._project_name_most_recent_trace is None
-            or self._project_name_most_recent_trace != project_name
-        ):
-            LOGGER.info(
-                f'Started logging traces to the "{project_name}" project at {project_url}.'
+    def __internal_api__reinitialize_after_fork__(self) -> None:
+        """
+        Replaces the streamer and the HTTP client inherited from the parent process,
+        see `fork_handlers.register_reinitialize_after_fork`. The inherited objects are
+        abandoned without closing, closing them would affect the connections of the parent.
+        """
+        if self._config.spool_directory is not None:
+            LOGGER.debug(
+                "Spool directory can't be shared with the parent process, spooling is disabled after fork"
             )
-            self._project_name_most_recent_trace = project_name
+            self._config = self._config.model_copy(update={"spool_directory": None})
 
-    def _display_created_dataset_url(self, dataset_name: str, dataset_id: str) -> None:
-        dataset_url = url_helpers.get_dataset_url_by_id(
-            dataset_id, self._config.url_override
+        self._initialize_streamer(
+            base_url=self._config.url_override,
+            workers=self._config.background_workers,
+            api_key=self._config.api_key,
+            check_tls_certificate=self._config.check_tls_certificate,
+            use_batching=self._use_batching,
         )
 
-        LOGGER.info(f'Created a "{dataset_name}" dataset at {dataset_url}.')
-
-    def auth_check(self) -> None:
+    def __internal_api__serve_forwarded_messages__(self, address: str) -> None:
         """
-        Checks if current API key user has an access to the configured workspace and its content.
+        Runs the uploader: receives the data forwarded by the clients of the local
+        processes configured with `message_forwarding_address` and sends it to the backend
+        using this client. Blocks until interrupted.
         """
-        self._rest_client.check.access(
-            request={}  # empty body for future backward compatibility
+        uploader = forwarding.MessageUploader(
+            address=address,
+            message_streamer=self._streamer,
+            authkey=forwarding.get_authkey(self._config.message_forwarding_authkey),
         )
+        try:
+            uploader.serve_forever()
+        finally:
+            uploader.close()
 
-    def trace(
-        self,
-        id: Optional[str] = None,
-        name: Optional[str] = None,
-        start_time: Optional[datetime.datetime] = None,
-        end_time: Optional[datetime.datetime] = None,
-        input: Optional[Dict[str, Any]] = None,
-        output: Optional[Dict[str, Any]] = None,
-        metadata: Optional[Dict[str, Any]] = None,
-        tags: Optional[List[str]] = None,
-        feedback_scores: Optional[List[FeedbackScoreDict]] = None,
-        project_name: Optional[str] = None,
-        error_info: Optional[ErrorInfoDict] = None,
-        thread_id: Optional[str] = None,
-        **ignored_kwargs: Any,
-    ) -> trace.Trace:
+    def __internal_api__upload_local_sink__(
+        self, directory: str, delete_uploaded: bool = False
+    ) -> local_sink.UploadStats:
         """
-        Create and log a new trace.
-
-        Args:
-            id: The unique identifier for the trace, if not provided a new ID will be generated. Must be a valid [UUIDv7](https://uuid7.com/) ID.
-            name: The name of the trace.
-            start_time: The start time of the trace. If not provided, the current local time will be used.
-            end_time: The end time of the trace.
-            input: The input data for the trace. This can be any valid JSON serializable object.
-            output: The output data for the trace. This can be any valid JSON serializable object.
-            metadata: Additional metadata for the trace. This can be any valid JSON serializable object.
-            tags: Tags associated with the trace.
-            feedback_scores: The list of feedback score dicts associated with the trace. Dicts don't require to have an `id` value.
-            project_name: The name of the project. If not set, the project name which was configured when Opik instance
-                was created will be used.
-            error_info: The dictionary with error information (typically used when the trace function has failed).
-            thread_id: Used to group multiple traces into a thread.
-                The identifier is user-defined and has to be unique per project.
-
-        Returns:
-            trace.Trace: The created trace object.
+        Sends the data written to `directory` by the clients configured
+        with `local_sink_directory` to the backend.
         """
-        id = id if id is not None else id_helpers.generate_id()
-        start_time = (
-            start_time if start_time is not None else datetime_helpers.local_timestamp()
+        return local_sink.upload_directory(
+            rest_client=self._rest_client,
+            directory=directory,
+            delete_uploaded=delete_uploaded,
         )
 
-        if project_name is None:
-            project_name = self._project_name
-
-        create_trace_message = messages.CreateTraceMessage(
-            trace_id=id,
-            project_name=project_name,
-            name=name,
-            start_time=start_time,
-            end_time=end_time,
-            input=input,
-            output=output,
-            metadata=metadata,
-            tags=tags,
-            error_info=error_info,
-            thread_id=thread_id,
+    def _display_created_dataset_url(self, dataset_name: str, dataset_id: str) -> None:
+        dataset_url = url_helpers.get_dataset_url_by_id(
+            dataset_id, self._config.url_override
         )
-        self._streamer.put(create_trace_message)
-        self._display_trace_url(trace_id=id, project_name=project_name)
-
-        if feedback_scores is not None:
-            for feedback_score in feedback_scores:
-                feedback_score["id"] = id
 
-            self.log_traces_feedback_scores(feedback_scores, project_name)
+        LOGGER.info(f'Created a "{dataset_name}" dataset at {dataset_url}.')
 
-        return trace.Trace(
-            id=id,
-            message_streamer=self._streamer,
-            project_name=project_name,
+    def auth_check(self) -> None:
+        """
+        Checks if current API key user has an access to the configured workspace and its content.
+        """
+        self._rest_client.check.access(
+            request={}  # empty body for future backward compatibility
         )
 
     def copy_traces(
@@ -261,7 +308,7 @@ class Opik:
 
         if not self._use_batching:
             raise exceptions.OpikException(
-                "In order to use this method, you must enable batching using opik.Opik(_use_batching=True)."
+                "In order to use this method, you must enable batching using opik.Opik(batching=True)."
             )
 
         traces_public = self.search_traces(project_name=project_name)
@@ -300,216 +347,69 @@ class Opik:
             ):
                 self._rest_client.traces.delete_traces(ids=batch)
 
-    def span(
-        self,
-        trace_id: Optional[str] = None,
-        id: Optional[str] = None,
-        parent_span_id: Optional[str] = None,
-        name: Optional[str] = None,
-        type: SpanType = "general",
-        start_time: Optional[datetime.datetime] = None,
-        end_time: Optional[datetime.datetime] = None,
-        metadata: Optional[Dict[str, Any]] = None,
-        input: Optional[Dict[str, Any]] = None,
-        output: Optional[Dict[str, Any]] = None,
-        tags: Optional[List[str]] = None,
-        usage: Optional[Union[Dict[str, Any], llm_usage.OpikUsage]] = None,
-        feedback_scores: Optional[List[FeedbackScoreDict]] = None,
-        project_name: Optional[str] = None,
-        model: Optional[str] = None,
-        provider: Optional[Union[str, LLMProvider]] = None,
-        error_info: Optional[ErrorInfoDict] = None,
-        total_cost: Optional[float] = None,
-    ) -> span.Span:
-        """
-        Create and log a new span.
-
-        Args:
-            trace_id: The unique identifier for the trace. If not provided, a new ID will be generated. Must be a valid [UUIDv7](https://uuid7.com/) ID.
-            id: The unique identifier for the span. If not provided, a new ID will be generated. Must be a valid [UUIDv7](https://uuid.ramsey.dev/en/stable/rfc4122/version8.html) ID.
-            parent_span_id: The unique identifier for the parent span.
-            name: The name of the span.
-            type: The type of the span. Default is "general".
-            start_time: The start time of the span. If not provided, the current local time will be used.
-            end_time: The end time of the span.
-            metadata: Additional metadata for the span. This can be any valid JSON serializable object.
-            input: The input data for the span. This can be any valid JSON serializable object.
-            output: The output data for the span. This can be any valid JSON serializable object.
-            tags: Tags associated with the span.
-            feedback_scores: The list of feedback score dicts associated with the span. Dicts don't require to have an `id` value.
-            project_name: The name of the project. If not set, the project name which was configured when Opik instance
-                was created will be used.
-            usage: Usage data for the span. In order for input, output and total tokens to be visible in the UI,
-                the usage must contain OpenAI-formatted keys (they can be passed additionaly to original usage on the top level of the dict):  prompt_tokens, completion_tokens and total_tokens.
-                If OpenAI-formatted keys were not found, Opik will try to calculate them automatically if the usage
-                format is recognized (you can see which provider's formats are recognized in opik.LLMProvider enum), but it is not guaranteed.
-            model: The name of LLM (in this case `type` parameter should be == `llm`)
-            provider: The provider of LLM. You can find providers officially supported by Opik for cost tracking
-                in `opik.LLMProvider` enum. If your provider is not here, please open an issue in our github - https://github.com/comet-ml/opik.
-                If your provider not in the list, you can still specify it but the cost tracking will not be available
-            error_info: The dictionary with error information (typically used when the span function has failed).
-            total_cost: The cost of the span in USD. This value takes priority over the cost calculated by Opik from the usage.
-
-        Returns:
-            span.Span: The created span object.
+    def __internal_api__log_span_data__(
+        self, span_data: span_data_module.SpanData
+    ) -> None:
         """
-        id = id if id is not None else id_helpers.generate_id()
-        start_time = (
-            start_time if start_time is not None else datetime_helpers.local_timestamp()
-        )
-
-        backend_compatible_usage = validation_helpers.validate_and_parse_usage(
-            usage=usage,
-            logger=LOGGER,
-            provider=provider,
-        )
-
-        if backend_compatible_usage is not None:
-            metadata = helpers.add_usage_to_metadata(usage=usage, metadata=metadata)
-
-        if project_name is None:
-            project_name = self._project_name
-
-        if trace_id is None:
-            trace_id = id_helpers.generate_id()
-            # TODO: decide what needs to be passed to CreateTraceMessage.
-            # This version is likely not final.
-            create_trace_message = messages.CreateTraceMessage(
-                trace_id=trace_id,
-                project_name=project_name,
-                name=name,
-                start_time=start_time,
-                end_time=end_time,
-                input=input,
-                output=output,
-                metadata=metadata,
-                tags=tags,
-                error_info=error_info,
-                thread_id=None,
-            )
-            self._streamer.put(create_trace_message)
-
-        create_span_message = messages.CreateSpanMessage(
-            span_id=id,
-            trace_id=trace_id,
-            project_name=project_name,
-            parent_span_id=parent_span_id,
-            name=name,
-            type=type,
-            start_time=start_time,
-            end_time=end_time,
-            input=input,
-            output=output,
+        Logs the span finished by the `track` decorator. Unlike `span()`, the message
+        is built straight from the span data: its ids and start time are already set,
+        and no `Span` object is returned.
+        """
+        backend_compatible_usage, metadata = self._parse_usage(
+            usage=span_data.usage,
+            provider=span_data.provider,
+            metadata=span_data.metadata,
+        )
+
+        self._log_span(
+            id=span_data.id,
+            trace_id=span_data.trace_id,
+            parent_span_id=span_data.parent_span_id,
+            name=span_data.name,
+            type=span_data.type,
+            start_time=span_data.start_time
+            if span_data.start_time is not None
+            else datetime_helpers.local_timestamp(),
+            end_time=span_data.end_time,
             metadata=metadata,
-            tags=tags,
+            input=span_data.input,
+            output=span_data.output,
+            tags=span_data.tags,
             usage=backend_compatible_usage,
-            model=model,
-            provider=provider,
-            error_info=error_info,
-            total_cost=total_cost,
-        )
-        self._streamer.put(create_span_message)
-
-        if feedback_scores is not None:
-            for feedback_score in feedback_scores:
-                feedback_score["id"] = id
-
-            self.log_spans_feedback_scores(feedback_scores, project_name)
-
-        return span.Span(
-            id=id,
-            parent_span_id=parent_span_id,
-            trace_id=trace_id,
-            project_name=project_name,
-            message_streamer=self._streamer,
-        )
-
-    def log_spans_feedback_scores(
-        self, scores: List[FeedbackScoreDict], project_name: Optional[str] = None
+            feedback_scores=span_data.feedback_scores,
+            project_name=span_data.project_name
+            if span_data.project_name is not None
+            else self._project_name,
+            model=span_data.model,
+            provider=span_data.provider,
+            error_info=span_data.error_info,
+            total_cost=span_data.total_cost,
+        )
+
+    def __internal_api__log_trace_data__(
+        self, trace_data: trace_data_module.TraceData
     ) -> None:
         """
-        Log feedback scores for spans.
-
-        Args:
-            scores (List[FeedbackScoreDict]): A list of feedback score dictionaries.
-                Specifying a span id via `id` key for each score is mandatory.
-            project_name: The name of the project in which the spans are logged. If not set, the project name
-                which was configured when Opik instance was created will be used.
-
-        Returns:
-            None
-        """
-        valid_scores = [
-            score
-            for score in scores
-            if validation_helpers.validate_feedback_score(score, LOGGER) is not None
-        ]
-
-        if len(valid_scores) == 0:
-            return None
-
-        score_messages = [
-            messages.FeedbackScoreMessage(
-                source=constants.FEEDBACK_SCORE_SOURCE_SDK,
-                project_name=project_name or self._project_name,
-                **score_dict,
-            )
-            for score_dict in valid_scores
-        ]
-
-        for batch in sequence_splitter.split_into_batches(
-            score_messages,
-            max_payload_size_MB=config.MAX_BATCH_SIZE_MB,
-            max_length=constants.FEEDBACK_SCORES_MAX_BATCH_SIZE,
-        ):
-            add_span_feedback_scores_batch_message = (
-                messages.AddSpanFeedbackScoresBatchMessage(batch=batch)
-            )
-
-            self._streamer.put(add_span_feedback_scores_batch_message)
-
-    def log_traces_feedback_scores(
-        self, scores: List[FeedbackScoreDict], project_name: Optional[str] = None
-    ) -> None:
-        """
-        Log feedback scores for traces.
-
-        Args:
-            scores (List[FeedbackScoreDict]): A list of feedback score dictionaries.
-                Specifying a trace id via `id` key for each score is mandatory.
-            project_name: The name of the project in which the traces are logged. If not set, the project name
-                which was configured when Opik instance was created will be used.
-
-        Returns:
-            None
-        """
-        valid_scores = [
-            score
-            for score in scores
-            if validation_helpers.validate_feedback_score(score, LOGGER) is not None
-        ]
-
-        if len(valid_scores) == 0:
-            return None
-
-        score_messages = [
-            messages.FeedbackScoreMessage(
-                source=constants.FEEDBACK_SCORE_SOURCE_SDK,
-                project_name=project_name or self._project_name,
-                **score_dict,
-            )
-            for score_dict in valid_scores
-        ]
-        for batch in sequence_splitter.split_into_batches(
-            score_messages,
-            max_payload_size_MB=config.MAX_BATCH_SIZE_MB,
-            max_length=constants.FEEDBACK_SCORES_MAX_BATCH_SIZE,
-        ):
-            add_span_feedback_scores_batch_message = (
-                messages.AddTraceFeedbackScoresBatchMessage(batch=batch)
-            )
-
-            self._streamer.put(add_span_feedback_scores_batch_message)
+        Logs the trace finished by the `track` decorator, see `__internal_api__log_span_data__`.
+        """
+        self._log_trace(
+            id=trace_data.id,
+            name=trace_data.name,
+            start_time=trace_data.start_time
+            if trace_data.start_time is not None
+            else datetime_helpers.local_timestamp(),
+            end_time=trace_data.end_time,
+            input=trace_data.input,
+            output=trace_data.output,
+            metadata=trace_data.metadata,
+            tags=trace_data.tags,
+            feedback_scores=trace_data.feedback_scores,
+            project_name=trace_data.project_name
+            if trace_data.project_name is not None
+            else self._project_name,
+            error_info=trace_data.error_info,
+            thread_id=trace_data.thread_id,
+        )
 
     def delete_trace_feedback_score(self, trace_id: str, name: str) -> None:
         """
@@ -828,6 +728,29 @@ class Opik:
         timeout = timeout if timeout is not None else self._flush_timeout
         self._streamer.flush(timeout)
 
+    def get_message_queue_stats(self) -> message_queue.MessageQueueStats:
+        """
+        Returns the statistics of the background queue of messages waiting to be sent to the backend,
+        including the number of messages dropped or spilled to disk because the queue was full.
+
+        Returns:
+            message_queue.MessageQueueStats: current queue size and counters of dropped and spilled messages.
+        """
+        return self._streamer.get_message_queue_stats()
+
+    def get_adaptive_batching_stats(
+        self,
+    ) -> Optional[adaptive_controller.AdaptiveBatchingStats]:
+        """
+        Returns the current decisions of the adaptive batching controller: the batch sizes and
+        flush intervals of the batchers, and the observed latency, error rate and send rate they are based on.
+
+        Returns:
+            Optional[adaptive_controller.AdaptiveBatchingStats]: current batching settings and observations,
+                or None if batching or adaptive batching is disabled.
+        """
+        return self._streamer.get_adaptive_batching_stats()
+
     def search_traces(
         self,
         project_name: Optional[str] = None,
@@ -844,29 +767,58 @@ class Opik:
             max_results: The maximum number of traces to return.
             truncate: Whether to truncate image data stored in input, output or metadata
         """
+        return list(
+            self.iter_traces(
+                project_name=project_name,
+                filter_string=filter_string,
+                max_results=max_results,
+                truncate=truncate,
+            )
+        )
 
-        page_size = 100
-        traces: List[trace_public.TracePublic] = []
+    def iter_traces(
+        self,
+        project_name: Optional[str] = None,
+        filter_string: Optional[str] = None,
+        max_results: Optional[int] = None,
+        truncate: bool = True,
+        page_size: int = rest_pagination.DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[trace_public.TracePublic]:
+        """
+        Lazily iterates over the traces in the given project. The traces are requested
+        page by page and yielded as soon as their page is received, only the current page
+        and the next one are kept in memory, so it can be used to export any number of traces.
 
+        Args:
+            project_name: The name of the project to search traces in. If not provided, will search across the project name configured when the Client was created which defaults to the `Default Project`.
+            filter_string: A filter string to narrow down the search. If not provided, all traces in the project are returned.
+            max_results: The maximum number of traces to return. If not provided, all the found traces are returned.
+            truncate: Whether to truncate image data stored in input, output or metadata
+            page_size: The number of traces requested at once.
+            prefetch: Whether to request the next page in a background thread while the current one is consumed.
+        """
         filters = opik_query_language.OpikQueryLanguage(filter_string).parsed_filters
+        project_name = project_name or self._project_name
 
-        page = 1
-        while len(traces) < max_results:
-            page_traces = self._rest_client.traces.get_traces_by_project(
-                project_name=project_name or self._project_name,
-                filters=filters,
-                page=page,
-                size=page_size,
-                truncate=truncate,
+        def fetch_page(page: int, size: int) -> List[trace_public.TracePublic]:
+            return (
+                self._rest_client.traces.get_traces_by_project(
+                    project_name=project_name,
+                    filters=filters,
+                    page=page,
+                    size=size,
+                    truncate=truncate,
+                ).content
+                or []
             )
 
-            if len(page_traces.content) == 0:
-                break
-
-            traces.extend(page_traces.content)
-            page += 1
-
-        return traces[:max_results]
+        return rest_pagination.iterate_pages(
+            fetch_page,
+            page_size=page_size,
+            max_results=max_results,
+            prefetch=prefetch,
+        )
 
     def search_spans(
         self,
@@ -887,29 +839,62 @@ class Opik:
             max_results: The maximum number of spans to return.
             truncate: Whether to truncate image data stored in input, output or metadata
         """
-        page_size = 100
-        spans: List[span_public.SpanPublic] = []
-
-        filters = opik_query_language.OpikQueryLanguage(filter_string).parsed_filters
-
-        page = 1
-        while len(spans) < max_results:
-            page_spans = self._rest_client.spans.get_spans_by_project(
-                project_name=project_name or self._project_name,
+        return list(
+            self.iter_spans(
+                project_name=project_name,
                 trace_id=trace_id,
-                filters=filters,
-                page=page,
-                size=page_size,
+                filter_string=filter_string,
+                max_results=max_results,
                 truncate=truncate,
             )
+        )
 
-            if len(page_spans.content) == 0:
-                break
+    def iter_spans(
+        self,
+        project_name: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        filter_string: Optional[str] = None,
+        max_results: Optional[int] = None,
+        truncate: bool = True,
+        page_size: int = rest_pagination.DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[span_public.SpanPublic]:
+        """
+        Lazily iterates over the spans in the given project or trace. The spans are requested
+        page by page and yielded as soon as their page is received, only the current page
+        and the next one are kept in memory, so it can be used to export any number of spans.
 
-            spans.extend(page_spans.content)
-            page += 1
+        Args:
+            project_name: The name of the project to search spans in. If not provided, will search across the project name configured when the Client was created which defaults to the `Default Project`.
+            trace_id: The ID of the trace to search spans in. If provided, the search will be limited to the spans in the given trace.
+            filter_string: A filter string to narrow down the search.
+            max_results: The maximum number of spans to return. If not provided, all the found spans are returned.
+            truncate: Whether to truncate image data stored in input, output or metadata
+            page_size: The number of spans requested at once.
+            prefetch: Whether to request the next page in a background thread while the current one is consumed.
+        """
+        filters = opik_query_language.OpikQueryLanguage(filter_string).parsed_filters
+        project_name = project_name or self._project_name
+
+        def fetch_page(page: int, size: int) -> List[span_public.SpanPublic]:
+            return (
+                self._rest_client.spans.get_spans_by_project(
+                    project_name=project_name,
+                    trace_id=trace_id,
+                    filters=filters,
+                    page=page,
+                    size=size,
+                    truncate=truncate,
+                ).content
+                or []
+            )
 
-        return spans[:max_results]
+        return rest_pagination.iterate_pages(
+            fetch_page,
+            page_size=page_size,
+            max_results=max_results,
+            prefetch=prefetch,
+        )
 
     def get_trace_content(self, id: str) -> trace_public.TracePublic:
         """
@@ -944,25 +929,6 @@ class Opik:
         """
         return self._rest_client.projects.get_project_by_id(id)
 
-    def get_project_url(self, project_name: Optional[str] = None) -> str:
-        """
-        Returns a URL to the project in the current workspace.
-        This method does not make any requests or perform any checks (e.g. that the project exists).
-        It only builds a URL string based on the data provided.
-
-        Parameters:
-            project_name (str): project name to return URL for.
-                If not provided, a default project name for the current Opik instance will be used.
-
-        Returns:
-            str: URL
-        """
-
-        project_name = project_name or self._project_name
-        return url_helpers.get_project_url_by_workspace(
-            workspace=self._workspace, project_name=project_name
-        )
-
     def create_prompt(
         self,
         name: str,
@@ -1021,6 +987,6 @@ class Opik:
 
 @functools.lru_cache()
 def get_client_cached() -> Opik:
-    client = Opik(_use_batching=True)
+    client = Opik(batching=True)
 
     return client
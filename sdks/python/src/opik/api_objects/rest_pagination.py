@@ -0,0 +1,116 @@
+import concurrent.futures
+from typing import Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+
+# Engineer note:
+#
+# With prefetching, the request of the next page is sent before the items of the current
+# page are yielded, so the consumer's processing of a page overlaps with the round trip
+# of the next one. Only one page is fetched ahead, so the memory used by the iterator
+# doesn't depend on the number of results.
+
+
+def iterate_pages(
+    fetch_page: Callable[[int, int], List[T]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_results: Optional[int] = None,
+    prefetch: bool = True,
+) -> Iterator[T]:
+    """
+    Yields the items of the consecutive pages returned by `fetch_page(page, size)`
+    (pages are numbered from 1) until an empty page is returned or `max_results`
+    items are yielded.
+
+    If `prefetch` is True, the next page is fetched in a background thread while
+    the items of the current one are consumed. The errors of fetching are raised
+    when the failed page is reached.
+    """
+    if page_size <= 0:
+        raise ValueError(f"page_size must be positive, got {page_size}")
+
+    if not prefetch:
+        yield from _iterate_pages_sequentially(fetch_page, page_size, max_results)
+        return
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="OpikPagePrefetchThread"
+    )
+    yielded = 0
+    page = 1
+    next_page_future: Optional["concurrent.futures.Future[List[T]]"] = executor.submit(
+        fetch_page, page, page_size
+    )
+    try:
+        while next_page_future is not None:
+            items = next_page_future.result()
+            if len(items) == 0:
+                return
+
+            page += 1
+            if max_results is None or yielded + len(items) < max_results:
+                next_page_future = executor.submit(fetch_page, page, page_size)
+            else:
+                next_page_future = None
+
+            for item in items:
+                if max_results is not None and yielded >= max_results:
+                    return
+                yield item
+                yielded += 1
+    finally:
+        # the consumer may stop early, the prefetched page is not waited for
+        if next_page_future is not None:
+            next_page_future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _iterate_pages_sequentially(
+    fetch_page: Callable[[int, int], List[T]],
+    page_size: int,
+    max_results: Optional[int],
+) -> Iterator[T]:
+    yielded = 0
+    page = 1
+
+    while max_results is None or yielded < max_results:
+        items = fetch_page(page, page_size)
+        if len(items) == 0:
+            return
+
+        for item in items:
+            if max_results is not None and yielded >= max_results:
+                return
+            yield item
+            yielded += 1
+
+        page += 1
+
+
+async def fetch_pages(
+    fetch_page: Callable[[int, int], Awaitable[List[T]]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_results: Optional[int] = None,
+) -> List[T]:
+    """
+    The asyncio counterpart of `iterate_pages` without prefetching: returns the items
+    of the consecutive pages returned by `await fetch_page(page, size)` until an empty
+    page is returned or `max_results` items are collected.
+    """
+    if page_size <= 0:
+        raise ValueError(f"page_size must be positive, got {page_size}")
+
+    items: List[T] = []
+    page = 1
+
+    while max_results is None or len(items) < max_results:
+        page_items = await fetch_page(page, page_size)
+        if len(page_items) == 0:
+            break
+
+        items.extend(page_items)
+        page += 1
+
+    return items if max_results is None else items[:max_results]
@@ -0,0 +1,74 @@
+import logging
+import os
+import signal
+import threading
+import time
+import types
+import weakref
+from typing import Any, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+FLUSH_ON_SIGNAL_TIMEOUT_SECONDS = 5
+
+_clients: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_lock = threading.Lock()
+_handlers_installed = False
+
+
+def register_flush_on_signals(client: Any) -> None:
+    """
+    Makes sure that the data logged by the client is flushed when the process
+    receives SIGTERM, which terminates the process without running `atexit` hooks.
+
+    The handler is installed only if SIGTERM has the default disposition, the handlers
+    installed by the application (or ignoring the signal) are left untouched.
+    After flushing, the signal is re-raised with the default disposition so that
+    the process terminates the same way it would without Opik.
+
+    Signal handlers can only be installed from the main thread, if the client is
+    created in another thread, the handler will be installed by the next client
+    created in the main thread.
+    """
+    global _handlers_installed
+
+    with _lock:
+        _clients.add(client)
+        if _handlers_installed:
+            return
+
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, _handle_signal)
+
+        _handlers_installed = True
+
+
+def _handle_signal(signal_number: int, frame: Optional[types.FrameType]) -> None:
+    LOGGER.debug("Received signal %d, flushing Opik clients", signal_number)
+    flush_clients(timeout=FLUSH_ON_SIGNAL_TIMEOUT_SECONDS)
+
+    signal.signal(signal_number, signal.SIG_DFL)
+    os.kill(os.getpid(), signal_number)
+
+
+def flush_clients(timeout: float) -> None:
+    # The signal handler interrupts the main thread at an arbitrary point, possibly
+    # while it holds a lock needed for flushing. Flushing in a separate thread
+    # guarantees that the handler returns within the timeout in that case.
+    clients: List[Any] = list(_clients)
+    deadline = time.monotonic() + timeout
+
+    def flush() -> None:
+        for client in clients:
+            remaining = max(int(deadline - time.monotonic()), 1)
+            try:
+                client.flush(timeout=remaining)
+            except Exception:
+                LOGGER.debug("Failed to flush Opik client", exc_info=True)
+
+    flushing_thread = threading.Thread(target=flush, daemon=True)
+    flushing_thread.start()
+    flushing_thread.join(timeout)
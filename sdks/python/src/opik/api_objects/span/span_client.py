@@ -3,7 +3,7 @@ import logging
 from typing import Any, Dict, List, Optional, Union
 
 from opik import datetime_helpers, id_helpers, llm_usage
-from opik.message_processing import messages, streamer
+from opik.message_processing import async_streamer, messages, streamer
 
 from opik.types import (
     DistributedTraceHeadersDict,
@@ -22,7 +22,7 @@ class Span:
         id: str,
         trace_id: str,
         project_name: str,
-        message_streamer: streamer.Streamer,
+        message_streamer: Union[streamer.Streamer, async_streamer.AsyncStreamer],
         parent_span_id: Optional[str] = None,
     ):
         """
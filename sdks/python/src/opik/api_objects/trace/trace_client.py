@@ -4,7 +4,7 @@ from typing import Any, Dict, List, Optional, Union
 
 
 from opik import datetime_helpers, id_helpers, llm_usage
-from opik.message_processing import messages, streamer
+from opik.message_processing import async_streamer, messages, streamer
 from opik.types import ErrorInfoDict, SpanType, LLMProvider
 from .. import constants, span, validation_helpers, helpers
 
@@ -15,7 +15,7 @@ class Trace:
     def __init__(
         self,
         id: str,
-        message_streamer: streamer.Streamer,
+        message_streamer: Union[streamer.Streamer, async_streamer.AsyncStreamer],
         project_name: str,
     ):
         """
@@ -173,6 +173,76 @@ def proxy(
     )  # Reduce uvicorn logging to keep output clean
 
 
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.option(
+    "--address",
+    required=True,
+    help="Unix socket path (or \\\\.\\pipe\\<name> on Windows) to listen at. "
+    "The same value must be configured as `message_forwarding_address` in the processes forwarding the data.",
+)
+def uploader(address: str) -> None:
+    """
+    Start the uploader which receives traces, spans and feedback scores from the local
+    processes configured with `message_forwarding_address` and sends them to the Opik server.
+    The connections are authenticated with `message_forwarding_authkey`, the processes
+    must be configured with the same key.
+    """
+    from opik.api_objects import opik_client
+
+    client = opik_client.Opik(batching=True, _message_forwarding=False)
+    try:
+        client.__internal_api__serve_forwarded_messages__(address)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.end()
+
+
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.argument(
+    "directory", type=click.Path(exists=True, file_okay=False, dir_okay=True)
+)
+@click.option(
+    "--delete-uploaded",
+    is_flag=True,
+    default=False,
+    help="Delete the files after they are uploaded.",
+)
+def upload(directory: str, delete_uploaded: bool) -> None:
+    """
+    Upload the traces, spans and feedback scores written to DIRECTORY by the clients
+    configured with `local_sink_directory` to the Opik server.
+
+    The incomplete files left by the processes which are not running anymore are
+    uploaded too. The upload stops at the first file which fails to be uploaded.
+    """
+    from opik.api_objects import opik_client
+
+    client = opik_client.Opik(_local_sink=False)
+    try:
+        stats = client.__internal_api__upload_local_sink__(
+            directory, delete_uploaded=delete_uploaded
+        )
+    finally:
+        client.end()
+
+    console.print(
+        f"Uploaded {stats.uploaded_records} records from {stats.uploaded_files} files"
+    )
+    if stats.recovered_files > 0:
+        console.print(
+            f"Recovered {stats.recovered_files} incomplete files of the processes which are not running anymore"
+        )
+    if stats.incomplete_files > 0:
+        console.print(
+            f"Skipped {stats.incomplete_files} incomplete files (still being written or not closed properly)"
+        )
+    if stats.failed_files > 0:
+        raise click.ClickException(
+            "Failed to upload a file, it and the next files were kept, see the log for details"
+        )
+
+
 @cli.command(context_settings={"ignore_unknown_options": True})
 @click.option(
     "--show-installed-packages",
@@ -129,6 +129,104 @@ class OpikConfig(pydantic_settings.BaseSettings):
     The amount of background threads that submit data to the backend.
     """
 
+    background_max_in_flight_batch_requests: int = 4
+    """
+    Maximum number of concurrent requests to every bulk ingestion endpoint (spans, traces).
+    Batches which are too big for one request are split into several requests sent concurrently within this limit.
+    """
+
+    message_queue_max_size: int = 100_000
+    """
+    Maximum number of messages waiting in the background queue to be sent to the backend.
+    When the limit is reached, `message_queue_backpressure_policy` decides what happens to new messages.
+    0 means no limit.
+    """
+
+    message_queue_max_size_bytes: Optional[int] = None
+    """
+    Maximum estimated size (in bytes) of messages waiting in the background queue.
+    When the limit is reached, `message_queue_backpressure_policy` decides what happens to new messages.
+    If it's not set - there is no limit.
+    """
+
+    message_queue_backpressure_policy: Literal[
+        "block", "drop_oldest", "drop_newest", "spill_to_disk"
+    ] = "spill_to_disk"
+    """
+    What to do with a new message when the background queue is full:
+    * "block" - wait until there is a free space in the queue (blocks the tracked code).
+    * "drop_oldest" - discard the oldest messages in the queue.
+    * "drop_newest" - discard the new message.
+    * "spill_to_disk" - write the message to a temporary file and send it once the queue is drained.
+    By default the tracked code is never blocked and nothing is discarded, "block" and
+    the dropping policies have to be chosen explicitly.
+    The number of dropped and spilled messages is available via `Opik().get_message_queue_stats()`.
+    `AsyncOpik` never blocks the event loop, it uses "spill_to_disk" instead of "block".
+    """
+
+    message_queue_spill_directory: Optional[str] = None
+    """
+    Directory for the temporary files used by the "spill_to_disk" backpressure policy.
+    If it's not set - the default temporary directory is used.
+    """
+
+    spool_directory: Optional[str] = None
+    """
+    If set, every message is written to a write-ahead log in this directory before it is sent.
+    Messages that were not sent because the process crashed or exited before everything was flushed
+    are sent when Opik client is created with the same spool directory next time.
+    With the spool enabled, short-lived processes can use a small `default_flush_timeout`
+    without losing data. The directory must not be used by several processes at the same time.
+    """
+
+    adaptive_batching: bool = True
+    """
+    If enabled, the batch sizes and flush intervals used in batching mode are adjusted at runtime:
+    batches shrink when the latency or the rate of 429/5xx errors climbs and grow back (never above
+    the maximum size accepted by the backend) while it responds fast and a lot of data is being sent,
+    and partial batches are sent sooner while the background queue is shallow. The current decisions are available via
+    `Opik().get_adaptive_batching_stats()`.
+    """
+
+    request_compression: Optional[Literal["gzip"]] = None
+    """
+    If set, the bodies of the requests sending traces, spans, feedback scores, dataset items
+    and experiment items to the backend are compressed with this algorithm.
+    If it's not set - requests are not compressed.
+    """
+
+    request_compression_threshold_bytes: int = 1024
+    """
+    Request bodies smaller than this size are not compressed even if `request_compression` is set.
+    """
+
+    message_forwarding_address: Optional[str] = None
+    """
+    Address (Unix socket path, or `\\\\.\\pipe\\<name>` on Windows) of the local uploader process
+    started with `opik uploader --address <address>`. If set, the clients don't send traces, spans
+    and feedback scores to the backend themselves, they forward them to the uploader which batches
+    the data of all the processes of the host and sends it using a single pool of connections.
+    Useful for the servers with many worker processes (gunicorn, Celery, multiprocessing).
+    If it's not set - every process sends its data itself.
+    """
+
+    message_forwarding_authkey: Optional[str] = None
+    """
+    Secret key the connections between the uploader and the processes forwarding the data
+    to it (see `message_forwarding_address`) are authenticated with, it must be the same for all of them.
+    If it's not set - the key stored in `~/.opik_message_forwarding.key` is used, the file
+    is created with a random key on the first use, so the processes of the same user share it.
+    """
+
+    local_sink_directory: Optional[str] = None
+    """
+    If set, traces, spans and feedback scores are not sent to the backend, they are written
+    to the rotated gzip-compressed JSON Lines files in this directory instead.
+    The files can be uploaded later with `opik upload <directory>`.
+    Useful for offline jobs, air-gapped environments and load testing.
+    If it's not set - the data is sent to the backend.
+    """
+
     console_logging_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = (
         "INFO"
     )
@@ -166,6 +264,52 @@ class OpikConfig(pydantic_settings.BaseSettings):
     it might lead to unexpected results for the features that rely on spans/traces created.
     """
 
+    trace_sample_rate: float = 1.0
+    """
+    The probability of logging a trace created by `@track` decorator and `track_LIBRARY(...)` integrations.
+    The decision is made once per trace when it's started: a dropped trace doesn't log any spans,
+    tracked functions called inside it work without capturing inputs and outputs.
+    Can be overridden with `track(sample_rate=...)` or `track(sampler=...)` of the function starting the trace.
+    """
+
+    trace_rate_limit: Optional[float] = None
+    """
+    Maximum number of traces per second created by `@track` decorator in every project,
+    the traces above the limit are dropped the same way as the sampled out ones.
+    The numbers of dropped traces are available via `opik.decorator.sampling.get_stats()`.
+    If it's not set - the number of traces is not limited.
+    """
+
+    encoded_field_max_bytes: int = 65536
+    """
+    Approximate maximum size in bytes of a single numpy array, pandas object or binary value
+    (bytes, bytearray, memoryview) in the logged data. Bigger values are replaced with a summary:
+    the shape and the type of the data with its first elements, rows or bytes.
+    """
+
+    span_field_max_bytes: Optional[int] = None
+    """
+    Approximate maximum size in bytes of the input, the output and the metadata (each of them)
+    of the spans and traces logged by `@track` decorator and `track_LIBRARY(...)` integrations.
+    Bigger values are truncated when they are captured: long strings are cut, the remaining
+    items of lists and dicts are replaced with the markers saying how many of them were removed.
+    Not set by default - the values are not truncated.
+    """
+
+    attachments_directory: Optional[str] = None
+    """
+    If set, big binary values and base64 strings (plain or data URLs, e.g. the images of multimodal
+    LLM requests) in the inputs, outputs and metadata of spans and traces are stored in this directory,
+    once per unique content, and replaced in the logged data with the references to the stored files.
+    If it's not set - the data is logged as it is.
+    """
+
+    attachment_min_size_bytes: int = 65536
+    """
+    Minimum size in bytes of the binary value or base64 string stored as an attachment
+    when `attachments_directory` is set.
+    """
+
     sentry_enable: bool = True
     """
     If set to True, Opik will send the information about the errors to Sentry.
@@ -1,62 +1,79 @@
 import contextvars
 import contextlib
 
-from typing import List, Optional, Generator
+from typing import Optional, Generator
 from opik.api_objects import span, trace
 
 _current_trace_data_context: contextvars.ContextVar[Optional[trace.TraceData]] = (
     contextvars.ContextVar("current_trace_data", default=None)
 )
 
-_spans_data_stack_context: contextvars.ContextVar[List[span.SpanData]] = (
-    contextvars.ContextVar("spans_data_stack", default=[])
+
+class _SpanDataStackNode:
+    """
+    Immutable node of the linked list the span data stack is made of,
+    `parent` is the node below it (None for the bottom of the stack).
+    """
+
+    __slots__ = ("span_data", "parent")
+
+    def __init__(
+        self, span_data: span.SpanData, parent: Optional["_SpanDataStackNode"]
+    ) -> None:
+        self.span_data = span_data
+        self.parent = parent
+
+
+# The top node of the span data stack, None if the stack is empty.
+_spans_data_stack_context: contextvars.ContextVar[Optional[_SpanDataStackNode]] = (
+    contextvars.ContextVar("spans_data_stack", default=None)
+)
+
+# Number of tracked calls of the sampled out trace currently running in the context.
+_sampled_out_calls_depth_context: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "sampled_out_calls_depth", default=0
 )
 
 # Read if you are going to change this module.
 #
-# If you want to add or pop the span from the stack
-# you must NOT do it like that: spans_stack_context.get().append()
+# The span data stack is a persistent linked list: the nodes are never modified,
+# pushing creates a new top node pointing to the current one and popping sets
+# the parent of the top node to the ContextVar. So pushing, popping and reading
+# the top are O(1), and a context copied by asyncio tasks or threads shares
+# the nodes with the original one without seeing the changes made to it later.
 #
-# If you modify the default object in ContextVar (which is a MUTABLE list)
-# these changes will be reflected in any new context which breaks the whole idea
-# of ContextVar.
-#
-# You should append to it like that:
-# span_data_stack = span_data_stack_context.get().copy()
-# span_data_stack_context.set(span_data_stack + [new_element])
-#
-# And pop like that:
-# span_data_stack = spans_stack_context.get().copy()
-# span_data_stack_context.set(span_data_stack[:-1])
+# Never make the nodes mutable or change their fields, such changes
+# would be reflected in every context sharing the node, which breaks
+# the whole idea of ContextVar.
 #
 # The following functions provide an API to work with ContextVars this way
 
 
 def top_span_data() -> Optional[span.SpanData]:
-    if span_data_stack_empty():
+    top = _spans_data_stack_context.get()
+    if top is None:
         return None
 
-    stack = _get_data_stack()
-    return stack[-1]
+    return top.span_data
 
 
 def pop_span_data() -> Optional[span.SpanData]:
-    stack = _get_data_stack()
-    _spans_data_stack_context.set(stack[:-1])
-    return stack[-1]
+    top = _spans_data_stack_context.get()
+    if top is None:
+        return None
+
+    _spans_data_stack_context.set(top.parent)
+    return top.span_data
 
 
 def add_span_data(span: span.SpanData) -> None:
-    stack = _get_data_stack()
-    _spans_data_stack_context.set(stack + [span])
+    _spans_data_stack_context.set(
+        _SpanDataStackNode(span_data=span, parent=_spans_data_stack_context.get())
+    )
 
 
 def span_data_stack_empty() -> bool:
-    return len(_get_data_stack()) == 0
-
-
-def _get_data_stack() -> List[span.SpanData]:
-    return _spans_data_stack_context.get().copy()
+    return _spans_data_stack_context.get() is None
 
 
 def get_trace_data() -> Optional[trace.TraceData]:
@@ -74,9 +91,26 @@ def set_trace_data(trace: Optional[trace.TraceData]) -> None:
     _current_trace_data_context.set(trace)
 
 
+def trace_sampled_out() -> bool:
+    """
+    Returns True if the current context is inside the trace dropped by sampling
+    or rate limiting, tracked functions called in it must not be tracked.
+    """
+    return _sampled_out_calls_depth_context.get() > 0
+
+
+def enter_sampled_out_call() -> None:
+    _sampled_out_calls_depth_context.set(_sampled_out_calls_depth_context.get() + 1)
+
+
+def exit_sampled_out_call() -> None:
+    _sampled_out_calls_depth_context.set(_sampled_out_calls_depth_context.get() - 1)
+
+
 def clear_all() -> None:
     _current_trace_data_context.set(None)
-    _spans_data_stack_context.set([])
+    _spans_data_stack_context.set(None)
+    _sampled_out_calls_depth_context.set(0)
 
 
 @contextlib.contextmanager
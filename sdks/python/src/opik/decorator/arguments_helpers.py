@@ -1,7 +1,8 @@
 import dataclasses
 from typing import Any, Callable, Dict, List, Optional, Union
 
-from .. import datetime_helpers, llm_usage
+from .. import datetime_helpers, llm_usage, payload_truncation
+from . import sampling
 from ..api_objects import helpers, span
 from ..types import ErrorInfoDict, SpanType
 
@@ -17,6 +18,30 @@ class BaseArguments:
 
         return result
 
+    def truncate_payload(self) -> None:
+        """
+        Truncates the input, the output and the metadata (the ones this class has)
+        to the `span_field_max_bytes` configuration option.
+        """
+        max_size_bytes = payload_truncation.get_span_field_max_bytes()
+        if max_size_bytes is None:
+            return
+
+        attachment_min_size_bytes = payload_truncation.get_attachment_min_size_bytes()
+        for name in _PAYLOAD_FIELDS:
+            value = getattr(self, name, None)
+            if value is not None:
+                setattr(
+                    self,
+                    name,
+                    payload_truncation.truncate(
+                        value, max_size_bytes, attachment_min_size_bytes
+                    ),
+                )
+
+
+_PAYLOAD_FIELDS = ["input", "output", "metadata"]
+
 
 @dataclasses.dataclass
 class EndSpanParameters(BaseArguments):
@@ -68,6 +93,8 @@ class TrackOptions(BaseArguments):
     generations_aggregator: Optional[Callable[[List[Any]], Any]]
     flush: bool
     project_name: Optional[str]
+    sample_rate: Optional[float] = None
+    sampler: Optional[sampling.TraceSamplerCallable] = None
 
 
 def create_span_data(
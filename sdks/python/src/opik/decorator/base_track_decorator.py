@@ -20,9 +20,11 @@ from . import (
     generator_wrappers,
     inspect_helpers,
     error_info_collector,
+    sampling,
+    tracing_runtime_config,
 )
 from ..api_objects import opik_client, span, trace
-from .. import context_storage, logging_messages, config
+from .. import context_storage, logging_messages
 from . import span_creation_handler
 
 LOGGER = logging.getLogger(__name__)
@@ -49,10 +51,9 @@ class BaseTrackDecorator(abc.ABC):
         self.provider: Optional[str] = None
         """ Name of the LLM provider. Used in subclasses in integrations track decorators. """
 
-    @functools.cached_property
+    @property
     def disabled(self) -> bool:
-        config_ = config.OpikConfig()
-        return config_.track_disable
+        return not tracing_runtime_config.is_tracing_active()
 
     def track(
         self,
@@ -66,6 +67,8 @@ class BaseTrackDecorator(abc.ABC):
         generations_aggregator: Optional[Callable[[List[Any]], Any]] = None,
         flush: bool = False,
         project_name: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        sampler: Optional[sampling.TraceSamplerCallable] = None,
     ) -> Union[Callable, Callable[[Callable], Callable]]:
         """
         Decorator to track the execution of a function.
@@ -83,6 +86,11 @@ class BaseTrackDecorator(abc.ABC):
             generations_aggregator: Function to aggregate generation results.
             flush: Whether to flush the client after logging.
             project_name: The name of the project to log data.
+            sample_rate: The probability of logging the trace started by this function,
+                overrides `trace_sample_rate` configuration option.
+            sampler: Custom sampler called with the function name and its arguments
+                when this function starts a trace, the trace is logged if it returns True.
+                Overrides the sample rate.
 
         Returns:
             Callable: The decorated function(if used without parentheses)
@@ -107,6 +115,8 @@ class BaseTrackDecorator(abc.ABC):
             generations_aggregator=generations_aggregator,
             flush=flush,
             project_name=project_name,
+            sample_rate=sample_rate,
+            sampler=sampler,
         )
 
         if callable(name):
@@ -153,6 +163,9 @@ class BaseTrackDecorator(abc.ABC):
         So these spans can't be parents for other spans. This is usually the case LLM API calls
         with `stream=True`.
         """
+        # computed once here instead of inspecting the signature on every call
+        inspect_helpers.get_arguments_binder(func)
+
         if inspect.isgeneratorfunction(func):
             return self._tracked_sync_generator(func=func, track_options=track_options)
 
@@ -178,11 +191,26 @@ class BaseTrackDecorator(abc.ABC):
     ) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:  # type: ignore
+            if not tracing_runtime_config.is_tracing_active():
+                kwargs.pop("opik_distributed_trace_headers", None)
+                return func(*args, **kwargs)
+
             try:
                 opik_distributed_trace_headers: Optional[
                     DistributedTraceHeadersDict
                 ] = kwargs.pop("opik_distributed_trace_headers", None)
 
+                if not self._trace_sampled(
+                    func=func,
+                    track_options=track_options,
+                    args=args,
+                    kwargs=kwargs,
+                    distributed_trace_headers=opik_distributed_trace_headers,
+                ):
+                    return generator_wrappers.sampled_out_sync_generator(
+                        func(*args, **kwargs)
+                    )
+
                 start_span_arguments = self._start_span_inputs_preprocessor(
                     func=func,
                     track_options=track_options,
@@ -227,11 +255,26 @@ class BaseTrackDecorator(abc.ABC):
     ) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:  # type: ignore
+            if not tracing_runtime_config.is_tracing_active():
+                kwargs.pop("opik_distributed_trace_headers", None)
+                return func(*args, **kwargs)
+
             try:
                 opik_distributed_trace_headers: Optional[
                     DistributedTraceHeadersDict
                 ] = kwargs.pop("opik_distributed_trace_headers", None)
 
+                if not self._trace_sampled(
+                    func=func,
+                    track_options=track_options,
+                    args=args,
+                    kwargs=kwargs,
+                    distributed_trace_headers=opik_distributed_trace_headers,
+                ):
+                    return generator_wrappers.sampled_out_async_generator(
+                        func(*args, **kwargs)
+                    )
+
                 start_span_arguments = self._start_span_inputs_preprocessor(
                     func=func,
                     track_options=track_options,
@@ -276,12 +319,20 @@ class BaseTrackDecorator(abc.ABC):
     ) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:  # type: ignore
-            self._before_call(
+            if not tracing_runtime_config.is_tracing_active():
+                kwargs.pop("opik_distributed_trace_headers", None)
+                return func(*args, **kwargs)
+
+            if not self._before_call(
                 func=func,
                 track_options=track_options,
                 args=args,
                 kwargs=kwargs,
-            )
+            ):
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    context_storage.exit_sampled_out_call()
 
             result = None
             error_info: Optional[ErrorInfoDict] = None
@@ -326,12 +377,21 @@ class BaseTrackDecorator(abc.ABC):
     ) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:  # type: ignore
-            self._before_call(
+            if not tracing_runtime_config.is_tracing_active():
+                kwargs.pop("opik_distributed_trace_headers", None)
+                return await func(*args, **kwargs)
+
+            if not self._before_call(
                 func=func,
                 track_options=track_options,
                 args=args,
                 kwargs=kwargs,
-            )
+            ):
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    context_storage.exit_sampled_out_call()
+
             result = None
             error_info: Optional[ErrorInfoDict] = None
             try:
@@ -373,12 +433,27 @@ class BaseTrackDecorator(abc.ABC):
         track_options: arguments_helpers.TrackOptions,
         args: Tuple,
         kwargs: Dict[str, Any],
-    ) -> None:
+    ) -> bool:
+        """
+        Starts the span of the tracked call. Returns False if the call belongs to the trace
+        dropped by sampling, such call is not tracked and must be finished with
+        `context_storage.exit_sampled_out_call()` instead of `_after_call`.
+        """
         try:
             opik_distributed_trace_headers: Optional[DistributedTraceHeadersDict] = (
                 kwargs.pop("opik_distributed_trace_headers", None)
             )
 
+            if not self._trace_sampled(
+                func=func,
+                track_options=track_options,
+                args=args,
+                kwargs=kwargs,
+                distributed_trace_headers=opik_distributed_trace_headers,
+            ):
+                context_storage.enter_sampled_out_call()
+                return False
+
             start_span_arguments = self._start_span_inputs_preprocessor(
                 func=func,
                 track_options=track_options,
@@ -407,6 +482,52 @@ class BaseTrackDecorator(abc.ABC):
                 exc_info=True,
             )
 
+        return True
+
+    def _trace_sampled(
+        self,
+        func: Callable,
+        track_options: arguments_helpers.TrackOptions,
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        distributed_trace_headers: Optional[DistributedTraceHeadersDict],
+    ) -> bool:
+        """
+        The sampling decision is made once per trace, by the call starting it.
+        The calls inside a dropped trace are dropped too, without any other checks.
+        """
+        if distributed_trace_headers is not None:
+            # the trace was started (and sampled) by the remote caller
+            return distributed_trace_headers.get("opik_sampled", True)
+
+        if context_storage.trace_sampled_out():
+            return False
+
+        if (
+            context_storage.top_span_data() is not None
+            or context_storage.get_trace_data() is not None
+        ):
+            return True
+
+        try:
+            return sampling.get_trace_sampler_cached().should_sample(
+                name=track_options.name
+                if track_options.name is not None
+                else func.__name__,
+                project_name=track_options.project_name,
+                args=args,
+                kwargs=kwargs,
+                sample_rate=track_options.sample_rate,
+                sampler=track_options.sampler,
+            )
+        except Exception:
+            LOGGER.error(
+                "Failed to make a sampling decision for the trace of %s, the trace is logged",
+                func.__name__,
+                exc_info=True,
+            )
+            return True
+
     def _after_call(
         self,
         output: Optional[Any],
@@ -416,9 +537,6 @@ class BaseTrackDecorator(abc.ABC):
         generators_trace_to_end: Optional[trace.TraceData] = None,
         flush: bool = False,
     ) -> None:
-        if self.disabled:
-            return
-
         try:
             if output is not None:
                 end_arguments = self._end_span_inputs_preprocessor(
@@ -429,6 +547,7 @@ class BaseTrackDecorator(abc.ABC):
                 end_arguments = arguments_helpers.EndSpanParameters(
                     error_info=error_info
                 )
+            end_arguments.truncate_payload()
 
             if generators_span_to_end is None:
                 span_data_to_end, trace_data_to_end = pop_end_candidates()
@@ -444,7 +563,7 @@ class BaseTrackDecorator(abc.ABC):
                 **end_arguments.to_kwargs(),
             )
 
-            client.span(**span_data_to_end.__dict__)
+            client.__internal_api__log_span_data__(span_data_to_end)
 
             if trace_data_to_end is not None:
                 trace_data_to_end.init_end_time().update(
@@ -453,7 +572,7 @@ class BaseTrackDecorator(abc.ABC):
                     ),
                 )
 
-                client.trace(**trace_data_to_end.__dict__)
+                client.__internal_api__log_trace_data__(trace_data_to_end)
 
             if flush:
                 client.flush()
@@ -170,6 +170,43 @@ class AsyncTrackedGenerator(BaseTrackedGenerator[YieldType]):
             raise
 
 
+def sampled_out_sync_generator(
+    generator: Generator[YieldType, None, None],
+) -> Generator[YieldType, None, None]:
+    """
+    Iterates the generator started by the sampled out trace,
+    the tracked functions it calls are not tracked either.
+    """
+    while True:
+        context_storage.enter_sampled_out_call()
+        try:
+            value = next(generator)
+        except StopIteration:
+            return
+        finally:
+            context_storage.exit_sampled_out_call()
+
+        yield value
+
+
+async def sampled_out_async_generator(
+    generator: AsyncGenerator[YieldType, None],
+) -> AsyncGenerator[YieldType, None]:
+    """
+    Async version of `sampled_out_sync_generator`.
+    """
+    while True:
+        context_storage.enter_sampled_out_call()
+        try:
+            value = await generator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            context_storage.exit_sampled_out_call()
+
+        yield value
+
+
 def _try_aggregate_items(
     items: List[Any], generations_aggregator: Optional[Callable[[List[Any]], str]]
 ) -> str:
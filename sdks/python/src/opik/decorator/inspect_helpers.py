@@ -1,22 +1,125 @@
 import inspect
+import weakref
 
-from typing import Callable, Tuple, Any, Dict
+from typing import Callable, List, Optional, Tuple, Any, Dict
+
+_MISSING = inspect.Parameter.empty
+
+_binders_cache: "weakref.WeakKeyDictionary[Callable, ArgumentsBinder]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class ArgumentsBinder:
+    """
+    Maps the arguments of the function call to the names of its parameters,
+    the same way as `inspect.Signature.bind` followed by `apply_defaults` does.
+
+    The signature is computed once. The functions without `*args` and `**kwargs`
+    are bound without `inspect.Signature.bind` when the arguments fit the parameters
+    (that's the case for every successful call), other calls fall back to it.
+    """
+
+    def __init__(self, func: Callable) -> None:
+        self._signature: Optional[inspect.Signature]
+        try:
+            self._signature = inspect.signature(func)
+        except (ValueError, TypeError):  # some builtins and C extensions
+            self._signature = None
+
+        # parameters of the fast path, None if the function has variadic parameters
+        self._names: Optional[List[str]] = None
+        self._defaults: List[Any] = []
+        self._min_positional = 0
+        self._max_positional = 0
+
+        if self._signature is not None:
+            self._compile(self._signature)
+
+    def bind(self, args: Tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._names is not None:
+            arguments = self._bind_fast(self._names, args, kwargs)
+            if arguments is not None:
+                return arguments
+
+        if self._signature is None:
+            return {"args": args, "kwargs": kwargs}
+
+        try:
+            bound_args = self._signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            return dict(bound_args.arguments)
+        except TypeError:
+            return {"args": args, "kwargs": kwargs}
+
+    def _compile(self, signature: inspect.Signature) -> None:
+        names = []
+        for parameter in signature.parameters.values():
+            if parameter.kind in (
+                inspect.Parameter.VAR_POSITIONAL,
+                inspect.Parameter.VAR_KEYWORD,
+            ):
+                return
+
+            if parameter.kind == inspect.Parameter.POSITIONAL_ONLY:
+                self._min_positional += 1
+            if parameter.kind != inspect.Parameter.KEYWORD_ONLY:
+                self._max_positional += 1
+
+            names.append(parameter.name)
+            self._defaults.append(parameter.default)
+
+        self._names = names
+
+    def _bind_fast(
+        self, names: List[str], args: Tuple, kwargs: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        positional_count = len(args)
+        if not self._min_positional <= positional_count <= self._max_positional:
+            return None
+
+        arguments = dict(zip(names, args))
+        if positional_count == len(names):
+            return arguments if not kwargs else None
+
+        used_kwargs = 0
+        for index in range(positional_count, len(names)):
+            name = names[index]
+            value = kwargs.get(name, _MISSING)
+            if value is _MISSING:
+                value = self._defaults[index]
+                if value is _MISSING:
+                    return None  # missing required argument
+            else:
+                used_kwargs += 1
+            arguments[name] = value
+
+        if used_kwargs != len(kwargs):
+            return None  # unexpected keyword arguments
+
+        return arguments
+
+
+def get_arguments_binder(func: Callable) -> ArgumentsBinder:
+    """
+    Returns the cached arguments binder of the function, creates it on the first call.
+    """
+    try:
+        binder = _binders_cache.get(func)
+    except TypeError:  # the object can't be weakly referenced
+        return ArgumentsBinder(func)
+
+    if binder is None:
+        binder = ArgumentsBinder(func)
+        _binders_cache[func] = binder
+
+    return binder
 
 
 def extract_inputs(
     func: Callable, args: Tuple, kwargs: Dict[str, Any]
 ) -> Dict[str, Any]:
-    sig = inspect.signature(func)
-
-    try:
-        bound_args = sig.bind(*args, **kwargs)  # type: ignore
-        bound_args.apply_defaults()
-        arg_dict = dict(bound_args.arguments)
-    except TypeError:
-        arg_dict = {
-            "args": args,
-            "kwargs": kwargs,
-        }
+    arg_dict = get_arguments_binder(func).bind(args, kwargs)
 
     if "self" in arg_dict:
         arg_dict.pop("self")
@@ -0,0 +1,152 @@
+import dataclasses
+import functools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .. import config
+
+TraceSamplerCallable = Callable[[str, Tuple, Dict[str, Any]], bool]
+"""
+Custom sampler passed to `track(sampler=...)`. Called with the name of the tracked
+function and its positional and keyword arguments when the function starts a new trace,
+returns True if the trace must be logged.
+"""
+
+
+@dataclasses.dataclass
+class SamplingStats:
+    sampled_out_traces: int
+    """Number of traces dropped by the sample rate or by a custom sampler."""
+
+    rate_limited_traces: int
+    """Number of traces dropped because the rate limit of their project was exceeded."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, allows `rate` acquisitions per second on average
+    with bursts of up to `capacity` acquisitions.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._last_refill) * self._rate
+            )
+            self._last_refill = now
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+
+class TraceSampler:
+    """
+    Decides whether a trace started by a tracked function is logged. The decision is
+    made once per trace, all the spans of a dropped trace are not tracked.
+
+    A trace is dropped if the custom sampler returns False (or, if there is no custom sampler,
+    with probability `1 - sample_rate`), or if the traces of its project are created faster
+    than `max_traces_per_second`.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        max_traces_per_second: Optional[float] = None,
+    ) -> None:
+        self._sample_rate = sample_rate
+        self._max_traces_per_second = max_traces_per_second
+
+        self._lock = threading.Lock()
+        self._rate_limiters: Dict[Optional[str], TokenBucket] = {}
+        self._sampled_out_traces = 0
+        self._rate_limited_traces = 0
+
+    def should_sample(
+        self,
+        name: str,
+        project_name: Optional[str],
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        sample_rate: Optional[float] = None,
+        sampler: Optional[TraceSamplerCallable] = None,
+    ) -> bool:
+        """
+        Args:
+            name: The name of the tracked function starting the trace.
+            project_name: The project of the trace, None for the default one.
+            args: Positional arguments of the tracked function.
+            kwargs: Keyword arguments of the tracked function.
+            sample_rate: Overrides the configured sample rate.
+            sampler: Custom sampler, overrides the sample rate.
+        """
+        if sampler is not None:
+            sampled = sampler(name, args, kwargs)
+        else:
+            sample_rate = self._sample_rate if sample_rate is None else sample_rate
+            sampled = sample_rate >= 1.0 or random.random() < sample_rate
+
+        if not sampled:
+            with self._lock:
+                self._sampled_out_traces += 1
+            return False
+
+        if self._max_traces_per_second is None:
+            return True
+
+        if not self._get_rate_limiter(project_name).try_acquire():
+            with self._lock:
+                self._rate_limited_traces += 1
+            return False
+
+        return True
+
+    def get_stats(self) -> SamplingStats:
+        with self._lock:
+            return SamplingStats(
+                sampled_out_traces=self._sampled_out_traces,
+                rate_limited_traces=self._rate_limited_traces,
+            )
+
+    def _get_rate_limiter(self, project_name: Optional[str]) -> TokenBucket:
+        assert self._max_traces_per_second is not None
+
+        with self._lock:
+            rate_limiter = self._rate_limiters.get(project_name)
+            if rate_limiter is None:
+                rate_limiter = TokenBucket(
+                    rate=self._max_traces_per_second,
+                    capacity=max(1.0, self._max_traces_per_second),
+                )
+                self._rate_limiters[project_name] = rate_limiter
+
+            return rate_limiter
+
+
+@functools.lru_cache()
+def get_trace_sampler_cached() -> TraceSampler:
+    config_ = config.OpikConfig()
+    return TraceSampler(
+        sample_rate=config_.trace_sample_rate,
+        max_traces_per_second=config_.trace_rate_limit,
+    )
+
+
+def get_stats() -> SamplingStats:
+    """
+    Returns the number of traces dropped by the sampling and the rate limiting of `@track`.
+    """
+    return get_trace_sampler_cached().get_stats()
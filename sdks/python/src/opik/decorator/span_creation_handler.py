@@ -20,6 +20,8 @@ def create_span_for_current_context(
     span_data: span.SpanData
     trace_data: trace.TraceData
 
+    start_span_arguments.truncate_payload()
+
     if distributed_trace_headers:
         span_data = arguments_helpers.create_span_data(
             start_span_arguments=start_span_arguments,
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from .. import config
+
+# None means the value hasn't been read from the configuration yet.
+_tracing_active: Optional[bool] = None
+
+
+def is_tracing_active() -> bool:
+    """
+    Returns False if tracking is disabled, either by the `track_disable` configuration
+    option or by `set_tracing_active(False)`. Tracked functions called while tracking
+    is disabled just call the original function.
+
+    The configuration is read once, on the first call.
+    """
+    global _tracing_active
+
+    if _tracing_active is None:
+        _tracing_active = not config.OpikConfig().track_disable
+
+    return _tracing_active
+
+
+def set_tracing_active(active: bool) -> None:
+    """
+    Enables or disables tracking at runtime, overrides the `track_disable`
+    configuration option. The calls of tracked functions which are already
+    running are logged as usual.
+    """
+    global _tracing_active
+
+    _tracing_active = active
+
+
+def reset_tracing_to_config_default() -> None:
+    """
+    Discards the value set by `set_tracing_active`, the `track_disable`
+    configuration option is read again on the next check.
+    """
+    global _tracing_active
+
+    _tracing_active = None
@@ -1,25 +1,47 @@
-from typing import Optional, Dict, Any, Union
+import gzip
+from typing import Literal, Optional, Dict, Any, Union
 import httpx
 import os
 from . import hooks, package_version
 import platform
 
-
 CABundlePath = str
+# the backend decompresses only gzip request bodies
+CompressionAlgorithm = Literal["gzip"]
+
+GZIP_COMPRESSION_LEVEL = 6
+
+# (method, path suffix) of the endpoints receiving large bodies of traces, spans and datasets data
+_BULK_INGESTION_ENDPOINTS = {
+    ("POST", "/v1/private/spans/batch"),
+    ("POST", "/v1/private/traces/batch"),
+    ("PUT", "/v1/private/spans/feedback-scores"),
+    ("PUT", "/v1/private/traces/feedback-scores"),
+    ("PUT", "/v1/private/datasets/items"),
+    ("POST", "/v1/private/experiments/items"),
+}
 
 
 def get(
-    workspace: Optional[str], api_key: Optional[str], check_tls_certificate: bool
+    workspace: Optional[str],
+    api_key: Optional[str],
+    check_tls_certificate: bool,
+    compression: Optional[CompressionAlgorithm] = None,
+    compression_threshold_bytes: int = 0,
 ) -> httpx.Client:
     limits = httpx.Limits(keepalive_expiry=30)
 
-    verify: Union[bool, CABundlePath] = (
-        os.environ["SSL_CERT_FILE"]
-        if check_tls_certificate is True and "SSL_CERT_FILE" in os.environ
-        else check_tls_certificate
-    )
+    verify = _get_verify(check_tls_certificate)
 
-    client = httpx.Client(limits=limits, verify=verify)
+    if compression is None:
+        client = httpx.Client(limits=limits, verify=verify)
+    else:
+        transport = CompressingTransport(
+            transport=httpx.HTTPTransport(limits=limits, verify=verify),
+            compression=compression,
+            threshold_bytes=compression_threshold_bytes,
+        )
+        client = httpx.Client(limits=limits, verify=verify, transport=transport)
 
     headers = _prepare_headers(workspace=workspace, api_key=api_key)
     client.headers.update(headers)
@@ -29,6 +51,138 @@ def get(
     return client
 
 
+def get_async(
+    workspace: Optional[str],
+    api_key: Optional[str],
+    check_tls_certificate: bool,
+    compression: Optional[CompressionAlgorithm] = None,
+    compression_threshold_bytes: int = 0,
+) -> httpx.AsyncClient:
+    """
+    Asynchronous counterpart of `get`. The hooks registered via
+    `hooks.register_httpx_client_hook` expect a synchronous client and are not run.
+    """
+    limits = httpx.Limits(keepalive_expiry=30)
+    verify = _get_verify(check_tls_certificate)
+
+    if compression is None:
+        client = httpx.AsyncClient(limits=limits, verify=verify)
+    else:
+        transport = AsyncCompressingTransport(
+            transport=httpx.AsyncHTTPTransport(limits=limits, verify=verify),
+            compression=compression,
+            threshold_bytes=compression_threshold_bytes,
+        )
+        client = httpx.AsyncClient(limits=limits, verify=verify, transport=transport)
+
+    headers = _prepare_headers(workspace=workspace, api_key=api_key)
+    client.headers.update(headers)
+
+    return client
+
+
+class CompressingTransport(httpx.BaseTransport):
+    """
+    Compresses the bodies of the requests to the bulk ingestion endpoints
+    which are at least `threshold_bytes` long, and passes all the requests
+    to the wrapped transport.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        compression: CompressionAlgorithm,
+        threshold_bytes: int,
+    ) -> None:
+        self._transport = transport
+        self._compression = compression
+        self._threshold_bytes = threshold_bytes
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not _should_compress(request):
+            return self._transport.handle_request(request)
+
+        body = request.read()
+        if len(body) < self._threshold_bytes:
+            return self._transport.handle_request(request)
+
+        return self._transport.handle_request(
+            _compressed_request(request, body, self._compression)
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncCompressingTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous counterpart of `CompressingTransport`.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        compression: CompressionAlgorithm,
+        threshold_bytes: int,
+    ) -> None:
+        self._transport = transport
+        self._compression = compression
+        self._threshold_bytes = threshold_bytes
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not _should_compress(request):
+            return await self._transport.handle_async_request(request)
+
+        body = await request.aread()
+        if len(body) < self._threshold_bytes:
+            return await self._transport.handle_async_request(request)
+
+        return await self._transport.handle_async_request(
+            _compressed_request(request, body, self._compression)
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def compress(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_COMPRESSION_LEVEL)
+
+
+def _should_compress(request: httpx.Request) -> bool:
+    if "Content-Encoding" in request.headers:
+        return False
+
+    return any(
+        request.method == method and request.url.path.endswith(path_suffix)
+        for method, path_suffix in _BULK_INGESTION_ENDPOINTS
+    )
+
+
+def _compressed_request(
+    request: httpx.Request, body: bytes, compression: CompressionAlgorithm
+) -> httpx.Request:
+    compressed_body = compress(body)
+    headers = request.headers.copy()
+    headers["Content-Encoding"] = compression
+    headers["Content-Length"] = str(len(compressed_body))
+
+    return httpx.Request(
+        method=request.method,
+        url=request.url,
+        headers=headers,
+        content=compressed_body,
+        extensions=request.extensions,
+    )
+
+
+def _get_verify(check_tls_certificate: bool) -> Union[bool, CABundlePath]:
+    if check_tls_certificate is True and "SSL_CERT_FILE" in os.environ:
+        return os.environ["SSL_CERT_FILE"]
+
+    return check_tls_certificate
+
+
 def _prepare_headers(
     workspace: Optional[str], api_key: Optional[str]
 ) -> Dict[str, Any]:
@@ -32,7 +32,7 @@ class LlamaIndexCallbackHandler(base_handler.BaseCallbackHandler):
 
         self._project_name = project_name
         self._opik_client = opik_client.Opik(
-            _use_batching=True,
+            batching=True,
             project_name=project_name,
         )
 
@@ -1,14 +1,18 @@
+import base64
 import dataclasses
 import datetime as dt
+import functools
 import logging
+import sys
 from enum import Enum
 from pathlib import PurePath
 from types import GeneratorType
-from typing import Any, Callable, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
 
 import pydantic
 
 import opik.rest_api.core.datetime_utils as datetime_utils
+from opik import config
 
 try:
     import numpy as np
@@ -19,9 +23,49 @@ LOGGER = logging.getLogger(__name__)
 
 _ENCODER_EXTENSIONS: Set[Tuple[Type, Callable[[Any], Any]]] = set()
 
+# Engineer note:
+#
+# The encoder is called for every span and trace payload, so it doesn't recurse
+# and doesn't run the chain of isinstance checks for every value. The way of encoding
+# is resolved once per exact type (see `_resolve_encoding`) and cached. Objects are
+# encoded with an explicit stack: every container gets its encoded copy right away
+# and its items are written into it when they are popped from the stack.
+# Values of the JSON-native types are copied without being pushed to the stack.
+#
+# Only containers and objects encoded via their `__dict__` can create cycles,
+# so only their ids are tracked. An id is kept while the items of the container
+# are being encoded, the same object can appear again at a sibling branch.
+
+_SCALAR = 0  # returned as is
+_LEAF = 1  # replaced with the result of the converter, which is not encoded further
+_CONVERTED = 2  # replaced with the result of the converter, which is encoded further
+_DICT = 3
+_SEQUENCE = 4
+_OBJECT = 5  # dataclasses and pydantic models, their __dict__ is encoded
+
+_Encoding = Tuple[int, Optional[Callable[[Any], Any]]]
+
+_NATIVE_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+_SEQUENCE_TYPES = (list, set, frozenset, GeneratorType, tuple)
+
+_MAX_CACHED_TYPES = 1000
+_encodings_cache: Dict[Type, _Encoding] = {
+    type_: (_SCALAR, None) for type_ in _NATIVE_SCALAR_TYPES
+}
+
+# marks the stack entry which removes the container id from the tracked ones
+_EXIT_CONTAINER = object()
+
+# Rough size of a number or a short string in JSON, used to estimate the size
+# of numpy arrays and pandas objects without encoding them.
+_ESTIMATED_ELEMENT_JSON_BYTES = 24
+_PREVIEW_BYTES = 96
+_PREVIEW_ROWS = 5
+
 
 def register_encoder_extension(obj_type: Type, encoder: Callable[[Any], Any]) -> None:
     _ENCODER_EXTENSIONS.add((obj_type, encoder))
+    _clear_encodings_cache()
 
 
 def jsonable_encoder(obj: Any, seen: Optional[Set[int]] = None) -> Any:
@@ -29,64 +73,255 @@ def jsonable_encoder(obj: Any, seen: Optional[Set[int]] = None) -> Any:
     This is a modified version of the serializer generated by Fern in rest_api.core.jsonable_encoder.
     The code is simplified to serialize complex objects into a textual representation.
     It also handles cyclic references to avoid infinite recursion.
+
+    Args:
+        obj: The object to encode.
+        seen: Ids of the objects which must be replaced with the cyclic reference marker.
+    """
+    if type(obj) in _NATIVE_SCALAR_TYPES:
+        return obj
+
+    in_progress: Set[int] = set(seen) if seen is not None else set()
+
+    result: List[Any] = [None]
+    # (value, container to write the encoded value to, key or index in it),
+    # or (_EXIT_CONTAINER, container, None)
+    stack: List[Tuple[Any, Any, Any]] = [(obj, result, 0)]
+
+    while stack:
+        value, target, key = stack.pop()
+
+        if value is _EXIT_CONTAINER:
+            in_progress.discard(id(target))
+            continue
+
+        kind, converter = _encodings_cache.get(type(value)) or _cache_encoding(
+            type(value)
+        )
+
+        if kind == _SCALAR:
+            target[key] = value
+            continue
+
+        if kind >= _DICT:
+            obj_id = id(value)
+            if obj_id in in_progress:
+                LOGGER.debug(
+                    f"Found cyclic reference to {type(value).__name__} id={obj_id}"
+                )
+                target[key] = (
+                    f"<Cyclic reference to {type(value).__name__} id={obj_id}>"
+                )
+                continue
+
+            # Popped after the items of the container pushed above it are encoded.
+            # Keeps the container alive, so its id can't be reused until then.
+            exit_position = len(stack)
+            stack.append((_EXIT_CONTAINER, value, None))
+            in_progress.add(obj_id)
+
+        try:
+            if kind == _DICT:
+                target[key] = _start_dict(value, stack)
+            elif kind == _SEQUENCE:
+                target[key] = _start_sequence(value, stack)
+            elif kind == _OBJECT:
+                stack.append((value.__dict__, target, key))
+            elif kind == _CONVERTED:
+                stack.append((converter(value), target, key))  # type: ignore[misc]
+            else:
+                target[key] = converter(value)  # type: ignore[misc]
+        except Exception:
+            LOGGER.debug("Failed to serialize object.", exc_info=True)
+            if kind >= _DICT:
+                del stack[exit_position:]
+                in_progress.discard(obj_id)
+            target[key] = str(value)
+
+    return result[0]
+
+
+def _start_dict(obj: Dict[Any, Any], stack: List[Tuple[Any, Any, Any]]) -> Dict:
+    """
+    Creates the encoded copy of the dict, pushes its items which are not
+    JSON-native values to the stack.
+    """
+    if _NATIVE_SCALAR_TYPES.issuperset(map(type, obj)) and (
+        _NATIVE_SCALAR_TYPES.issuperset(map(type, obj.values()))
+    ):
+        return dict(obj)
+
+    encoded: Dict[Any, Any] = {}
+    pending = []
+    for key, value in obj.items():
+        if type(key) not in _NATIVE_SCALAR_TYPES:
+            key = jsonable_encoder(key)
+
+        if type(value) in _NATIVE_SCALAR_TYPES:
+            encoded[key] = value
+        else:
+            encoded[key] = None
+            pending.append((value, encoded, key))
+
+    # reversed, so the items are encoded in their order
+    stack.extend(reversed(pending))
+    return encoded
+
+
+def _start_sequence(obj: Any, stack: List[Tuple[Any, Any, Any]]) -> List:
+    """
+    Creates the encoded copy of the sequence, pushes its items which are not
+    JSON-native values to the stack.
+    """
+    encoded = list(obj)
+    if _NATIVE_SCALAR_TYPES.issuperset(map(type, encoded)):
+        return encoded
+
+    pending = [
+        (item, encoded, index)
+        for index, item in enumerate(encoded)
+        if type(item) not in _NATIVE_SCALAR_TYPES
+    ]
+    stack.extend(reversed(pending))
+    return encoded
+
+
+def _cache_encoding(type_: Type) -> _Encoding:
+    encoding = _resolve_encoding(type_)
+
+    if len(_encodings_cache) >= _MAX_CACHED_TYPES:
+        # classes created dynamically must not pile up in the cache
+        _clear_encodings_cache()
+    _encodings_cache[type_] = encoding
+
+    return encoding
+
+
+def _resolve_encoding(type_: Type) -> _Encoding:
+    if dataclasses.is_dataclass(type_) or issubclass(type_, pydantic.BaseModel):
+        return _OBJECT, None
+    if issubclass(type_, Enum):
+        return _CONVERTED, _get_enum_value
+    if issubclass(type_, PurePath):
+        return _LEAF, str
+    if issubclass(type_, (str, int, float, type(None))):
+        return _SCALAR, None
+    if issubclass(type_, dt.datetime):
+        return _LEAF, datetime_utils.serialize_datetime
+    if issubclass(type_, dt.date):
+        return _LEAF, str
+    if issubclass(type_, dict):
+        return _DICT, None
+    if issubclass(type_, _SEQUENCE_TYPES):
+        return _SEQUENCE, None
+
+    for extension_type, encoder in _ENCODER_EXTENSIONS:
+        if issubclass(type_, extension_type):
+            return _CONVERTED, encoder
+
+    if issubclass(type_, (bytes, bytearray, memoryview)):
+        return _LEAF, _encode_binary
+
+    if np is not None:
+        if issubclass(type_, np.ndarray):
+            return _CONVERTED, _encode_numpy_array
+        if issubclass(type_, np.generic):
+            return _CONVERTED, np.generic.item
+
+    # pandas and PIL are not imported here, if their objects exist, they are already imported
+    pandas = sys.modules.get("pandas")
+    if pandas is not None:
+        if issubclass(type_, pandas.DataFrame):
+            return _CONVERTED, _encode_pandas_data_frame
+        if issubclass(type_, pandas.Series):
+            return _CONVERTED, _encode_pandas_series
+
+    pil_image = sys.modules.get("PIL.Image")
+    if pil_image is not None and issubclass(type_, pil_image.Image):
+        return _LEAF, _encode_pil_image
+
+    return _LEAF, str
+
+
+def _get_enum_value(obj: Enum) -> Any:
+    return obj.value
+
+
+def _encode_binary(data: Union[bytes, bytearray, memoryview]) -> Dict[str, Any]:
+    """
+    Binary data is replaced with its size and the base64 of its first bytes,
+    or of all of them if they fit the field size limit.
     """
-    if seen is None:
-        seen = set()
-
-    if hasattr(obj, "__dict__"):
-        obj_id = id(obj)
-        if obj_id in seen:
-            LOGGER.debug(f"Found cyclic reference to {type(obj).__name__} id={obj_id}")
-            return f"<Cyclic reference to {type(obj).__name__} id={obj_id}>"
-        seen.add(obj_id)
-
-    try:
-        if dataclasses.is_dataclass(obj) or isinstance(obj, pydantic.BaseModel):
-            obj_dict = obj.__dict__
-            return jsonable_encoder(obj_dict, seen)
-
-        if isinstance(obj, Enum):
-            return jsonable_encoder(obj.value, seen)
-        if isinstance(obj, PurePath):
-            return str(obj)
-        if isinstance(obj, (str, int, float, type(None))):
-            return obj
-        if isinstance(obj, dt.datetime):
-            return datetime_utils.serialize_datetime(obj)
-        if isinstance(obj, dt.date):
-            return str(obj)
-        if isinstance(obj, dict):
-            encoded_dict = {}
-            allowed_keys = set(obj.keys())
-            for key, value in obj.items():
-                if key in allowed_keys:
-                    encoded_key = jsonable_encoder(key, seen)
-                    encoded_value = jsonable_encoder(value, seen)
-                    encoded_dict[encoded_key] = encoded_value
-            return encoded_dict
-        if isinstance(obj, (list, set, frozenset, GeneratorType, tuple)):
-            encoded_list = []
-            for item in obj:
-                encoded_list.append(jsonable_encoder(item, seen))
-            return encoded_list
-
-        for type_, encoder in _ENCODER_EXTENSIONS:
-            if isinstance(obj, type_):
-                return jsonable_encoder(encoder(obj), seen)
-
-        if np is not None and isinstance(obj, np.ndarray):
-            return jsonable_encoder(obj.tolist(), seen)
-
-    except Exception:
-        LOGGER.debug("Failed to serialize object.", exc_info=True)
-
-    finally:
-        # Once done encoding this object, remove from `seen`,
-        # so the same object can appear again at a sibling branch.
-        if hasattr(obj, "__dict__"):
-            obj_id = id(obj)
-            seen.remove(obj_id)
-
-    data = str(obj)
-
-    return data
+    view = memoryview(data).cast("B")
+    size = view.nbytes
+    prefix_size = (
+        size if size * 4 // 3 <= _get_encoded_field_max_bytes() else _PREVIEW_BYTES
+    )
+
+    return {
+        "type": type(data).__name__,
+        "size": size,
+        "base64_prefix": base64.b64encode(view[:prefix_size]).decode("ascii"),
+    }
+
+
+def _encode_numpy_array(array: "np.ndarray") -> Any:
+    element_bytes = max(array.itemsize, _ESTIMATED_ELEMENT_JSON_BYTES)
+    max_elements = _get_encoded_field_max_bytes() // element_bytes
+    if array.size <= max_elements:
+        return array.tolist()
+
+    return {
+        "type": "numpy.ndarray",
+        "dtype": str(array.dtype),
+        "shape": list(array.shape),
+        # `flat` copies only the elements taken, even if the array is not contiguous
+        "head": array.flat[: max(max_elements, 1)].tolist(),
+    }
+
+
+def _encode_pandas_data_frame(data_frame: Any) -> Dict[str, Any]:
+    columns_count = max(len(data_frame.columns), 1)
+    max_rows = _get_encoded_field_max_bytes() // (
+        columns_count * _ESTIMATED_ELEMENT_JSON_BYTES
+    )
+    rows = data_frame if len(data_frame) <= max_rows else data_frame.head(_PREVIEW_ROWS)
+
+    return {
+        "type": "pandas.DataFrame",
+        "shape": list(data_frame.shape),
+        "columns": {str(name): str(dtype) for name, dtype in data_frame.dtypes.items()},
+        "head": rows.to_dict(orient="records"),
+    }
+
+
+def _encode_pandas_series(series: Any) -> Dict[str, Any]:
+    max_rows = _get_encoded_field_max_bytes() // _ESTIMATED_ELEMENT_JSON_BYTES
+    rows = series if len(series) <= max_rows else series.head(_PREVIEW_ROWS)
+
+    return {
+        "type": "pandas.Series",
+        "name": series.name,
+        "dtype": str(series.dtype),
+        "length": len(series),
+        "head": rows.tolist(),
+    }
+
+
+def _encode_pil_image(image: Any) -> Dict[str, Any]:
+    return {
+        "type": "PIL.Image",
+        "mode": image.mode,
+        "size": list(image.size),
+        "format": image.format,
+    }
+
+
+@functools.lru_cache
+def _get_encoded_field_max_bytes() -> int:
+    return config.OpikConfig().encoded_field_max_bytes
+
+
+def _clear_encodings_cache() -> None:
+    _encodings_cache.clear()
+    _encodings_cache.update((type_, (_SCALAR, None)) for type_ in _NATIVE_SCALAR_TYPES)
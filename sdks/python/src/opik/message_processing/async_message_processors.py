@@ -0,0 +1,229 @@
+import abc
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Sequence, Type, Union
+
+from opik import logging_messages
+from . import messages, request_body
+from .message_processors import (
+    BATCH_MEMORY_LIMIT_MB,
+    CREATE_SPANS_BATCH_PATH,
+    CREATE_TRACES_BATCH_PATH,
+    generate_error_fingerprint,
+)
+from ..jsonable_encoder import jsonable_encoder
+from .. import dict_utils
+from ..rest_api.types import feedback_score_batch_item
+from ..rest_api import core as rest_api_core
+from ..rest_api import client as rest_api_client
+from ..rest_client_configurator import retry_decorators
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BaseAsyncMessageProcessor(abc.ABC):
+    @abc.abstractmethod
+    async def process(self, message: messages.BaseMessage) -> None:
+        pass
+
+
+class AsyncMessageSender(BaseAsyncMessageProcessor):
+    def __init__(
+        self,
+        rest_client: rest_api_client.AsyncOpikApi,
+        max_in_flight_batch_requests: int = 1,
+    ):
+        """
+        Asynchronous counterpart of `MessageSender`, all the requests are made
+        by the event loop instead of the background threads.
+
+        `max_in_flight_batch_requests` limits the number of concurrent requests
+        to every bulk create endpoint.
+        """
+        self._rest_client = rest_client
+        self._max_in_flight_batch_requests = max_in_flight_batch_requests
+
+        # semaphores are created on first use, inside the event loop they belong to
+        self._in_flight_batch_requests: Dict[str, asyncio.Semaphore] = {}
+
+        self._handlers: Dict[
+            Type, Callable[[messages.BaseMessage], Awaitable[None]]
+        ] = {
+            messages.CreateSpanMessage: self._process_create_span_message,  # type: ignore
+            messages.CreateTraceMessage: self._process_create_trace_message,  # type: ignore
+            messages.UpdateSpanMessage: self._process_update_span_message,  # type: ignore
+            messages.UpdateTraceMessage: self._process_update_trace_message,  # type: ignore
+            messages.AddTraceFeedbackScoresBatchMessage: self._process_add_trace_feedback_scores_batch_message,  # type: ignore
+            messages.AddSpanFeedbackScoresBatchMessage: self._process_add_span_feedback_scores_batch_message,  # type: ignore
+            messages.CreateSpansBatchMessage: self._process_create_span_batch_message,  # type: ignore
+            messages.CreateTraceBatchMessage: self._process_create_trace_batch_message,  # type: ignore
+            messages.UpdateSpansBatchMessage: self._process_update_messages_batch,  # type: ignore
+            messages.UpdateTracesBatchMessage: self._process_update_messages_batch,  # type: ignore
+        }
+
+    async def process(self, message: messages.BaseMessage) -> None:
+        message_type = type(message)
+        handler = self._handlers.get(message_type)
+        if handler is None:
+            LOGGER.debug("Unknown type of message - %s", message_type.__name__)
+            return
+
+        try:
+            await handler(message)
+        except rest_api_core.ApiError as exception:
+            if exception.status_code == 409:
+                # sometimes retry mechanism works in a way that it sends the same request 2 times.
+                # second request is rejected by the backend, we don't want users to an error.
+                return
+
+            error_fingerprint = generate_error_fingerprint(exception, message)
+            LOGGER.error(
+                logging_messages.FAILED_TO_PROCESS_MESSAGE_IN_BACKGROUND_STREAMER,
+                message_type.__name__,
+                str(exception),
+                extra={"error_fingerprint": error_fingerprint},
+            )
+        except Exception as exception:
+            error_fingerprint = generate_error_fingerprint(exception, message)
+            LOGGER.error(
+                logging_messages.FAILED_TO_PROCESS_MESSAGE_IN_BACKGROUND_STREAMER,
+                message_type.__name__,
+                str(exception),
+                exc_info=True,
+                extra={"error_fingerprint": error_fingerprint},
+            )
+
+    async def _process_create_span_message(
+        self, message: messages.CreateSpanMessage
+    ) -> None:
+        create_span_kwargs = _encode_payload(message)
+        LOGGER.debug("Create span request: %s", create_span_kwargs)
+        await self._rest_client.spans.create_span(**create_span_kwargs)
+
+    async def _process_create_trace_message(
+        self, message: messages.CreateTraceMessage
+    ) -> None:
+        create_trace_kwargs = _encode_payload(message)
+        LOGGER.debug("Create trace request: %s", create_trace_kwargs)
+        await self._rest_client.traces.create_trace(**create_trace_kwargs)
+
+    async def _process_update_span_message(
+        self, message: messages.UpdateSpanMessage
+    ) -> None:
+        update_span_kwargs = _encode_payload(message)
+        LOGGER.debug("Update span request: %s", update_span_kwargs)
+        await self._rest_client.spans.update_span(**update_span_kwargs)
+
+    async def _process_update_trace_message(
+        self, message: messages.UpdateTraceMessage
+    ) -> None:
+        update_trace_kwargs = _encode_payload(message)
+        LOGGER.debug("Update trace request: %s", update_trace_kwargs)
+        await self._rest_client.traces.update_trace(**update_trace_kwargs)
+        LOGGER.debug("Sent trace %s", message.trace_id)
+
+    async def _process_add_span_feedback_scores_batch_message(
+        self, message: messages.AddSpanFeedbackScoresBatchMessage
+    ) -> None:
+        scores = [
+            feedback_score_batch_item.FeedbackScoreBatchItem(
+                **score_message.as_payload_dict()
+            )
+            for score_message in message.batch
+        ]
+
+        LOGGER.debug("Add spans feedbacks scores request of size: %d", len(scores))
+
+        await self._rest_client.spans.score_batch_of_spans(scores=scores)
+        LOGGER.debug("Sent batch of spans feedback scores %d", len(scores))
+
+    async def _process_add_trace_feedback_scores_batch_message(
+        self, message: messages.AddTraceFeedbackScoresBatchMessage
+    ) -> None:
+        scores = [
+            feedback_score_batch_item.FeedbackScoreBatchItem(
+                **score_message.as_payload_dict()
+            )
+            for score_message in message.batch
+        ]
+
+        LOGGER.debug("Add traces feedbacks scores request: %d", len(scores))
+
+        await self._rest_client.traces.score_batch_of_traces(scores=scores)
+        LOGGER.debug("Sent batch of traces feedbacks scores of size %d", len(scores))
+
+    async def _process_create_span_batch_message(
+        self, message: messages.CreateSpansBatchMessage
+    ) -> None:
+        await self._send_create_batch(
+            items=message.batch,
+            path=CREATE_SPANS_BATCH_PATH,
+            field_name="spans",
+        )
+
+    async def _process_create_trace_batch_message(
+        self, message: messages.CreateTraceBatchMessage
+    ) -> None:
+        await self._send_create_batch(
+            items=message.batch,
+            path=CREATE_TRACES_BATCH_PATH,
+            field_name="traces",
+        )
+
+    async def _send_create_batch(
+        self, items: Sequence[messages.BaseMessage], path: str, field_name: str
+    ) -> None:
+        bodies = request_body.encode_create_batch_bodies(
+            items=items,
+            field_name=field_name,
+            max_payload_size_MB=BATCH_MEMORY_LIMIT_MB,
+        )
+
+        if len(bodies) > 1:
+            LOGGER.debug("Sending %s batch in %d parts", field_name, len(bodies))
+
+        results = await asyncio.gather(
+            *[self._post_batch_request_body(path=path, body=body) for body in bodies],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result  # re-raises the first error
+
+    async def _post_batch_request_body(self, path: str, body: bytes) -> None:
+        semaphore = self._in_flight_batch_requests.get(path)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_in_flight_batch_requests)
+            self._in_flight_batch_requests[path] = semaphore
+
+        async with semaphore:
+            LOGGER.debug("Batch request to %s of size %d bytes", path, len(body))
+            await self._post_request_body(path=path, body=body)
+
+    @retry_decorators.connection_retry
+    async def _post_request_body(self, path: str, body: bytes) -> None:
+        response = await self._rest_client._client_wrapper.httpx_client.request(
+            path,
+            method="POST",
+            content=body,
+            headers={"content-type": "application/json"},
+        )
+        request_body.raise_for_status(response)
+
+    async def _process_update_messages_batch(
+        self,
+        message: Union[
+            messages.UpdateSpansBatchMessage, messages.UpdateTracesBatchMessage
+        ],
+    ) -> None:
+        # There is no bulk update endpoint, the updates are sent concurrently,
+        # a failure of one of them doesn't prevent sending the rest.
+        LOGGER.debug(
+            "Processing %s of size %d", type(message).__name__, len(message.batch)
+        )
+        await asyncio.gather(*[self.process(item) for item in message.batch])
+
+
+def _encode_payload(message: messages.BaseMessage) -> Dict[str, Any]:
+    cleaned_kwargs = dict_utils.remove_none_from_dict(message.as_payload_dict())
+    return jsonable_encoder(cleaned_kwargs)
@@ -0,0 +1,364 @@
+import asyncio
+import collections
+import logging
+import queue
+import threading
+from typing import Any, Callable, Deque, List, Optional, Set
+
+from . import async_message_processors, message_serializer, messages, message_queue
+from .. import exceptions
+from .batching import batch_manager
+
+LOGGER = logging.getLogger(__name__)
+
+BATCHERS_PROBE_INTERVAL_SECONDS = 0.1
+
+_CREATE_MESSAGE_TYPES = (
+    messages.CreateSpanMessage,
+    messages.CreateTraceMessage,
+    messages.CreateSpansBatchMessage,
+    messages.CreateTraceBatchMessage,
+)
+_UPDATE_MESSAGE_TYPES = (
+    messages.UpdateSpanMessage,
+    messages.UpdateTraceMessage,
+    messages.UpdateSpansBatchMessage,
+    messages.UpdateTracesBatchMessage,
+)
+
+
+class AsyncMessageQueue(message_queue.MessageQueue):
+    """
+    Message queue of the AsyncStreamer. Putting a message never blocks the caller,
+    so "block" backpressure policy is replaced with "spill_to_disk", which doesn't lose data either.
+    `on_put` is called after every message put to the queue.
+
+    Spilled messages are not written to the file by `put`, which is called from the event loop.
+    They are kept in memory until `write_spilled_messages` is called from another thread.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 0,
+        max_size_bytes: Optional[int] = None,
+        backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+        spill_directory: Optional[str] = None,
+    ) -> None:
+        if backpressure_policy == "block":
+            LOGGER.debug(
+                "Blocking backpressure policy is not supported by AsyncStreamer, spill_to_disk is used instead"
+            )
+            backpressure_policy = "spill_to_disk"
+
+        super().__init__(
+            max_size=max_size,
+            max_size_bytes=max_size_bytes,
+            backpressure_policy=backpressure_policy,
+            spill_directory=spill_directory,
+        )
+        self.on_put: Optional[Callable[[], None]] = None
+        # spilled messages not written to the spill file yet, they go after the written ones
+        self._unwritten_spilled: Deque[Any] = collections.deque()
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        super().put(item, block=False)
+
+        if self.on_put is not None:
+            self.on_put()
+
+    def has_unwritten_spilled_messages(self) -> bool:
+        return len(self._unwritten_spilled) > 0
+
+    def next_message_is_on_disk(self) -> bool:
+        """
+        Returns True if the next message has to be read from the spill file,
+        i.e. `get` would do blocking I/O.
+        """
+        with self.mutex:
+            return self._next_item_is_spilled() and len(self._spill_file) > 0
+
+    def write_spilled_messages(self) -> None:
+        """
+        Writes the spilled messages kept in memory to the spill file. Does blocking I/O,
+        so it must not be called from the event loop. The queue lock is released
+        between the messages, so the `put` calls are not blocked for long.
+        """
+        while True:
+            with self.mutex:
+                if len(self._unwritten_spilled) == 0:
+                    return
+
+                item = self._unwritten_spilled.popleft()
+                self._spill_file.append(message_serializer.serialize(item))
+
+    def _store_spilled(self, item: Any) -> None:
+        self._unwritten_spilled.append(item)
+
+    def _get_spilled(self) -> Any:
+        if len(self._spill_file) > 0:
+            return super()._get_spilled()
+
+        return self._unwritten_spilled.popleft()
+
+    def _spilled_count(self) -> int:
+        return super()._spilled_count() + len(self._unwritten_spilled)
+
+
+class AsyncStreamer:
+    """
+    Sends the messages to the backend from the asyncio tasks, without any background threads.
+
+    The streamer is bound to the event loop it is started in (see `start`), messages
+    put before that wait in the queue. `put` never blocks and can be called from any thread.
+
+    Up to `max_concurrent_messages` messages are processed concurrently. Updates of spans
+    and traces are processed only after all the create messages taken from the queue
+    before them are processed, so an update never reaches the backend before the create.
+
+    The messages spilled to disk are written and read in the threads of the default
+    executor of the event loop, so the event loop is never blocked by the file I/O.
+    """
+
+    def __init__(
+        self,
+        message_queue: AsyncMessageQueue,
+        message_processor: async_message_processors.BaseAsyncMessageProcessor,
+        batch_manager: Optional[batch_manager.BatchManager],
+        max_concurrent_messages: int,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._message_queue = message_queue
+        self._message_processor = message_processor
+        self._batch_manager = batch_manager
+        self._max_concurrent_messages = max_concurrent_messages
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+        self._in_flight_creates: Set["asyncio.Task[None]"] = set()
+
+        # created in the event loop the streamer is bound to, see start()
+        self._messages_available: Optional[asyncio.Event] = None
+        self._spilled_messages_available: Optional[asyncio.Event] = None
+        self._all_processed: Optional[asyncio.Event] = None
+        self._concurrency: Optional[asyncio.Semaphore] = None
+
+        self._drain = False
+        self._closed = False
+        self._close_result = True
+
+        self._message_queue.on_put = self._notify
+
+    def start(self) -> None:
+        """
+        Binds the streamer to the running event loop and starts processing
+        the messages. Starting already started streamer has no effect.
+
+        Raises:
+            OpikException: if the streamer is already bound to another event loop.
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self._loop is loop:
+                return
+
+            if self._loop is not None:
+                raise exceptions.OpikException(
+                    "Opik async client is bound to the event loop it was first used in, "
+                    "create a separate client for every event loop."
+                )
+
+            self._messages_available = asyncio.Event()
+            self._spilled_messages_available = asyncio.Event()
+            self._all_processed = asyncio.Event()
+            self._concurrency = asyncio.Semaphore(self._max_concurrent_messages)
+            self._tasks.append(loop.create_task(self._dispatch()))
+            self._tasks.append(loop.create_task(self._write_spilled_messages()))
+            if self._batch_manager is not None:
+                self._tasks.append(loop.create_task(self._flush_ready_batchers()))
+
+            self._loop_thread_id = threading.get_ident()
+            self._loop = loop
+
+        # messages put before the start
+        self._messages_available.set()
+        self._spilled_messages_available.set()
+
+    def put(self, message: messages.BaseMessage) -> None:
+        if self._drain:
+            return
+
+        if self._loop is None:
+            try:
+                self.start()
+            except RuntimeError:
+                pass  # no running event loop yet
+
+        if (
+            self._batch_manager is not None
+            and self._batch_manager.message_supports_batching(message)
+        ):
+            self._batch_manager.process_message(message)
+        else:
+            self._message_queue.put(message)
+
+    async def flush(self, timeout: Optional[float]) -> bool:
+        """
+        Waits until all the messages are processed.
+
+        Returns:
+            bool: False if the timeout expired before all the messages were processed.
+        """
+        if self._closed:
+            # processing tasks are stopped, nothing will be processed anymore
+            return self._message_queue.empty()
+
+        self.start()
+
+        if self._batch_manager is not None:
+            self._batch_manager.flush()
+
+        try:
+            await asyncio.wait_for(self._wait_for_all_processed(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    async def close(self, timeout: Optional[float]) -> bool:
+        """
+        Sends the pending messages and stops the processing tasks.
+        Closing already closed streamer has no effect.
+        """
+        if self._closed:
+            return self._close_result
+
+        self._drain = True
+        self._close_result = await self.flush(timeout)
+        self._closed = True
+
+        tasks = self._tasks + list(self._in_flight)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return self._close_result
+
+    def get_message_queue_stats(self) -> message_queue.MessageQueueStats:
+        return self._message_queue.get_stats()
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if (
+            loop is None
+            or self._messages_available is None
+            or self._spilled_messages_available is None
+        ):
+            return
+
+        events = [self._messages_available]
+        if self._message_queue.has_unwritten_spilled_messages():
+            events.append(self._spilled_messages_available)
+
+        for event in events:
+            if threading.get_ident() == self._loop_thread_id:
+                event.set()
+                continue
+
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                LOGGER.debug("Event loop of the AsyncStreamer is closed", exc_info=True)
+                return
+
+    async def _dispatch(self) -> None:
+        assert self._messages_available is not None
+        assert self._all_processed is not None
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            self._messages_available.clear()
+            while True:
+                try:
+                    if self._message_queue.next_message_is_on_disk():
+                        sequence_number, message = await loop.run_in_executor(
+                            None, self._message_queue.get_with_sequence_number, False
+                        )
+                    else:
+                        sequence_number, message = (
+                            self._message_queue.get_with_sequence_number(block=False)
+                        )
+                except queue.Empty:
+                    break
+
+                await self._schedule(sequence_number, message)
+
+            if self._message_queue.unfinished_tasks == 0:
+                # the queued messages might have been dropped without processing
+                self._all_processed.set()
+
+            await self._messages_available.wait()
+
+    async def _schedule(
+        self, sequence_number: int, message: messages.BaseMessage
+    ) -> None:
+        assert self._concurrency is not None
+
+        if isinstance(message, _UPDATE_MESSAGE_TYPES) and self._in_flight_creates:
+            await asyncio.wait(list(self._in_flight_creates))
+
+        await self._concurrency.acquire()
+
+        task = asyncio.ensure_future(self._process(sequence_number, message))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+        if isinstance(message, _CREATE_MESSAGE_TYPES):
+            self._in_flight_creates.add(task)
+            task.add_done_callback(self._in_flight_creates.discard)
+
+    async def _process(
+        self, sequence_number: int, message: messages.BaseMessage
+    ) -> None:
+        assert self._concurrency is not None
+        assert self._all_processed is not None
+
+        try:
+            await self._message_processor.process(message)
+        except Exception:
+            LOGGER.debug("Failed to process %s", type(message).__name__, exc_info=True)
+        finally:
+            self._concurrency.release()
+            self._message_queue.task_done(sequence_number)
+            if self._message_queue.unfinished_tasks == 0:
+                self._all_processed.set()
+
+    async def _write_spilled_messages(self) -> None:
+        assert self._spilled_messages_available is not None
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._spilled_messages_available.wait()
+            self._spilled_messages_available.clear()
+            await loop.run_in_executor(None, self._message_queue.write_spilled_messages)
+
+    async def _flush_ready_batchers(self) -> None:
+        assert self._batch_manager is not None
+
+        while True:
+            await asyncio.sleep(BATCHERS_PROBE_INTERVAL_SECONDS)
+            self._batch_manager.flush_ready_batchers()
+
+    async def _wait_for_all_processed(self) -> None:
+        assert self._all_processed is not None
+
+        while True:
+            self._all_processed.clear()
+            if self._message_queue.unfinished_tasks == 0:
+                return
+
+            await self._all_processed.wait()
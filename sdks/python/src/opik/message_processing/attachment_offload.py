@@ -0,0 +1,240 @@
+import base64
+import binascii
+import collections
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import attachment_store, messages
+
+LOGGER = logging.getLogger(__name__)
+
+ATTACHMENT_TYPE = "opik.attachment"
+"""The value of the "type" key of the references which replace the offloaded data."""
+
+DEFAULT_MIN_SIZE_BYTES = 64 * 1024
+DEFAULT_CHUNK_SIZE_BYTES = 4 * 1024 * 1024
+
+_MAX_DEPTH = 100
+_MAX_REMEMBERED_HASHES = 10_000
+_DATA_URL_PREFIX = "data:"
+_DATA_URL_HEADER_MAX_LENGTH = 256
+_BASE64_PATTERN = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+_DEFAULT_MIME_TYPE = "application/octet-stream"
+
+_PAYLOAD_FIELDS = ("input", "output", "metadata")
+_PAYLOAD_MESSAGE_TYPES = (
+    messages.CreateSpanMessage,
+    messages.CreateTraceMessage,
+    messages.UpdateSpanMessage,
+    messages.UpdateTraceMessage,
+)
+# update batches are not sent as a whole, their items are offloaded one by one
+_CREATE_BATCH_MESSAGE_TYPES = (
+    messages.CreateSpansBatchMessage,
+    messages.CreateTraceBatchMessage,
+)
+
+_Binary = Union[bytes, bytearray, memoryview]
+
+
+class AttachmentOffloader:
+    """
+    Replaces the big binary values and base64 strings (plain or data URLs, e.g. the images
+    of multimodal LLM requests) in the inputs, outputs and metadata of the spans and traces
+    with the references to their content stored in the attachment store:
+
+        {"type": "opik.attachment", "mime_type": "image/png", "size": 123456,
+         "sha256": "...", "uri": "..."}
+
+    The content is uploaded in chunks of `chunk_size_bytes` bytes. It is addressed
+    by its SHA-256 hash, the content which is already in the store is not uploaded again.
+    If the upload fails, the value stays in the payload.
+    """
+
+    def __init__(
+        self,
+        store: attachment_store.AttachmentStore,
+        min_size_bytes: int = DEFAULT_MIN_SIZE_BYTES,
+        chunk_size_bytes: int = DEFAULT_CHUNK_SIZE_BYTES,
+    ) -> None:
+        self._store = store
+        self._min_size_bytes = min_size_bytes
+        self._chunk_size_bytes = chunk_size_bytes
+
+        self._lock = threading.Lock()
+        self._stored_hashes: "collections.OrderedDict[str, None]" = (
+            collections.OrderedDict()
+        )
+
+    def offload_message(self, message: messages.BaseMessage) -> None:
+        """
+        Offloads the data of the message (or the items of the create batch) in place.
+        """
+        if isinstance(message, _CREATE_BATCH_MESSAGE_TYPES):
+            for item in message.batch:
+                self.offload_message(item)
+            return
+
+        if not isinstance(message, _PAYLOAD_MESSAGE_TYPES):
+            return
+
+        for name in _PAYLOAD_FIELDS:
+            value = getattr(message, name)
+            if value is not None:
+                setattr(message, name, self.offload(value))
+
+    def offload(self, value: Any) -> Any:
+        """
+        Returns the value with the offloaded data replaced with the references.
+        Dicts, lists and tuples containing them are copied, the value is returned
+        as is if nothing was offloaded. Other objects are not inspected.
+        """
+        return self._offload(value, depth=0)
+
+    def _offload(self, value: Any, depth: int) -> Any:
+        type_ = type(value)
+
+        if type_ is str:
+            if len(value) < self._min_size_bytes:
+                return value
+            return self._offload_base64(value)
+
+        if type_ in (bytes, bytearray, memoryview):
+            if len(value) < self._min_size_bytes:
+                return value
+            return self._store_content(value, value, _DEFAULT_MIME_TYPE)
+
+        if depth >= _MAX_DEPTH:
+            return value
+
+        if type_ is dict:
+            return self._offload_dict(value, depth)
+
+        if type_ in (list, tuple):
+            return self._offload_sequence(value, depth)
+
+        return value
+
+    def _offload_dict(self, value: Dict[Any, Any], depth: int) -> Dict[Any, Any]:
+        result: Optional[Dict[Any, Any]] = None
+
+        for key, item in value.items():
+            offloaded_item = self._offload(item, depth + 1)
+            if offloaded_item is not item:
+                if result is None:
+                    result = dict(value)
+                result[key] = offloaded_item
+
+        return value if result is None else result
+
+    def _offload_sequence(self, value: Any, depth: int) -> Any:
+        result: Optional[List[Any]] = None
+
+        for index, item in enumerate(value):
+            offloaded_item = self._offload(item, depth + 1)
+            if offloaded_item is not item:
+                if result is None:
+                    result = list(value)
+                result[index] = offloaded_item
+
+        return value if result is None else result
+
+    def _offload_base64(self, value: str) -> Any:
+        parsed = _parse_base64(value)
+        if parsed is None:
+            return value
+
+        mime_type, encoded = parsed
+        try:
+            content = base64.b64decode(encoded, validate=True)
+        except binascii.Error:
+            return value
+
+        return self._store_content(value, content, mime_type)
+
+    def _store_content(self, value: Any, content: _Binary, mime_type: str) -> Any:
+        view = memoryview(content)
+        if not view.c_contiguous:
+            view = memoryview(view.tobytes())
+        view = view.cast("B")
+
+        content_hash = hashlib.sha256(view).hexdigest()
+        try:
+            if not self._is_stored(content_hash):
+                self._store.upload(
+                    content_hash, _iter_chunks(view, self._chunk_size_bytes)
+                )
+                self._remember_stored(content_hash)
+            uri = self._store.get_uri(content_hash)
+        except Exception:
+            LOGGER.warning(
+                "Failed to store the attachment of %d bytes, it's kept in the payload",
+                view.nbytes,
+                exc_info=True,
+            )
+            return value
+
+        return {
+            "type": ATTACHMENT_TYPE,
+            "mime_type": mime_type,
+            "size": view.nbytes,
+            "sha256": content_hash,
+            "uri": uri,
+        }
+
+    def _is_stored(self, content_hash: str) -> bool:
+        with self._lock:
+            if content_hash in self._stored_hashes:
+                self._stored_hashes.move_to_end(content_hash)
+                return True
+
+        if self._store.contains(content_hash):
+            self._remember_stored(content_hash)
+            return True
+
+        return False
+
+    def _remember_stored(self, content_hash: str) -> None:
+        with self._lock:
+            self._stored_hashes[content_hash] = None
+            if len(self._stored_hashes) > _MAX_REMEMBERED_HASHES:
+                self._stored_hashes.popitem(last=False)
+
+
+def is_base64_blob(value: str, min_size_bytes: int) -> bool:
+    """
+    Returns True if the string would be offloaded by `AttachmentOffloader`
+    with the same `min_size_bytes`.
+    """
+    return len(value) >= min_size_bytes and _parse_base64(value) is not None
+
+
+def _parse_base64(value: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns the MIME type and the base64-encoded content of the data URL
+    or of the plain base64 string, None if it's not one of them.
+    """
+    mime_type = _DEFAULT_MIME_TYPE
+    encoded = value
+
+    if value.startswith(_DATA_URL_PREFIX):
+        header_end = value.find(",", 0, _DATA_URL_HEADER_MAX_LENGTH)
+        header = value[len(_DATA_URL_PREFIX) : header_end]
+        if header_end == -1 or not header.endswith(";base64"):
+            return None
+
+        mime_type = header.split(";")[0] or _DEFAULT_MIME_TYPE
+        encoded = value[header_end + 1 :]
+
+    if len(encoded) % 4 != 0 or _BASE64_PATTERN.fullmatch(encoded) is None:
+        return None
+
+    return mime_type, encoded
+
+
+def _iter_chunks(view: memoryview, chunk_size_bytes: int) -> Iterator[memoryview]:
+    for start in range(0, view.nbytes, chunk_size_bytes):
+        yield view[start : start + chunk_size_bytes]
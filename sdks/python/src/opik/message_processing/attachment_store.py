@@ -0,0 +1,83 @@
+import abc
+import logging
+import os
+import pathlib
+import threading
+from typing import Iterable, Union
+
+LOGGER = logging.getLogger(__name__)
+
+_PARTIAL_FILE_SUFFIX = ".part"
+
+
+class AttachmentStore(abc.ABC):
+    """
+    Storage of the attachments offloaded from the span and trace payloads,
+    see `attachment_offload.AttachmentOffloader`. The attachments are addressed
+    by the SHA-256 hex digest of their content, so the same content is stored once.
+    """
+
+    @abc.abstractmethod
+    def contains(self, content_hash: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def upload(
+        self, content_hash: str, chunks: Iterable[Union[bytes, memoryview]]
+    ) -> None:
+        """
+        Stores the content passed in chunks, the attachment must not become
+        visible (see `contains`) before all the chunks are stored.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_uri(self, content_hash: str) -> str:
+        """
+        Returns the URI the attachment can be downloaded from, it is put into the references.
+        """
+        pass
+
+
+class LocalFileAttachmentStore(AttachmentStore):
+    """
+    Stores every attachment in a separate file `<directory>/<first 2 hash characters>/<hash>`.
+    The file is written with the `.part` suffix and renamed when all the chunks are written,
+    so the directory can be shared by several processes.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = pathlib.Path(directory).expanduser().absolute()
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def contains(self, content_hash: str) -> bool:
+        return self._get_path(content_hash).exists()
+
+    def upload(
+        self, content_hash: str, chunks: Iterable[Union[bytes, memoryview]]
+    ) -> None:
+        path = self._get_path(content_hash)
+        path.parent.mkdir(exist_ok=True)
+
+        partial_path = path.with_name(
+            f"{path.name}-{os.getpid()}-{threading.get_ident()}{_PARTIAL_FILE_SUFFIX}"
+        )
+        try:
+            with open(partial_path, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            os.replace(partial_path, path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+
+        LOGGER.debug("Stored attachment %s", path)
+
+    def get_uri(self, content_hash: str) -> str:
+        return self._get_path(content_hash).as_uri()
+
+    def read(self, content_hash: str) -> bytes:
+        return self._get_path(content_hash).read_bytes()
+
+    def _get_path(self, content_hash: str) -> pathlib.Path:
+        return self._directory / content_hash[:2] / content_hash
@@ -0,0 +1,211 @@
+import dataclasses
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from . import base_batcher
+
+LOGGER = logging.getLogger(__name__)
+
+ADJUSTMENT_INTERVAL_SECONDS = 1.0
+
+LATENCY_SMOOTHING_FACTOR = 0.3
+ERROR_RATE_SMOOTHING_FACTOR = 0.1
+
+LOW_LATENCY_SECONDS = 0.5
+HIGH_LATENCY_SECONDS = 3.0
+HIGH_ERROR_RATE = 0.05
+HIGH_SEND_RATE_ITEMS_PER_SECOND = 500.0
+SHALLOW_QUEUE_SIZE = 10
+
+MIN_BATCH_SIZE_FACTOR = 0.05
+# The base batch sizes are the maximum numbers of items the backend accepts
+# in one request, the batches can only be made smaller than that.
+MAX_BATCH_SIZE_FACTOR = 1.0
+BATCH_SIZE_FACTOR_INCREMENT = 0.25
+
+MIN_FLUSH_INTERVAL_FACTOR = 0.25
+MAX_FLUSH_INTERVAL_FACTOR = 1.0
+
+
+@dataclasses.dataclass
+class AdaptiveBatchingStats:
+    batch_size_factor: float
+    flush_interval_factor: float
+    max_batch_sizes: Dict[str, int]
+    flush_intervals_seconds: Dict[str, float]
+    latency_seconds: Optional[float]
+    error_rate: float
+    sent_items_per_second: float
+    queue_size: int
+    adjustments: int
+
+
+@dataclasses.dataclass
+class _BatcherBaseSettings:
+    max_batch_size: int
+    flush_interval_seconds: float
+
+
+class AdaptiveBatchingController:
+    """
+    Adjusts the batch sizes and flush intervals of the batchers based on
+    the observed backend latency, error rate, send rate and queue depth.
+
+    The configured settings of every batcher are its base settings, the controller
+    scales all of them with two factors:
+        * Batch size factor is halved as soon as the latency or the rate
+          of 429/5xx and transport errors climbs, and grows additively back
+          while requests are fast and a lot of data is being sent. The batches
+          never get larger than the base size, which is the maximum number
+          of items the backend accepts in one request.
+        * Flush interval factor is halved while the queue is shallow, so that
+          partial batches are sent sooner and the traces show up faster,
+          and is doubled back (up to the base interval) when the queue grows
+          or the backend is struggling.
+
+    Requests are reported by the queue consumers via `observe_request`,
+    decisions are made at most once per `ADJUSTMENT_INTERVAL_SECONDS`
+    when `adjust` is called by the flushing thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+        self._batchers: Dict[str, base_batcher.BaseBatcher] = {}
+        self._base_settings: Dict[str, _BatcherBaseSettings] = {}
+        self._message_queue: Optional["queue.Queue[Any]"] = None
+
+        self._batch_size_factor = MAX_BATCH_SIZE_FACTOR
+        self._flush_interval_factor = MAX_FLUSH_INTERVAL_FACTOR
+
+        self._latency_seconds: Optional[float] = None
+        self._error_rate = 0.0
+        self._sent_items_per_second = 0.0
+        self._items_sent_in_window = 0
+        self._requests_in_window = 0
+        self._window_start_time = time.monotonic()
+        self._adjustments = 0
+
+    def attach(
+        self,
+        batchers: List[base_batcher.BaseBatcher],
+        message_queue: "queue.Queue[Any]",
+    ) -> None:
+        with self._lock:
+            self._message_queue = message_queue
+            for batcher in batchers:
+                name = type(batcher).__name__
+                self._batchers[name] = batcher
+                self._base_settings[name] = _BatcherBaseSettings(
+                    max_batch_size=batcher.max_batch_size,
+                    flush_interval_seconds=batcher.flush_interval_seconds,
+                )
+
+    def observe_request(self, items: int, latency_seconds: float, failed: bool) -> None:
+        """
+        Reports a request sent to the backend. `failed` must be True only for the
+        failures caused by the backend load: 429, 5xx and transport errors.
+        """
+        with self._lock:
+            if self._latency_seconds is None:
+                self._latency_seconds = latency_seconds
+            else:
+                self._latency_seconds += LATENCY_SMOOTHING_FACTOR * (
+                    latency_seconds - self._latency_seconds
+                )
+
+            self._error_rate += ERROR_RATE_SMOOTHING_FACTOR * (
+                float(failed) - self._error_rate
+            )
+            self._requests_in_window += 1
+            if not failed:
+                self._items_sent_in_window += items
+
+    def adjust(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            window_seconds = now - self._window_start_time
+            if window_seconds < ADJUSTMENT_INTERVAL_SECONDS:
+                return
+
+            self._sent_items_per_second = self._items_sent_in_window / window_seconds
+            requests_observed = self._requests_in_window > 0
+            self._items_sent_in_window = 0
+            self._requests_in_window = 0
+            self._window_start_time = now
+
+            self._update_factors(requests_observed)
+            self._apply_factors()
+            self._adjustments += 1
+
+    def get_stats(self) -> AdaptiveBatchingStats:
+        with self._lock:
+            return AdaptiveBatchingStats(
+                batch_size_factor=self._batch_size_factor,
+                flush_interval_factor=self._flush_interval_factor,
+                max_batch_sizes={
+                    name: batcher.max_batch_size
+                    for name, batcher in self._batchers.items()
+                },
+                flush_intervals_seconds={
+                    name: batcher.flush_interval_seconds
+                    for name, batcher in self._batchers.items()
+                },
+                latency_seconds=self._latency_seconds,
+                error_rate=self._error_rate,
+                sent_items_per_second=self._sent_items_per_second,
+                queue_size=self._queue_size(),
+                adjustments=self._adjustments,
+            )
+
+    def _update_factors(self, requests_observed: bool) -> None:
+        backend_struggling = self._error_rate >= HIGH_ERROR_RATE or (
+            self._latency_seconds is not None
+            and self._latency_seconds >= HIGH_LATENCY_SECONDS
+        )
+
+        if backend_struggling:
+            self._batch_size_factor = max(
+                self._batch_size_factor / 2, MIN_BATCH_SIZE_FACTOR
+            )
+            self._flush_interval_factor = MAX_FLUSH_INTERVAL_FACTOR
+            return
+
+        if (
+            requests_observed
+            and self._latency_seconds is not None
+            and self._latency_seconds <= LOW_LATENCY_SECONDS
+            and self._sent_items_per_second >= HIGH_SEND_RATE_ITEMS_PER_SECOND
+        ):
+            self._batch_size_factor = min(
+                self._batch_size_factor + BATCH_SIZE_FACTOR_INCREMENT,
+                MAX_BATCH_SIZE_FACTOR,
+            )
+
+        if self._queue_size() <= SHALLOW_QUEUE_SIZE:
+            self._flush_interval_factor = max(
+                self._flush_interval_factor / 2, MIN_FLUSH_INTERVAL_FACTOR
+            )
+        else:
+            self._flush_interval_factor = min(
+                self._flush_interval_factor * 2, MAX_FLUSH_INTERVAL_FACTOR
+            )
+
+    def _apply_factors(self) -> None:
+        for name, batcher in self._batchers.items():
+            base_settings = self._base_settings[name]
+            batcher.max_batch_size = max(
+                int(base_settings.max_batch_size * self._batch_size_factor), 1
+            )
+            batcher.flush_interval_seconds = (
+                base_settings.flush_interval_seconds * self._flush_interval_factor
+            )
+
+    def _queue_size(self) -> int:
+        if self._message_queue is None:
+            return 0
+
+        return self._message_queue.qsize()
@@ -2,11 +2,18 @@ import threading
 import time
 import abc
 
-from typing import List, Callable
+from typing import Generic, List, Callable, TypeVar
 from .. import messages
 
+MessageT = TypeVar("MessageT", bound=messages.BaseMessage)
+
+
+class BaseBatcher(abc.ABC, Generic[MessageT]):
+    """
+    Accumulates the messages of type `MessageT` and passes them to `flush_callback`
+    as a batch message when `max_batch_size` is reached or when it's flushed.
+    """
 
-class BaseBatcher(abc.ABC):
     def __init__(
         self,
         flush_callback: Callable[[messages.BaseMessage], None],
@@ -18,9 +25,25 @@ class BaseBatcher(abc.ABC):
         self._accumulated_messages: List[messages.BaseMessage] = []
         self._max_batch_size: int = max_batch_size
 
-        self._last_time_flush_callback_called: float = time.time()
+        self._last_time_flush_callback_called: float = time.monotonic()
         self._lock = threading.RLock()
 
+    @property
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    @max_batch_size.setter
+    def max_batch_size(self, value: int) -> None:
+        self._max_batch_size = value
+
+    @property
+    def flush_interval_seconds(self) -> float:
+        return self._flush_interval_seconds
+
+    @flush_interval_seconds.setter
+    def flush_interval_seconds(self, value: float) -> None:
+        self._flush_interval_seconds = value
+
     def flush(self) -> None:
         with self._lock:
             if len(self._accumulated_messages) > 0:
@@ -28,11 +51,11 @@ class BaseBatcher(abc.ABC):
                 self._accumulated_messages = []
 
                 self._flush_callback(batch_message)
-            self._last_time_flush_callback_called = time.time()
+            self._last_time_flush_callback_called = time.monotonic()
 
     def is_ready_to_flush(self) -> bool:
         return (
-            time.time() - self._last_time_flush_callback_called
+            time.monotonic() - self._last_time_flush_callback_called
         ) >= self._flush_interval_seconds
 
     def is_empty(self) -> bool:
@@ -43,7 +66,7 @@ class BaseBatcher(abc.ABC):
     def _create_batch_from_accumulated_messages(self) -> messages.BaseMessage: ...
 
     @abc.abstractmethod
-    def add(self, message: messages.BaseMessage) -> None:
+    def add(self, message: MessageT) -> None:
         with self._lock:
             self._accumulated_messages.append(message)
             if len(self._accumulated_messages) >= self._max_batch_size:
@@ -1,5 +1,6 @@
-from typing import Type, Dict
+from typing import Type, Dict, Optional
 from .. import messages
+from . import adaptive_controller
 from . import base_batcher
 from . import flushing_thread
 
@@ -10,10 +11,15 @@ class BatchManager:
         message_to_batcher_mapping: Dict[
             Type[messages.BaseMessage], base_batcher.BaseBatcher
         ],
+        adaptive_controller_: Optional[
+            adaptive_controller.AdaptiveBatchingController
+        ] = None,
     ) -> None:
         self._message_to_batcher_mapping = message_to_batcher_mapping
+        self._adaptive_controller = adaptive_controller_
         self._flushing_thread = flushing_thread.FlushingThread(
-            batchers=list(self._message_to_batcher_mapping.values())
+            batchers=list(self._message_to_batcher_mapping.values()),
+            adaptive_controller_=adaptive_controller_,
         )
 
     def start(self) -> None:
@@ -42,3 +48,20 @@ class BatchManager:
     def flush(self) -> None:
         for batcher in self._message_to_batcher_mapping.values():
             batcher.flush()
+
+    def flush_ready_batchers(self) -> None:
+        """
+        Flushes the batchers whose flush interval has passed. Used instead of
+        the flushing thread when the batch manager is not started.
+        """
+        for batcher in self._message_to_batcher_mapping.values():
+            if batcher.is_ready_to_flush():
+                batcher.flush()
+
+    def get_adaptive_batching_stats(
+        self,
+    ) -> Optional[adaptive_controller.AdaptiveBatchingStats]:
+        if self._adaptive_controller is None:
+            return None
+
+        return self._adaptive_controller.get_stats()
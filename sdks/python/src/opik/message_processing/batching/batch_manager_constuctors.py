@@ -1,11 +1,13 @@
 import queue
-from typing import Type, Dict
+from typing import Callable, Type, Dict, Optional
 
 from .. import messages
 
+from . import adaptive_controller
 from . import base_batcher
 from . import batchers
 from . import batch_manager
+from . import create_messages_tracker
 
 CREATE_SPANS_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS = 2.0
 CREATE_SPANS_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
@@ -13,21 +15,65 @@ CREATE_SPANS_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
 CREATE_TRACES_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS = 2.0
 CREATE_TRACES_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
 
+UPDATE_SPANS_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS = 2.0
+UPDATE_SPANS_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
+
+UPDATE_TRACES_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS = 2.0
+UPDATE_TRACES_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
+
 FEEDBACK_SCORES_BATCH_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS = 1.0
 FEEDBACK_SCORES_BATCH_MESSAGE_BATCHER_MAX_BATCH_SIZE = 1000
 
 
-def create_batch_manager(message_queue: queue.Queue) -> batch_manager.BatchManager:
+def create_batch_manager(
+    message_queue: queue.Queue,
+    message_absorbed_callback: Optional[batchers.MessageAbsorbedCallback] = None,
+    create_messages_tracker_: Optional[
+        create_messages_tracker.InFlightCreateMessagesTracker
+    ] = None,
+    adaptive_controller_: Optional[
+        adaptive_controller.AdaptiveBatchingController
+    ] = None,
+) -> batch_manager.BatchManager:
+    create_messages_flush_callback: Callable[[messages.BaseMessage], None] = (
+        message_queue.put
+    )
+    if create_messages_tracker_ is not None:
+        create_messages_flush_callback = _registering_flush_callback(
+            message_queue, create_messages_tracker_
+        )
+
     create_span_message_batcher_ = batchers.CreateSpanMessageBatcher(
         flush_interval_seconds=CREATE_SPANS_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS,
         max_batch_size=CREATE_SPANS_MESSAGE_BATCHER_MAX_BATCH_SIZE,
-        flush_callback=message_queue.put,
+        flush_callback=create_messages_flush_callback,
     )
 
     create_trace_message_batcher_ = batchers.CreateTraceMessageBatcher(
         flush_interval_seconds=CREATE_TRACES_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS,
         max_batch_size=CREATE_TRACES_MESSAGE_BATCHER_MAX_BATCH_SIZE,
+        flush_callback=create_messages_flush_callback,
+    )
+
+    update_span_message_batcher_ = batchers.UpdateSpanMessageBatcher(
+        flush_interval_seconds=UPDATE_SPANS_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS,
+        max_batch_size=UPDATE_SPANS_MESSAGE_BATCHER_MAX_BATCH_SIZE,
         flush_callback=message_queue.put,
+        message_absorbed_callback=message_absorbed_callback,
+        create_message_batcher=create_span_message_batcher_,
+        batchers_to_flush_before=[
+            create_trace_message_batcher_,
+            create_span_message_batcher_,
+        ],
+    )
+
+    update_trace_message_batcher_ = batchers.UpdateTraceMessageBatcher(
+        flush_interval_seconds=UPDATE_TRACES_MESSAGE_BATCHER_FLUSH_INTERVAL_SECONDS,
+        max_batch_size=UPDATE_TRACES_MESSAGE_BATCHER_MAX_BATCH_SIZE,
+        flush_callback=message_queue.put,
+        message_absorbed_callback=message_absorbed_callback,
+        create_message_batcher=create_trace_message_batcher_,
+        batchers_to_flush_before=[create_trace_message_batcher_],
     )
 
     add_span_feedback_scores_batch_message_batcher = batchers.AddSpanFeedbackScoresBatchMessageBatcher(
@@ -47,12 +93,32 @@ def create_batch_manager(message_queue: queue.Queue) -> batch_manager.BatchManag
     ] = {
         messages.CreateSpanMessage: create_span_message_batcher_,
         messages.CreateTraceMessage: create_trace_message_batcher_,
+        messages.UpdateSpanMessage: update_span_message_batcher_,
+        messages.UpdateTraceMessage: update_trace_message_batcher_,
         messages.AddSpanFeedbackScoresBatchMessage: add_span_feedback_scores_batch_message_batcher,
         messages.AddTraceFeedbackScoresBatchMessage: add_trace_feedback_scores_batch_message_batcher,
     }
 
+    if adaptive_controller_ is not None:
+        adaptive_controller_.attach(
+            batchers=list(message_to_batcher_mapping.values()),
+            message_queue=message_queue,
+        )
+
     batch_manager_ = batch_manager.BatchManager(
-        message_to_batcher_mapping=message_to_batcher_mapping
+        message_to_batcher_mapping=message_to_batcher_mapping,
+        adaptive_controller_=adaptive_controller_,
     )
 
     return batch_manager_
+
+
+def _registering_flush_callback(
+    message_queue: queue.Queue,
+    create_messages_tracker_: create_messages_tracker.InFlightCreateMessagesTracker,
+) -> Callable[[messages.BaseMessage], None]:
+    def flush_callback(message: messages.BaseMessage) -> None:
+        create_messages_tracker_.register(message)
+        message_queue.put(message)
+
+    return flush_callback
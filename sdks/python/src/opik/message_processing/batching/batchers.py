@@ -1,30 +1,112 @@
-from typing import Union
+import abc
+import dataclasses
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union, cast
 
 from . import base_batcher
 from .. import messages
+from ... import dict_utils
 
+CreateMessageT = TypeVar("CreateMessageT", bound=messages.BaseMessage)
+UpdateMessageT = TypeVar("UpdateMessageT", bound=messages.BaseMessage)
+
+_DEEP_MERGED_FIELDS = ("metadata", "input", "output", "usage")
+
+MessageAbsorbedCallback = Callable[[messages.BaseMessage, messages.BaseMessage], None]
+
+
+class BaseCreateMessageBatcher(base_batcher.BaseBatcher[CreateMessageT]):
+    """
+    Accumulates create messages and keeps them indexed by span or trace id,
+    so that the updates of spans and traces which are not sent yet
+    can be merged into the pending create messages instead of being sent separately.
+    """
+
+    def __init__(
+        self,
+        flush_callback: Callable[[messages.BaseMessage], None],
+        max_batch_size: int,
+        flush_interval_seconds: float,
+    ):
+        super().__init__(
+            flush_callback=flush_callback,
+            max_batch_size=max_batch_size,
+            flush_interval_seconds=flush_interval_seconds,
+        )
+        self._accumulated_messages_by_id: Dict[str, CreateMessageT] = {}
+
+    def add(self, message: CreateMessageT) -> None:
+        with self._lock:
+            message_id = getattr(message, self._id_field_name, None)
+            if message_id is not None:
+                self._accumulated_messages_by_id[message_id] = message
+
+            super().add(message)
+
+    def merge_update(
+        self, update_message: messages.BaseMessage
+    ) -> Optional[CreateMessageT]:
+        """
+        Merges the update into the pending create message with the same id.
+        Uses the same semantics as `SpanData.update` and `TraceData.update`:
+        None values are ignored, metadata, input, output and usage are deep-merged,
+        other values are overwritten.
+
+        Returns the create message the update was merged into, or None if there
+        is no pending create message for this id. In the latter case
+        the update has to be sent separately.
+        """
+        with self._lock:
+            message_id = getattr(update_message, self._id_field_name)
+            create_message = self._accumulated_messages_by_id.get(message_id)
+            if create_message is not None:
+                _merge_not_none_fields(source=update_message, target=create_message)
+
+            return create_message
+
+    def _pop_accumulated_messages(self) -> List[CreateMessageT]:
+        self._accumulated_messages_by_id = {}
+        # only the messages passed to `add` are accumulated
+        return cast(List[CreateMessageT], self._accumulated_messages)
+
+    @property
+    @abc.abstractmethod
+    def _id_field_name(self) -> str:
+        """
+        The name of the id field shared by the create and the update messages.
+        """
+        pass
+
+
+class CreateSpanMessageBatcher(BaseCreateMessageBatcher[messages.CreateSpanMessage]):
+    @property
+    def _id_field_name(self) -> str:
+        return "span_id"
 
-class CreateSpanMessageBatcher(base_batcher.BaseBatcher):
     def _create_batch_from_accumulated_messages(
         self,
     ) -> messages.CreateSpansBatchMessage:
-        return messages.CreateSpansBatchMessage(batch=self._accumulated_messages)  # type: ignore
+        return messages.CreateSpansBatchMessage(batch=self._pop_accumulated_messages())
 
-    def add(self, message: messages.CreateSpansBatchMessage) -> None:  # type: ignore
-        return super().add(message)
 
+class CreateTraceMessageBatcher(BaseCreateMessageBatcher[messages.CreateTraceMessage]):
+    @property
+    def _id_field_name(self) -> str:
+        return "trace_id"
 
-class CreateTraceMessageBatcher(base_batcher.BaseBatcher):
     def _create_batch_from_accumulated_messages(
         self,
     ) -> messages.CreateTraceBatchMessage:
-        return messages.CreateTraceBatchMessage(batch=self._accumulated_messages)  # type: ignore
-
-    def add(self, message: messages.CreateTraceBatchMessage) -> None:  # type: ignore
-        return super().add(message)
+        return messages.CreateTraceBatchMessage(batch=self._pop_accumulated_messages())
 
 
-class BaseAddFeedbackScoresBatchMessageBatcher(base_batcher.BaseBatcher):
+class BaseAddFeedbackScoresBatchMessageBatcher(
+    base_batcher.BaseBatcher[
+        Union[
+            messages.AddSpanFeedbackScoresBatchMessage,
+            messages.AddTraceFeedbackScoresBatchMessage,
+        ]
+    ]
+):
     def _create_batch_from_accumulated_messages(  # type: ignore
         self,
     ) -> Union[
@@ -33,7 +115,7 @@ class BaseAddFeedbackScoresBatchMessageBatcher(base_batcher.BaseBatcher):
     ]:
         return super()._create_batch_from_accumulated_messages()  # type: ignore
 
-    def add(  # type: ignore
+    def add(
         self,
         message: Union[
             messages.AddSpanFeedbackScoresBatchMessage,
@@ -84,3 +166,133 @@ class AddTraceFeedbackScoresBatchMessageBatcher(
             batch=self._accumulated_messages,  # type: ignore
             supports_batching=False,
         )
+
+
+class BaseUpdateMessageBatcher(base_batcher.BaseBatcher[UpdateMessageT]):
+    """
+    Accumulates update messages and coalesces successive updates of the same
+    span or trace into a single message, with the same semantics as merging
+    an update into the create message (see `BaseCreateMessageBatcher.merge_update`).
+
+    If `create_message_batcher` is passed, updates of the spans or traces
+    whose create messages are still waiting in it are merged into those create
+    messages, so that only one request is sent for them.
+
+    Batchers from `batchers_to_flush_before` (the ones accumulating create messages
+    the updates might depend on) are flushed every time this batcher is flushed,
+    right before it, so that updates never get to the queue before the creates.
+
+    `message_absorbed_callback` is called with (absorbed message, message it was merged into)
+    every time a message is coalesced, so that the code tracking message delivery
+    can consider absorbed message delivered together with the one it was merged into.
+    """
+
+    def __init__(
+        self,
+        flush_callback: Callable[[messages.BaseMessage], None],
+        max_batch_size: int,
+        flush_interval_seconds: float,
+        message_absorbed_callback: Optional[MessageAbsorbedCallback] = None,
+        create_message_batcher: Optional[BaseCreateMessageBatcher[Any]] = None,
+        batchers_to_flush_before: Optional[List[base_batcher.BaseBatcher]] = None,
+    ):
+        super().__init__(
+            flush_callback=flush_callback,
+            max_batch_size=max_batch_size,
+            flush_interval_seconds=flush_interval_seconds,
+        )
+        self._message_absorbed_callback = message_absorbed_callback
+        self._create_message_batcher = create_message_batcher
+        self._batchers_to_flush_before = batchers_to_flush_before or []
+        self._accumulated_messages_by_id: Dict[str, UpdateMessageT] = {}
+
+    def add(self, message: UpdateMessageT) -> None:
+        with self._lock:
+            message_id = self._get_message_id(message)
+            accumulated_message = self._accumulated_messages_by_id.get(message_id)
+
+            if accumulated_message is not None:
+                _merge_not_none_fields(source=message, target=accumulated_message)
+                self._message_absorbed(message, into=accumulated_message)
+                return
+
+            # merging into the create message is safe only when there are no pending
+            # updates for the same id, otherwise they would be applied in the wrong order
+            if self._create_message_batcher is not None:
+                create_message = self._create_message_batcher.merge_update(message)
+                if create_message is not None:
+                    self._message_absorbed(message, into=create_message)
+                    return
+
+            self._accumulated_messages_by_id[message_id] = message
+            self._accumulated_messages.append(message)
+            if len(self._accumulated_messages) >= self._max_batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if len(self._accumulated_messages) > 0:
+                for batcher in self._batchers_to_flush_before:
+                    batcher.flush()
+
+            super().flush()
+
+    def _message_absorbed(
+        self, message: messages.BaseMessage, into: messages.BaseMessage
+    ) -> None:
+        if self._message_absorbed_callback is not None:
+            self._message_absorbed_callback(message, into)
+
+    def _pop_accumulated_messages(self) -> List[UpdateMessageT]:
+        self._accumulated_messages_by_id = {}
+        # only the messages passed to `add` are accumulated
+        return cast(List[UpdateMessageT], self._accumulated_messages)
+
+    @abc.abstractmethod
+    def _get_message_id(self, message: UpdateMessageT) -> str:
+        pass
+
+
+class UpdateSpanMessageBatcher(BaseUpdateMessageBatcher[messages.UpdateSpanMessage]):
+    def _create_batch_from_accumulated_messages(
+        self,
+    ) -> messages.UpdateSpansBatchMessage:
+        return messages.UpdateSpansBatchMessage(batch=self._pop_accumulated_messages())
+
+    def _get_message_id(self, message: messages.UpdateSpanMessage) -> str:
+        return message.span_id
+
+
+class UpdateTraceMessageBatcher(BaseUpdateMessageBatcher[messages.UpdateTraceMessage]):
+    def _create_batch_from_accumulated_messages(
+        self,
+    ) -> messages.UpdateTracesBatchMessage:
+        return messages.UpdateTracesBatchMessage(batch=self._pop_accumulated_messages())
+
+    def _get_message_id(self, message: messages.UpdateTraceMessage) -> str:
+        return message.trace_id
+
+
+def _merge_not_none_fields(
+    source: messages.BaseMessage, target: messages.BaseMessage
+) -> None:
+    """
+    Not-None values of the source are merged into the target: metadata, input,
+    output and usage are deep-merged, other values are replaced. The fields
+    the target doesn't have (e.g. the create message doesn't have some of the
+    update fields) are skipped.
+    """
+    for field in dataclasses.fields(source):
+        value = getattr(source, field.name)
+        if value is None or not hasattr(target, field.name):
+            continue
+
+        current_value = getattr(target, field.name)
+        if (
+            field.name in _DEEP_MERGED_FIELDS
+            and isinstance(current_value, dict)
+            and isinstance(value, dict)
+        ):
+            value = dict_utils.deepmerge(current_value, value)
+
+        setattr(target, field.name, value)
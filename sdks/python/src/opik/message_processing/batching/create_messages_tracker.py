@@ -0,0 +1,88 @@
+import collections
+import threading
+from typing import Counter, List, Set
+
+from .. import messages
+
+
+class InFlightCreateMessagesTracker:
+    """
+    Keeps the ids of spans and traces whose create batch messages were flushed
+    from the batchers into the queue but were not processed by the consumers yet.
+
+    Update batches are always flushed after the create batches they depend on,
+    but with several queue consumers the messages are processed concurrently,
+    so an update could still reach the backend before the corresponding create
+    request. Consumers wait for the create messages of the updated spans and traces
+    (and of the traces the updated spans belong to) before sending the updates.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight_ids: Counter[str] = collections.Counter()
+        self._condition = threading.Condition()
+
+    def register(self, message: messages.BaseMessage) -> None:
+        ids = _created_ids(message)
+        if len(ids) == 0:
+            return
+
+        with self._condition:
+            self._in_flight_ids.update(ids)
+
+    def complete(self, message: messages.BaseMessage) -> None:
+        ids = _created_ids(message)
+        if len(ids) == 0:
+            return
+
+        with self._condition:
+            for id in ids:
+                # messages replayed from the spool are put to the queue directly
+                # and were never registered
+                if id not in self._in_flight_ids:
+                    continue
+
+                self._in_flight_ids[id] -= 1
+                if self._in_flight_ids[id] <= 0:
+                    del self._in_flight_ids[id]
+
+            self._condition.notify_all()
+
+    def wait_for_dependencies(
+        self, message: messages.BaseMessage, timeout: float
+    ) -> bool:
+        """
+        Blocks until the create messages the update message depends on are processed.
+        Returns False if they were not processed in time (e.g. because they were
+        dropped from the full queue), the update is expected to be sent anyway.
+        """
+        ids = _dependency_ids(message)
+        if len(ids) == 0:
+            return True
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: all(id not in self._in_flight_ids for id in ids),
+                timeout=timeout,
+            )
+
+
+def _created_ids(message: messages.BaseMessage) -> List[str]:
+    if isinstance(message, messages.CreateSpansBatchMessage):
+        return [item.span_id for item in message.batch]
+
+    if isinstance(message, messages.CreateTraceBatchMessage):
+        return [item.trace_id for item in message.batch]
+
+    return []
+
+
+def _dependency_ids(message: messages.BaseMessage) -> Set[str]:
+    if isinstance(message, messages.UpdateSpansBatchMessage):
+        return {item.span_id for item in message.batch} | {
+            item.trace_id for item in message.batch
+        }
+
+    if isinstance(message, messages.UpdateTracesBatchMessage):
+        return {item.trace_id for item in message.batch}
+
+    return set()
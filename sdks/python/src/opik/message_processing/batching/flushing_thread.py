@@ -1,30 +1,46 @@
 import threading
-import time
-from typing import List
+from typing import List, Optional
 
-from . import base_batcher
+from . import adaptive_controller, base_batcher
 
 
 class FlushingThread(threading.Thread):
+    """
+    Periodically flushes the batchers which are ready to be flushed.
+
+    A message added to a batcher is put to the message queue at most
+    `flush_interval_seconds + probe_interval_seconds` later, even if the batch
+    is far from being full.
+
+    If `adaptive_controller_` is passed, it gets a chance to adjust the batchers
+    settings on every probe.
+    """
+
     def __init__(
         self,
         batchers: List[base_batcher.BaseBatcher],
         probe_interval_seconds: float = 0.1,
+        adaptive_controller_: Optional[
+            adaptive_controller.AdaptiveBatchingController
+        ] = None,
     ) -> None:
         threading.Thread.__init__(self, daemon=True)
         self._batchers = batchers
         self._probe_interval_seconds = probe_interval_seconds
-        self._closed = False
+        self._adaptive_controller = adaptive_controller_
+        self._closed = threading.Event()
 
     def close(self) -> None:
+        self._closed.set()
+
         for batcher in self._batchers:
             batcher.flush()
 
-        self._closed = True
-
     def run(self) -> None:
-        while not self._closed:
+        while not self._closed.wait(self._probe_interval_seconds):
+            if self._adaptive_controller is not None:
+                self._adaptive_controller.adjust()
+
             for batcher in self._batchers:
                 if batcher.is_ready_to_flush():
                     batcher.flush()
-            time.sleep(self._probe_interval_seconds)
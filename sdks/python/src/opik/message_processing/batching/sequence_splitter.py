@@ -1,14 +1,90 @@
-import json
-from typing import List, Optional, TypeVar, Sequence
+import dataclasses
+import json.encoder
+from typing import Any, List, Optional, TypeVar, Sequence
+
+import pydantic
+
 from opik import jsonable_encoder
 
 T = TypeVar("T")
 
+_MAX_SIZE_ESTIMATION_DEPTH = 50
+
 
 def _get_expected_payload_size_MB(item: T) -> float:
-    encoded_for_json = jsonable_encoder.jsonable_encoder(item)
-    json_str = json.dumps(encoded_for_json)
-    return len(json_str.encode("utf-8")) / (1024 * 1024)
+    if isinstance(item, bytes):
+        # already serialized JSON
+        return len(item) / (1024 * 1024)
+
+    return estimate_json_size_bytes(item) / (1024 * 1024)
+
+
+def estimate_json_size_bytes(obj: Any, depth: int = 0) -> int:
+    """
+    Calculates the size of `json.dumps(jsonable_encoder(obj))` without building
+    the encoded copy of the object and the JSON string.
+
+    The result is exact for the objects made of dicts, lists, strings, numbers,
+    dataclasses and pydantic models (which is the case for the items sent in batches,
+    their fields are already encoded). Other objects are passed to `jsonable_encoder`
+    individually and the size of the result is calculated.
+    """
+    if isinstance(obj, str):
+        # the same function json.dumps uses to encode the strings with the default ensure_ascii=True
+        return len(json.encoder.encode_basestring_ascii(obj))
+
+    if obj is None:
+        return 4  # null
+
+    if isinstance(obj, (int, float)):
+        # bool is a subclass of int, repr of True and False has the same length as true and false
+        return len(repr(obj))
+
+    if depth >= _MAX_SIZE_ESTIMATION_DEPTH:
+        return len(json.encoder.encode_basestring_ascii(str(obj)))
+
+    if isinstance(obj, dict):
+        # separators used by json.dumps by default are ", " and ": "
+        return (
+            2
+            + sum(
+                estimate_json_size_bytes(
+                    key if isinstance(key, str) else _as_json_key(key), depth + 1
+                )
+                + 2
+                + estimate_json_size_bytes(value, depth + 1)
+                for key, value in obj.items()
+            )
+            + 2 * max(len(obj) - 1, 0)
+        )
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return (
+            2
+            + sum(estimate_json_size_bytes(item, depth + 1) for item in obj)
+            + 2 * max(len(obj) - 1, 0)
+        )
+
+    if isinstance(obj, pydantic.BaseModel):
+        return estimate_json_size_bytes(obj.__dict__, depth + 1)
+
+    if dataclasses.is_dataclass(obj):
+        # the messages declare __slots__ and have no __dict__
+        fields = {
+            field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)
+        }
+        return estimate_json_size_bytes(fields, depth + 1)
+
+    return estimate_json_size_bytes(jsonable_encoder.jsonable_encoder(obj), depth + 1)
+
+
+def _as_json_key(key: Any) -> str:
+    encoded_key = jsonable_encoder.jsonable_encoder(key)
+    if isinstance(encoded_key, str):
+        return encoded_key
+
+    # json.dumps converts non-string keys to strings
+    return json.dumps(encoded_key)
 
 
 def split_into_batches(
@@ -0,0 +1,218 @@
+import errno
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pathlib
+import secrets
+import socket
+import threading
+from typing import Optional
+
+from opik import logging_messages
+from . import message_processors, message_serializer, messages, streamer
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_AUTHKEY_FILE_PATH = "~/.opik_message_forwarding.key"
+_AUTHKEY_SIZE_BYTES = 32
+
+
+def get_authkey(
+    configured_authkey: Optional[str],
+    authkey_file_path: str = DEFAULT_AUTHKEY_FILE_PATH,
+) -> bytes:
+    """
+    Returns the key the connections between the forwarders and the uploader are
+    authenticated with. If it's not configured, the key stored in `authkey_file_path`
+    is used, the file readable only by the current user is created with a random key
+    if it doesn't exist, so all the processes of the user share the same key.
+    """
+    if configured_authkey is not None:
+        return configured_authkey.encode("utf-8")
+
+    path = pathlib.Path(authkey_file_path).expanduser()
+    try:
+        return bytes.fromhex(path.read_text().strip())
+    except FileNotFoundError:
+        pass
+
+    partial_path = path.with_name(f"{path.name}-{os.getpid()}.part")
+    fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as file:
+        file.write(secrets.token_hex(_AUTHKEY_SIZE_BYTES))
+    try:
+        # fails if another process has created the key in the meantime
+        os.link(partial_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        partial_path.unlink()
+
+    return bytes.fromhex(path.read_text().strip())
+
+
+class MessageForwarder(message_processors.BaseMessageProcessor):
+    """
+    Forwards the messages to the local uploader process (see `MessageUploader`)
+    instead of sending them to the backend. The connection is opened on the first
+    message and re-opened once if it turns out to be broken, e.g. after the uploader restart.
+    The connection is authenticated with `authkey`, it must be the same as the uploader's one.
+    """
+
+    def __init__(self, address: str, authkey: bytes) -> None:
+        self._address = address
+        self._authkey = authkey
+        self._connection: Optional[multiprocessing.connection.Connection] = None
+        self._lock = threading.Lock()
+
+    def process(self, message: messages.BaseMessage) -> None:
+        data = message_serializer.serialize(message)
+
+        with self._lock:
+            try:
+                try:
+                    self._send(data)
+                except (OSError, EOFError):
+                    self._close_connection()
+                    self._send(data)
+            except (
+                OSError,
+                EOFError,
+                multiprocessing.AuthenticationError,
+            ) as exception:
+                self._close_connection()
+                LOGGER.error(
+                    logging_messages.FAILED_TO_PROCESS_MESSAGE_IN_BACKGROUND_STREAMER,
+                    type(message).__name__,
+                    f"failed to forward message to uploader at {self._address}: {exception}",
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_connection()
+
+    def _send(self, data: bytes) -> None:
+        if self._connection is None:
+            self._connection = multiprocessing.connection.Client(
+                self._address, authkey=self._authkey
+            )
+
+        self._connection.send_bytes(data)
+
+    def _close_connection(self) -> None:
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.close()
+        except OSError:
+            pass
+        self._connection = None
+
+
+class MessageUploader:
+    """
+    Receives the messages forwarded by the clients of the local processes
+    and puts them into the streamer which sends them to the backend.
+
+    Messages of every connection are put in the order they were sent.
+    The connections which fail to authenticate with `authkey` are rejected.
+    """
+
+    def __init__(
+        self, address: str, message_streamer: streamer.Streamer, authkey: bytes
+    ) -> None:
+        self._address = address
+        self._streamer = message_streamer
+        self._authkey = authkey
+        self._listener: Optional[multiprocessing.connection.Listener] = None
+        self._closed = threading.Event()
+
+    def start(self) -> None:
+        if _is_unix_socket_path(self._address) and os.path.exists(self._address):
+            if _is_unix_socket_listened(self._address):
+                raise OSError(
+                    errno.EADDRINUSE,
+                    f"Another uploader is already listening at {self._address}",
+                )
+            # left over by the uploader which was not stopped properly
+            os.unlink(self._address)
+
+        self._listener = multiprocessing.connection.Listener(
+            self._address, authkey=self._authkey
+        )
+        LOGGER.info("Opik uploader is listening at %s", self._address)
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.start()
+        assert self._listener is not None
+
+        while True:
+            try:
+                connection = self._listener.accept()
+            except multiprocessing.AuthenticationError:
+                LOGGER.warning(
+                    "Rejected the connection which failed to authenticate, "
+                    "the forwarding processes have to use the same authkey as the uploader"
+                )
+                continue
+            except (OSError, EOFError):
+                if self._closed.is_set():
+                    return
+                LOGGER.debug("Failed to accept connection", exc_info=True)
+                continue
+
+            if self._closed.is_set():
+                connection.close()
+                return
+
+            threading.Thread(
+                target=self._receive_messages,
+                args=(connection,),
+                name="OpikUploaderConnectionThread",
+                daemon=True,
+            ).start()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._listener is None:
+            return
+
+        try:
+            # wakes up serve_forever() blocked in accept()
+            multiprocessing.connection.Client(
+                self._address, authkey=self._authkey
+            ).close()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            pass
+        self._listener.close()
+
+    def _receive_messages(
+        self, connection: multiprocessing.connection.Connection
+    ) -> None:
+        with connection:
+            while True:
+                try:
+                    data = connection.recv_bytes()
+                except (EOFError, OSError):
+                    return  # the client process has closed the connection or exited
+
+                try:
+                    self._streamer.put(message_serializer.deserialize(data))
+                except Exception:
+                    LOGGER.error("Failed to read forwarded message", exc_info=True)
+
+
+def _is_unix_socket_listened(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as unix_socket:
+        try:
+            unix_socket.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+def _is_unix_socket_path(address: str) -> bool:
+    return multiprocessing.connection.address_type(address) == "AF_UNIX"  # type: ignore[attr-defined]
@@ -0,0 +1,442 @@
+import dataclasses
+import datetime
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from . import attachment_offload, message_processors, messages, request_body
+from .. import dict_utils, environment
+from ..jsonable_encoder import jsonable_encoder
+from ..rest_api import client as rest_api_client
+from ..rest_api import core as rest_api_core
+from ..rest_api.types import feedback_score_batch_item
+from .batching import sequence_splitter
+
+LOGGER = logging.getLogger(__name__)
+
+FILE_SUFFIX = ".jsonl.gz"
+PARTIAL_FILE_SUFFIX = ".part"
+
+DEFAULT_MAX_FILE_SIZE_BYTES = 64 * 1024 * 1024
+WRITE_BUFFER_SIZE_BYTES = 1024 * 1024
+GZIP_COMPRESSION_LEVEL = 6
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+
+UPLOAD_BATCH_SIZE = 1000
+FEEDBACK_SCORES_UPLOAD_BATCH_SIZE = 1000
+
+CREATE_SPAN = "create_span"
+CREATE_TRACE = "create_trace"
+UPDATE_SPAN = "update_span"
+UPDATE_TRACE = "update_trace"
+SPAN_FEEDBACK_SCORE = "span_feedback_score"
+TRACE_FEEDBACK_SCORE = "trace_feedback_score"
+
+_RECORD_TYPES: Dict[Type[messages.BaseMessage], str] = {
+    messages.CreateSpanMessage: CREATE_SPAN,
+    messages.CreateTraceMessage: CREATE_TRACE,
+    messages.UpdateSpanMessage: UPDATE_SPAN,
+    messages.UpdateTraceMessage: UPDATE_TRACE,
+}
+_FEEDBACK_SCORE_RECORD_TYPES: Dict[Type[messages.BaseMessage], str] = {
+    messages.AddSpanFeedbackScoresBatchMessage: SPAN_FEEDBACK_SCORE,
+    messages.AddTraceFeedbackScoresBatchMessage: TRACE_FEEDBACK_SCORE,
+}
+
+# opik-<timestamp>-<hostname>-<pid>-<number of the file>.jsonl.gz.part
+_PARTIAL_FILE_NAME_PATTERN = re.compile(
+    r"opik-\d+T\d+-(?P<hostname>.+)-(?P<pid>\d+)-\d+"
+    + re.escape(FILE_SUFFIX + PARTIAL_FILE_SUFFIX)
+)
+
+# the Windows API values used to check if the process is running
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+
+class LocalSinkWriter(message_processors.BaseMessageProcessor):
+    """
+    Writes the messages to gzip-compressed JSON Lines files in `directory` instead
+    of sending them to the backend. Every line is a record
+    `{"type": "create_span", "payload": {...}}` where the payload is the body
+    the REST API expects for that operation, batch messages are written item by item.
+
+    The file being written has the `.part` suffix, it is renamed when it grows
+    above `max_file_size_bytes` (a new file is started) and when the writer is closed.
+    Completed files can be sent to the backend later with `upload_directory`.
+
+    Every `flush_interval_seconds` the gzip member being written is completed and
+    a new one is started in the same file, so the records written before are
+    readable even if the file is not completed yet.
+
+    If `attachment_offloader` is set, the big binary data in the payloads
+    is stored by it and the records contain the references to it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_file_size_bytes: int = DEFAULT_MAX_FILE_SIZE_BYTES,
+        attachment_offloader: Optional[attachment_offload.AttachmentOffloader] = None,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+    ) -> None:
+        self._directory = directory
+        self._attachment_offloader = attachment_offloader
+        self._max_file_size_bytes = max_file_size_bytes
+        self._flush_interval_seconds = flush_interval_seconds
+        self._lock = threading.Lock()
+
+        self._raw_file: Optional[IO[bytes]] = None
+        self._gzip_file: Optional[gzip.GzipFile] = None
+        self._file: Optional[io.BufferedWriter] = None
+        self._file_path: Optional[str] = None
+        self._file_size_bytes = 0
+        self._files_created = 0
+        self._has_unflushed_records = False
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._closed = threading.Event()
+        self._flushing_thread = threading.Thread(
+            target=self._flush_periodically, daemon=True
+        )
+        self._flushing_thread.start()
+
+    def process(self, message: messages.BaseMessage) -> None:
+        if self._attachment_offloader is not None:
+            self._attachment_offloader.offload_message(message)
+
+        lines = [
+            request_body.encode_json({"type": record_type, "payload": payload}) + b"\n"
+            for record_type, payload in _records(message)
+        ]
+        if len(lines) == 0:
+            LOGGER.debug("Unknown type of message - %s", type(message).__name__)
+            return
+
+        with self._lock:
+            if self._file is None:
+                self._open_new_file()
+            assert self._file is not None
+
+            for line in lines:
+                self._file.write(line)
+                self._file_size_bytes += len(line)
+            self._has_unflushed_records = True
+
+            if self._file_size_bytes >= self._max_file_size_bytes:
+                self._complete_file()
+
+    def flush(self) -> None:
+        """
+        Makes the records written so far readable from the file being written.
+        """
+        with self._lock:
+            if self._file is None or not self._has_unflushed_records:
+                return
+
+            self._complete_gzip_member()
+            self._start_gzip_member()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._complete_file()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._flush_interval_seconds):
+            try:
+                self.flush()
+            except Exception:
+                LOGGER.error("Failed to flush local sink file", exc_info=True)
+
+    def _open_new_file(self) -> None:
+        timestamp = datetime.datetime.now(datetime.timezone.utc).strftime(
+            "%Y%m%dT%H%M%S%f"
+        )
+        # the host name and the pid tell `upload_directory` if the writer is still running
+        file_name = (
+            f"opik-{timestamp}-{_get_hostname()}-{os.getpid()}-"
+            f"{self._files_created:06d}{FILE_SUFFIX}"
+        )
+        self._file_path = os.path.join(self._directory, file_name)
+        self._files_created += 1
+
+        self._raw_file = open(self._file_path + PARTIAL_FILE_SUFFIX, "wb")
+        self._file_size_bytes = 0
+        self._start_gzip_member()
+
+    def _start_gzip_member(self) -> None:
+        assert self._raw_file is not None
+        # GzipFile doesn't close the file object it was given
+        self._gzip_file = gzip.GzipFile(
+            fileobj=self._raw_file, mode="wb", compresslevel=GZIP_COMPRESSION_LEVEL
+        )
+        self._file = io.BufferedWriter(
+            self._gzip_file,  # type: ignore[arg-type]
+            buffer_size=WRITE_BUFFER_SIZE_BYTES,
+        )
+        self._has_unflushed_records = False
+
+    def _complete_gzip_member(self) -> None:
+        assert self._file is not None
+        assert self._gzip_file is not None
+        assert self._raw_file is not None
+
+        self._file.flush()
+        self._file.detach()
+        self._gzip_file.close()
+        self._raw_file.flush()
+
+        self._file = None
+        self._gzip_file = None
+
+    def _complete_file(self) -> None:
+        if self._file is None or self._file_path is None:
+            return
+
+        self._complete_gzip_member()
+        if self._raw_file is not None:
+            self._raw_file.close()
+            self._raw_file = None
+        os.replace(self._file_path + PARTIAL_FILE_SUFFIX, self._file_path)
+        LOGGER.debug("Completed local sink file %s", self._file_path)
+
+        self._file_path = None
+
+
+def _records(message: messages.BaseMessage) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    message_type = type(message)
+
+    if message_type in _RECORD_TYPES:
+        yield _RECORD_TYPES[message_type], _encode_payload(message)
+    elif message_type in _FEEDBACK_SCORE_RECORD_TYPES:
+        for score_message in message.batch:  # type: ignore[attr-defined]
+            yield (
+                _FEEDBACK_SCORE_RECORD_TYPES[message_type],
+                _encode_payload(score_message),
+            )
+    elif hasattr(message, "batch"):
+        for item in message.batch:
+            yield from _records(item)
+
+
+def _encode_payload(message: messages.BaseMessage) -> Dict[str, Any]:
+    cleaned_kwargs = dict_utils.remove_none_from_dict(message.as_payload_dict())
+    return jsonable_encoder(cleaned_kwargs)
+
+
+@dataclasses.dataclass
+class UploadStats:
+    uploaded_files: int = 0
+    uploaded_records: int = 0
+    failed_files: int = 0
+    incomplete_files: int = 0
+    recovered_files: int = 0
+
+
+def upload_directory(
+    rest_client: rest_api_client.OpikApi,
+    directory: str,
+    delete_uploaded: bool = False,
+) -> UploadStats:
+    """
+    Sends the data written by `LocalSinkWriter` to the backend. Files are uploaded in
+    the order they were written. Creates of traces and spans are sent through the batch
+    endpoints, and all the creates read before an update are sent before it.
+
+    Files which were not completed because the process writing them exited without
+    closing the writer (e.g. it crashed) are completed and uploaded with the records
+    flushed to them. Files which are still being written are skipped.
+
+    The upload stops at the first file which failed to be uploaded, so that the updates
+    from the next files are not sent before the creates they apply to. The failed file
+    and the next ones are kept and can be uploaded again.
+    """
+    stats = UploadStats()
+
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(FILE_SUFFIX + PARTIAL_FILE_SUFFIX) and _is_abandoned(
+            file_name
+        ):
+            path = os.path.join(directory, file_name)
+            os.replace(path, path[: -len(PARTIAL_FILE_SUFFIX)])
+            LOGGER.info("Recovered incomplete local sink file %s", path)
+            stats.recovered_files += 1
+
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith(FILE_SUFFIX + PARTIAL_FILE_SUFFIX):
+            stats.incomplete_files += 1
+            continue
+        if not file_name.endswith(FILE_SUFFIX):
+            continue
+
+        path = os.path.join(directory, file_name)
+        try:
+            stats.uploaded_records += _FileUploader(rest_client).upload(path)
+        except Exception as exception:
+            LOGGER.error(
+                "Failed to upload %s, it and the next files are kept: %s",
+                path,
+                exception,
+                exc_info=True,
+            )
+            stats.failed_files += 1
+            break
+
+        stats.uploaded_files += 1
+        if delete_uploaded:
+            os.remove(path)
+
+    if stats.incomplete_files > 0:
+        LOGGER.warning(
+            "%d incomplete local sink files were skipped in %s",
+            stats.incomplete_files,
+            directory,
+        )
+
+    return stats
+
+
+def _get_hostname() -> str:
+    return re.sub(r"[^A-Za-z0-9.-]", "_", environment.get_hostname())
+
+
+def _is_abandoned(partial_file_name: str) -> bool:
+    """
+    Returns True if the process which was writing the file is not running anymore.
+    The files written on other hosts are never considered abandoned.
+    """
+    match = _PARTIAL_FILE_NAME_PATTERN.fullmatch(partial_file_name)
+    if match is None or match.group("hostname") != _get_hostname():
+        return False
+
+    return not _is_process_running(int(match.group("pid")))
+
+
+def _is_process_running(pid: int) -> bool:
+    if sys.platform == "win32":
+        # os.kill() terminates the process on Windows
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return kernel32.GetLastError() == _ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # the process of another user
+        return True
+    return True
+
+
+class _FileUploader:
+    def __init__(self, rest_client: rest_api_client.OpikApi) -> None:
+        self._rest_client = rest_client
+        self._pending: Dict[str, List[Dict[str, Any]]] = {
+            CREATE_SPAN: [],
+            CREATE_TRACE: [],
+            SPAN_FEEDBACK_SCORE: [],
+            TRACE_FEEDBACK_SCORE: [],
+        }
+
+    def upload(self, path: str) -> int:
+        records = 0
+        for record in _read_records(path):
+            record_type = record["type"]
+            payload = record["payload"]
+            records += 1
+
+            if record_type in self._pending:
+                self._pending[record_type].append(payload)
+                if len(self._pending[record_type]) >= UPLOAD_BATCH_SIZE:
+                    self._send_pending(record_type)
+            elif record_type == UPDATE_SPAN:
+                self._send_creates()
+                self._rest_client.spans.update_span(**payload)
+            elif record_type == UPDATE_TRACE:
+                self._send_creates()
+                self._rest_client.traces.update_trace(**payload)
+            else:
+                LOGGER.debug("Unknown type of record - %s", record_type)
+
+        self._send_creates()
+        self._send_pending(SPAN_FEEDBACK_SCORE)
+        self._send_pending(TRACE_FEEDBACK_SCORE)
+
+        return records
+
+    def _send_creates(self) -> None:
+        self._send_pending(CREATE_TRACE)
+        self._send_pending(CREATE_SPAN)
+
+    def _send_pending(self, record_type: str) -> None:
+        payloads = self._pending[record_type]
+        if len(payloads) == 0:
+            return
+        self._pending[record_type] = []
+
+        if record_type == CREATE_SPAN:
+            self._post_create_batch(
+                payloads, message_processors.CREATE_SPANS_BATCH_PATH, "spans"
+            )
+        elif record_type == CREATE_TRACE:
+            self._post_create_batch(
+                payloads, message_processors.CREATE_TRACES_BATCH_PATH, "traces"
+            )
+        else:
+            scores = [
+                feedback_score_batch_item.FeedbackScoreBatchItem(**payload)
+                for payload in payloads
+            ]
+            for batch in sequence_splitter.split_into_batches(
+                scores, max_length=FEEDBACK_SCORES_UPLOAD_BATCH_SIZE
+            ):
+                if record_type == SPAN_FEEDBACK_SCORE:
+                    self._rest_client.spans.score_batch_of_spans(scores=batch)
+                else:
+                    self._rest_client.traces.score_batch_of_traces(scores=batch)
+
+    def _post_create_batch(
+        self, payloads: List[Dict[str, Any]], path: str, field_name: str
+    ) -> None:
+        bodies = request_body.join_batch_bodies(
+            [request_body.encode_json(payload) for payload in payloads],
+            field_name=field_name,
+            max_payload_size_MB=message_processors.BATCH_MEMORY_LIMIT_MB,
+        )
+        for body in bodies:
+            try:
+                request_body.post(rest_client=self._rest_client, path=path, body=body)
+            except rest_api_core.ApiError as exception:
+                if exception.status_code != 409:  # already uploaded
+                    raise
+
+
+def _read_records(path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rb") as file:
+        try:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    LOGGER.warning("Skipping malformed record in %s", path)
+        except (EOFError, gzip.BadGzipFile):
+            LOGGER.warning("%s is truncated, uploading the records read so far", path)
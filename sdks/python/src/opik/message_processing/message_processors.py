@@ -1,20 +1,30 @@
 import abc
+import concurrent.futures
 import logging
-from typing import Callable, Dict, Type, List
+import threading
+import time
+from typing import Callable, Dict, Type, List, Optional, Sequence, Union
+
+import httpx
+
 from opik import logging_messages
-from . import messages
+from . import attachment_offload, messages, request_body, spool
 from ..jsonable_encoder import jsonable_encoder
 from .. import dict_utils
-from ..rest_api.types import feedback_score_batch_item, trace_write
-from ..rest_api.types import span_write
+from ..rest_api.types import feedback_score_batch_item
 from ..rest_api import core as rest_api_core
 from ..rest_api import client as rest_api_client
 
-from .batching import sequence_splitter
+from .batching import adaptive_controller, create_messages_tracker
 
 LOGGER = logging.getLogger(__name__)
 
 BATCH_MEMORY_LIMIT_MB = 50
+CREATE_MESSAGES_WAIT_TIMEOUT_SECONDS = 10.0
+
+CREATE_SPANS_BATCH_PATH = "v1/private/spans/batch"
+CREATE_TRACES_BATCH_PATH = "v1/private/traces/batch"
+_CREATE_BATCH_PATHS = (CREATE_SPANS_BATCH_PATH, CREATE_TRACES_BATCH_PATH)
 
 
 class BaseMessageProcessor(abc.ABC):
@@ -22,10 +32,50 @@ class BaseMessageProcessor(abc.ABC):
     def process(self, message: messages.BaseMessage) -> None:
         pass
 
+    def close(self) -> None:
+        """
+        Releases the resources of the processor, called when the streamer is closed.
+        """
+        pass
+
 
 class MessageSender(BaseMessageProcessor):
-    def __init__(self, rest_client: rest_api_client.OpikApi):
+    def __init__(
+        self,
+        rest_client: rest_api_client.OpikApi,
+        spool: Optional[spool.MessageSpool] = None,
+        create_messages_tracker: Optional[
+            create_messages_tracker.InFlightCreateMessagesTracker
+        ] = None,
+        adaptive_controller: Optional[
+            adaptive_controller.AdaptiveBatchingController
+        ] = None,
+        max_in_flight_batch_requests: int = 1,
+        attachment_offloader: Optional[attachment_offload.AttachmentOffloader] = None,
+    ):
+        """
+        `max_in_flight_batch_requests` limits the number of concurrent requests
+        to every bulk create endpoint, made by all queue consumers together.
+        Create batches which are too big for one request are split, and the parts
+        are sent concurrently within that limit.
+
+        If `attachment_offloader` is set, the big binary data in the payloads
+        is stored by it before the messages are sent.
+        """
         self._rest_client = rest_client
+        self._attachment_offloader = attachment_offloader
+        self._spool = spool
+        self._create_messages_tracker = create_messages_tracker
+        self._adaptive_controller = adaptive_controller
+
+        self._in_flight_batch_requests = {
+            path: threading.BoundedSemaphore(max_in_flight_batch_requests)
+            for path in _CREATE_BATCH_PATHS
+        }
+        self._batch_requests_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_in_flight_batch_requests * len(_CREATE_BATCH_PATHS),
+            thread_name_prefix="OpikBatchRequestThread",
+        )
 
         self._handlers: Dict[Type, Callable[[messages.BaseMessage], None]] = {
             messages.CreateSpanMessage: self._process_create_span_message,  # type: ignore
@@ -36,6 +86,8 @@ class MessageSender(BaseMessageProcessor):
             messages.AddSpanFeedbackScoresBatchMessage: self._process_add_span_feedback_scores_batch_message,  # type: ignore
             messages.CreateSpansBatchMessage: self._process_create_span_batch_message,  # type: ignore
             messages.CreateTraceBatchMessage: self._process_create_trace_batch_message,  # type: ignore
+            messages.UpdateSpansBatchMessage: self._process_update_messages_batch,  # type: ignore
+            messages.UpdateTracesBatchMessage: self._process_update_messages_batch,  # type: ignore
         }
 
     def process(self, message: messages.BaseMessage) -> None:
@@ -45,15 +97,50 @@ class MessageSender(BaseMessageProcessor):
             LOGGER.debug("Unknown type of message - %s", message_type.__name__)
             return
 
+        if self._attachment_offloader is not None:
+            self._attachment_offloader.offload_message(message)
+
+        if self._create_messages_tracker is None:
+            self._process(message, handler)
+            return
+
+        if not self._create_messages_tracker.wait_for_dependencies(
+            message, timeout=CREATE_MESSAGES_WAIT_TIMEOUT_SECONDS
+        ):
+            LOGGER.debug(
+                "Create messages were not processed in time, sending %s anyway",
+                message_type.__name__,
+            )
+
+        try:
+            self._process(message, handler)
+        finally:
+            self._create_messages_tracker.complete(message)
+
+    def _process(
+        self,
+        message: messages.BaseMessage,
+        handler: Callable[[messages.BaseMessage], None],
+    ) -> None:
+        message_type = type(message)
+        start_time = time.monotonic()
         try:
             handler(message)
+            self._acknowledge(message)
+            self._observe_request(message, start_time, failed=False)
         except rest_api_core.ApiError as exception:
+            self._observe_request(
+                message, start_time, failed=_is_retryable_error(exception)
+            )
+            if not _is_retryable_error(exception):
+                self._acknowledge(message)
+
             if exception.status_code == 409:
                 # sometimes retry mechanism works in a way that it sends the same request 2 times.
                 # second request is rejected by the backend, we don't want users to an error.
                 return
 
-            error_fingerprint = _generate_error_fingerprint(exception, message)
+            error_fingerprint = generate_error_fingerprint(exception, message)
             LOGGER.error(
                 logging_messages.FAILED_TO_PROCESS_MESSAGE_IN_BACKGROUND_STREAMER,
                 message_type.__name__,
@@ -61,7 +148,13 @@ class MessageSender(BaseMessageProcessor):
                 extra={"error_fingerprint": error_fingerprint},
             )
         except Exception as exception:
-            error_fingerprint = _generate_error_fingerprint(exception, message)
+            self._observe_request(
+                message, start_time, failed=_is_retryable_error(exception)
+            )
+            if not _is_retryable_error(exception):
+                self._acknowledge(message)
+
+            error_fingerprint = generate_error_fingerprint(exception, message)
             LOGGER.error(
                 logging_messages.FAILED_TO_PROCESS_MESSAGE_IN_BACKGROUND_STREAMER,
                 message_type.__name__,
@@ -70,6 +163,26 @@ class MessageSender(BaseMessageProcessor):
                 extra={"error_fingerprint": error_fingerprint},
             )
 
+    def _observe_request(
+        self, message: messages.BaseMessage, start_time: float, failed: bool
+    ) -> None:
+        if self._adaptive_controller is None or isinstance(
+            message,
+            (messages.UpdateSpansBatchMessage, messages.UpdateTracesBatchMessage),
+        ):
+            # update batches are not sent as a whole, their items are observed one by one
+            return
+
+        self._adaptive_controller.observe_request(
+            items=len(message.batch) if hasattr(message, "batch") else 1,
+            latency_seconds=time.monotonic() - start_time,
+            failed=failed,
+        )
+
+    def _acknowledge(self, message: messages.BaseMessage) -> None:
+        if self._spool is not None:
+            self._spool.acknowledge(message)
+
     def _process_create_span_message(self, message: messages.CreateSpanMessage) -> None:
         create_span_kwargs = message.as_payload_dict()
         cleaned_create_span_kwargs = dict_utils.remove_none_from_dict(
@@ -117,7 +230,9 @@ class MessageSender(BaseMessageProcessor):
         self, message: messages.AddSpanFeedbackScoresBatchMessage
     ) -> None:
         scores = [
-            feedback_score_batch_item.FeedbackScoreBatchItem(**score_message.__dict__)
+            feedback_score_batch_item.FeedbackScoreBatchItem(
+                **score_message.as_payload_dict()
+            )
             for score_message in message.batch
         ]
 
@@ -132,7 +247,9 @@ class MessageSender(BaseMessageProcessor):
         self, message: messages.AddTraceFeedbackScoresBatchMessage
     ) -> None:
         scores = [
-            feedback_score_batch_item.FeedbackScoreBatchItem(**score_message.__dict__)
+            feedback_score_batch_item.FeedbackScoreBatchItem(
+                **score_message.as_payload_dict()
+            )
             for score_message in message.batch
         ]
 
@@ -146,51 +263,86 @@ class MessageSender(BaseMessageProcessor):
     def _process_create_span_batch_message(
         self, message: messages.CreateSpansBatchMessage
     ) -> None:
-        rest_spans: List[span_write.SpanWrite] = []
+        self._send_create_batch(
+            items=message.batch,
+            path=CREATE_SPANS_BATCH_PATH,
+            field_name="spans",
+        )
 
-        for item in message.batch:
-            span_write_kwargs = item.as_payload_dict()
-            cleaned_span_write_kwargs = dict_utils.remove_none_from_dict(
-                span_write_kwargs
-            )
-            cleaned_span_write_kwargs = jsonable_encoder(cleaned_span_write_kwargs)
-            rest_spans.append(span_write.SpanWrite(**cleaned_span_write_kwargs))
+    def _process_create_trace_batch_message(
+        self, message: messages.CreateTraceBatchMessage
+    ) -> None:
+        self._send_create_batch(
+            items=message.batch,
+            path=CREATE_TRACES_BATCH_PATH,
+            field_name="traces",
+        )
 
-        memory_limited_batches = sequence_splitter.split_into_batches(
-            items=rest_spans,
+    def _send_create_batch(
+        self, items: Sequence[messages.BaseMessage], path: str, field_name: str
+    ) -> None:
+        bodies = request_body.encode_create_batch_bodies(
+            items=items,
+            field_name=field_name,
             max_payload_size_MB=BATCH_MEMORY_LIMIT_MB,
         )
 
-        for batch in memory_limited_batches:
-            LOGGER.debug("Create spans batch request of size %d", len(batch))
-            self._rest_client.spans.create_spans(spans=batch)
-            LOGGER.debug("Sent spans batch of size %d", len(batch))
+        if len(bodies) == 1:
+            self._post_batch_request_body(path=path, body=bodies[0])
+            return
 
-    def _process_create_trace_batch_message(
-        self, message: messages.CreateTraceBatchMessage
+        # The message is considered processed (and the updates depending on it
+        # are sent) only when all the parts are sent, so the ordering guarantees
+        # between the creates and the updates still hold.
+        LOGGER.debug("Sending %s batch in %d parts", field_name, len(bodies))
+        futures = [
+            self._batch_requests_executor.submit(
+                self._post_batch_request_body, path=path, body=body
+            )
+            for body in bodies
+        ]
+        concurrent.futures.wait(futures)
+        for future in futures:
+            future.result()  # re-raises the first error
+
+    def _post_batch_request_body(self, path: str, body: bytes) -> None:
+        with self._in_flight_batch_requests[path]:
+            LOGGER.debug("Batch request to %s of size %d bytes", path, len(body))
+            self._post_request_body(path=path, body=body)
+
+    def _post_request_body(self, path: str, body: bytes) -> None:
+        request_body.post(rest_client=self._rest_client, path=path, body=body)
+
+    def _process_update_messages_batch(
+        self,
+        message: Union[
+            messages.UpdateSpansBatchMessage, messages.UpdateTracesBatchMessage
+        ],
     ) -> None:
-        rest_traces: List[trace_write.TraceWrite] = []
-
+        # There is no bulk update endpoint, the batch contains already coalesced
+        # updates (one per span or trace) which are sent one by one.
+        # Every update is processed as a separate message, so that a failure
+        # of one of them doesn't prevent sending the rest.
+        LOGGER.debug(
+            "Processing %s of size %d", type(message).__name__, len(message.batch)
+        )
         for item in message.batch:
-            trace_write_kwargs = item.as_payload_dict()
-            cleaned_trace_write_kwargs = dict_utils.remove_none_from_dict(
-                trace_write_kwargs
-            )
-            cleaned_trace_write_kwargs = jsonable_encoder(cleaned_trace_write_kwargs)
-            rest_traces.append(trace_write.TraceWrite(**cleaned_trace_write_kwargs))
+            self.process(item)
 
-        memory_limited_batches = sequence_splitter.split_into_batches(
-            items=rest_traces,
-            max_payload_size_MB=BATCH_MEMORY_LIMIT_MB,
-        )
 
-        for batch in memory_limited_batches:
-            LOGGER.debug("Create trace batch request of size %d", len(batch))
-            self._rest_client.traces.create_traces(traces=batch)
-            LOGGER.debug("Sent trace batch of size %d", len(batch))
+def _is_retryable_error(exception: Exception) -> bool:
+    """
+    Messages which failed because of the retryable errors stay in the spool
+    and are sent again on the next start.
+    """
+    if isinstance(exception, rest_api_core.ApiError):
+        status_code = exception.status_code
+        return status_code is not None and (status_code == 429 or status_code >= 500)
+
+    return isinstance(exception, httpx.TransportError)
 
 
-def _generate_error_fingerprint(
+def generate_error_fingerprint(
     exception: Exception, message: messages.BaseMessage
 ) -> List[str]:
     fingerprint = [type(message).__name__, type(exception).__name__]
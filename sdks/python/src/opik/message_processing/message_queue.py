@@ -0,0 +1,362 @@
+import collections
+import dataclasses
+import logging
+import queue
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import IO, Any, Callable, Deque, Literal, Optional, Set, Tuple
+
+from . import messages, message_serializer
+
+LOGGER = logging.getLogger(__name__)
+
+BackpressurePolicy = Literal["block", "drop_oldest", "drop_newest", "spill_to_disk"]
+
+_RECORD_HEADER = struct.Struct("<I")
+_DROP_WARNING_INTERVAL_SECONDS = 60.0
+_MAX_SIZE_ESTIMATION_DEPTH = 20
+
+
+@dataclasses.dataclass
+class MessageQueueStats:
+    size: int
+    size_bytes: int
+    dropped_messages: int
+    spilled_messages: int
+
+
+class MessageQueue(queue.Queue):
+    """
+    Queue of messages waiting to be processed by the queue consumers.
+
+    The queue can be limited by the number of messages and by the estimated
+    size of messages in bytes. When a new message doesn't fit, the backpressure
+    policy decides what happens:
+        * "block" - the caller waits until there is enough space in the queue.
+        * "drop_oldest" - the oldest messages are removed from the queue.
+        * "drop_newest" - the new message is discarded.
+        * "spill_to_disk" - the new message is written to a temporary file
+            and is read back from it once the in-memory part of the queue is drained.
+
+    `None` is used as a sentinel for stopping the consumers, it is never dropped
+    and doesn't count towards the limits.
+
+    Every message gets a sequence number in the order of putting, which allows
+    waiting until all the messages put before some moment are processed
+    (see `wait_for_processed`), even if new messages keep coming.
+    Consumers must call `task_done` when they finish processing a message.
+
+    `dropped_message_callback` is called with every message dropped by the backpressure
+    policy, while the queue lock is held.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 0,
+        max_size_bytes: Optional[int] = None,
+        backpressure_policy: BackpressurePolicy = "spill_to_disk",
+        spill_directory: Optional[str] = None,
+        dropped_message_callback: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        super().__init__()
+        self.queue: Deque[Any]
+        self._dropped_message_callback = dropped_message_callback
+
+        self._max_messages = max_size
+        self._max_size_bytes = max_size_bytes
+        self._backpressure_policy = backpressure_policy
+
+        self._size_bytes = 0
+        self._item_sizes: Deque[int] = collections.deque()
+        self._spill_file = _SpillFile(directory=spill_directory)
+
+        self._dropped_messages = 0
+        self._spilled_messages = 0
+        self._dropped_messages_reported = 0
+        self._last_drop_warning_time: Optional[float] = None
+
+        # Messages are taken (or dropped) in the order of putting, so all the messages
+        # with sequence numbers below `_taken_count` are taken, and those of them
+        # which are still being processed are in `_in_progress`.
+        self._put_count = 0
+        self._taken_count = 0
+        self._in_progress: Set[int] = set()
+        self._last_taken = threading.local()
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        item_size = self._estimate_size_bytes(item)
+
+        with self.not_full:
+            if item is not None and self._has_no_space_for(item_size):
+                if self._backpressure_policy == "drop_newest":
+                    self._drop(item)
+                    return
+                elif self._backpressure_policy == "drop_oldest":
+                    if not self._drop_oldest_until_fits(item_size):
+                        self._drop(item)
+                        return
+                elif self._backpressure_policy == "spill_to_disk":
+                    self._spill(item)
+                    return
+                else:
+                    self._wait_for_space(item_size, block=block, timeout=timeout)
+
+            if item is not None and self._spilled_count() > 0:
+                # keep FIFO order, new items go after the ones already spilled
+                self._spill(item)
+                return
+
+            self._put(item)
+            self._size_bytes += item_size
+            self._item_sizes.append(item_size)
+            self._put_count += 1
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get_with_sequence_number(
+        self, block: bool = True, timeout: Optional[float] = None
+    ) -> Tuple[int, Any]:
+        """
+        Same as `get`, but also returns the sequence number of the message
+        which must be passed to `task_done` by the consumers processing
+        several messages at the same time in one thread.
+        """
+        item = self.get(block=block, timeout=timeout)
+        return self._last_taken.sequence_number, item
+
+    def task_done(self, sequence_number: Optional[int] = None) -> None:
+        """
+        Marks the message as processed. If `sequence_number` is not passed,
+        the message last taken by the calling thread is marked.
+        """
+        with self.all_tasks_done:
+            if sequence_number is None:
+                sequence_number = getattr(self._last_taken, "sequence_number", None)
+
+            self._in_progress.discard(sequence_number)  # type: ignore[arg-type]
+            if self.unfinished_tasks <= 0:
+                raise ValueError("task_done() called too many times")
+            self.unfinished_tasks -= 1
+            self.all_tasks_done.notify_all()
+
+    def next_sequence_number(self) -> int:
+        """
+        Returns the sequence number the next message put to the queue will get.
+        """
+        with self.mutex:
+            return self._put_count
+
+    def wait_for_processed(
+        self, sequence_number: int, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Waits until all the messages with sequence numbers below `sequence_number`
+        are processed or dropped. Messages put later are not waited for.
+
+        Returns:
+            bool: False if the timeout expired before that.
+        """
+        with self.all_tasks_done:
+            return self.all_tasks_done.wait_for(
+                lambda: self._taken_count >= sequence_number
+                and all(taken >= sequence_number for taken in self._in_progress),
+                timeout=timeout,
+            )
+
+    def get_stats(self) -> MessageQueueStats:
+        with self.mutex:
+            return MessageQueueStats(
+                size=self._qsize(),
+                size_bytes=self._size_bytes,
+                dropped_messages=self._dropped_messages,
+                spilled_messages=self._spilled_messages,
+            )
+
+    def _qsize(self) -> int:
+        return len(self.queue) + self._spilled_count()
+
+    def _get(self) -> Any:
+        sequence_number = self._taken_count
+        self._taken_count += 1
+        self._in_progress.add(sequence_number)
+        self._last_taken.sequence_number = sequence_number
+
+        if self._next_item_is_spilled():
+            return self._get_spilled()
+
+        self._size_bytes -= self._item_sizes.popleft()
+        return self.queue.popleft()
+
+    def _next_item_is_spilled(self) -> bool:
+        # The stop sentinel is never spilled, but it must not overtake the messages
+        # spilled before it was put, so they are taken before it.
+        return self._spilled_count() > 0 and (
+            len(self.queue) == 0 or self.queue[0] is None
+        )
+
+    def _has_no_space_for(self, item_size: int) -> bool:
+        if len(self.queue) == 0:
+            # a single message is always accepted by empty queue, even if it's too big
+            return False
+
+        if 0 < self._max_messages <= len(self.queue):
+            return True
+
+        return (
+            self._max_size_bytes is not None
+            and self._size_bytes + item_size > self._max_size_bytes
+        )
+
+    def _drop(self, item: Any) -> None:
+        if self._dropped_message_callback is not None:
+            self._dropped_message_callback(item)
+
+        self._dropped_messages += 1
+
+        # the first drop is reported right away, the next ones at most once per interval
+        now = time.monotonic()
+        if (
+            self._last_drop_warning_time is not None
+            and now - self._last_drop_warning_time < _DROP_WARNING_INTERVAL_SECONDS
+        ):
+            return
+
+        LOGGER.warning(
+            "Opik message queue is full, %d messages were dropped (%d in total). "
+            "Consider increasing the queue size or changing the backpressure policy.",
+            self._dropped_messages - self._dropped_messages_reported,
+            self._dropped_messages,
+        )
+        self._dropped_messages_reported = self._dropped_messages
+        self._last_drop_warning_time = now
+
+    def _drop_oldest_until_fits(self, item_size: int) -> bool:
+        while self._has_no_space_for(item_size):
+            if self.queue[0] is None:
+                return False
+
+            dropped_item = self.queue.popleft()
+            self._size_bytes -= self._item_sizes.popleft()
+            self._taken_count += 1
+            self.unfinished_tasks -= 1
+            self._drop(dropped_item)
+            self.all_tasks_done.notify_all()
+
+        return True
+
+    def _spill(self, item: Any) -> None:
+        self._store_spilled(item)
+        self._spilled_messages += 1
+        self._put_count += 1
+        self.unfinished_tasks += 1
+        self.not_empty.notify()
+
+    def _store_spilled(self, item: Any) -> None:
+        self._spill_file.append(message_serializer.serialize(item))
+
+    def _get_spilled(self) -> Any:
+        return message_serializer.deserialize(self._spill_file.read())
+
+    def _spilled_count(self) -> int:
+        return len(self._spill_file)
+
+    def _wait_for_space(
+        self, item_size: int, block: bool, timeout: Optional[float]
+    ) -> None:
+        if not block:
+            if self._has_no_space_for(item_size):
+                raise queue.Full
+        elif timeout is None:
+            while self._has_no_space_for(item_size):
+                self.not_full.wait()
+        else:
+            end_time = time.monotonic() + timeout
+            while self._has_no_space_for(item_size):
+                remaining = end_time - time.monotonic()
+                if remaining <= 0.0:
+                    raise queue.Full
+                self.not_full.wait(remaining)
+
+    def _estimate_size_bytes(self, item: Any) -> int:
+        if self._max_size_bytes is None or item is None:
+            return 0
+
+        return estimate_size_bytes(item)
+
+
+def estimate_size_bytes(obj: Any, depth: int = 0) -> int:
+    """
+    Cheap estimation of the memory used by the message data. It is not exact,
+    but it is proportional to the size of the JSON payload which will be
+    created from the message.
+    """
+    if isinstance(obj, (str, bytes, bytearray)):
+        return len(obj)
+
+    if depth >= _MAX_SIZE_ESTIMATION_DEPTH:
+        return sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        return sum(
+            estimate_size_bytes(key, depth + 1) + estimate_size_bytes(value, depth + 1)
+            for key, value in obj.items()
+        )
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(estimate_size_bytes(item, depth + 1) for item in obj)
+
+    if isinstance(obj, messages.BaseMessage):
+        return estimate_size_bytes(obj.as_payload_dict(), depth + 1)
+
+    return sys.getsizeof(obj)
+
+
+class _SpillFile:
+    """
+    FIFO of serialized messages stored in a temporary file.
+    The file is created lazily and truncated every time it becomes empty.
+    """
+
+    def __init__(self, directory: Optional[str]) -> None:
+        self._directory = directory
+        self._file: Optional[IO[bytes]] = None
+        self._read_position = 0
+        self._write_position = 0
+        self._records = 0
+
+    def __len__(self) -> int:
+        return self._records
+
+    def append(self, data: bytes) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(
+                prefix="opik-spill-", dir=self._directory
+            )
+
+        self._file.seek(self._write_position)
+        self._file.write(_RECORD_HEADER.pack(len(data)))
+        self._file.write(data)
+        self._write_position = self._file.tell()
+        self._records += 1
+
+    def read(self) -> bytes:
+        assert self._file is not None and self._records > 0
+
+        self._file.seek(self._read_position)
+        (length,) = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+        data = self._file.read(length)
+        self._read_position = self._file.tell()
+        self._records -= 1
+
+        if self._records == 0:
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_position = 0
+            self._write_position = 0
+
+        return data
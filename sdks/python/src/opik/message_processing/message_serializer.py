@@ -0,0 +1,73 @@
+import dataclasses
+import datetime
+import functools
+import json
+from typing import Any, Dict, Type
+
+from . import messages
+from .. import jsonable_encoder
+
+_DATETIME_FIELDS = ("start_time", "end_time")
+
+
+@functools.lru_cache(maxsize=None)
+def _message_types() -> Dict[str, Type[messages.BaseMessage]]:
+    result: Dict[str, Type[messages.BaseMessage]] = {}
+    classes_to_visit = [messages.BaseMessage]
+
+    while classes_to_visit:
+        class_ = classes_to_visit.pop()
+        result[class_.__name__] = class_
+        classes_to_visit.extend(class_.__subclasses__())
+
+    return result
+
+
+def serialize(message: messages.BaseMessage) -> bytes:
+    """
+    Serializes message into JSON bytes which can be stored on disk
+    and later restored via `deserialize`.
+
+    Values that are not JSON serializable are converted in the same way
+    as they would be converted before sending them to the backend.
+    """
+    return json.dumps(_message_to_dict(message)).encode("utf-8")
+
+
+def deserialize(data: bytes) -> messages.BaseMessage:
+    return _message_from_dict(json.loads(data))
+
+
+def _message_to_dict(message: messages.BaseMessage) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+
+    for field in dataclasses.fields(message):
+        value = getattr(message, field.name)
+        if field.name == "batch":
+            data["batch"] = [_message_to_dict(item) for item in value]
+        else:
+            data[field.name] = jsonable_encoder.jsonable_encoder(value)
+
+    return {"type": type(message).__name__, "data": data}
+
+
+def _message_from_dict(message_dict: Dict[str, Any]) -> messages.BaseMessage:
+    message_class = _message_types()[message_dict["type"]]
+    data = message_dict["data"]
+
+    if "batch" in data:
+        data["batch"] = [_message_from_dict(item) for item in data["batch"]]
+
+    for key in _DATETIME_FIELDS:
+        if isinstance(data.get(key), str):
+            data[key] = _parse_datetime(data[key])
+
+    return message_class(**data)
+
+
+def _parse_datetime(value: str) -> datetime.datetime:
+    # datetime.fromisoformat doesn't understand "Z" suffix before python 3.11
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+
+    return datetime.datetime.fromisoformat(value)
@@ -4,16 +4,41 @@ from typing import Optional, Any, Dict, List, Union
 from ..types import SpanType, ErrorInfoDict, LLMProvider
 
 
+# Engineer note:
+#
+# The messages of spans and traces (and their batches) declare `__slots__`, they are
+# created for every span and can pile up in the queue and batchers, and the slots
+# take noticeably less memory than the instance dicts. Dataclasses of Python < 3.10
+# can't have slots and fields with default values at the same time, so the messages
+# with defaults don't declare them. Don't use `message.__dict__`, use `as_payload_dict()`.
 @dataclasses.dataclass
 class BaseMessage:
+    __slots__ = ("__weakref__",)  # the spool tracks the messages with weak references
+
     def as_payload_dict(self) -> Dict[str, Any]:
         # we are not using dataclasses.as_dict() here
         # because it will try to deepcopy all object and will fail if there is non-serializable object
-        return {**self.__dict__}
+        return {
+            field.name: getattr(self, field.name) for field in dataclasses.fields(self)
+        }
 
 
 @dataclasses.dataclass
 class CreateTraceMessage(BaseMessage):
+    __slots__ = (
+        "trace_id",
+        "project_name",
+        "name",
+        "start_time",
+        "end_time",
+        "input",
+        "output",
+        "metadata",
+        "tags",
+        "error_info",
+        "thread_id",
+    )
+
     trace_id: str
     project_name: str
     name: Optional[str]
@@ -38,6 +63,18 @@ class UpdateTraceMessage(BaseMessage):
     "Not recommended to use. Kept only for low level update operations in public API"
     """
 
+    __slots__ = (
+        "trace_id",
+        "project_name",
+        "end_time",
+        "input",
+        "output",
+        "metadata",
+        "tags",
+        "error_info",
+        "thread_id",
+    )
+
     trace_id: str
     project_name: str
     end_time: Optional[datetime.datetime]
@@ -56,6 +93,26 @@ class UpdateTraceMessage(BaseMessage):
 
 @dataclasses.dataclass
 class CreateSpanMessage(BaseMessage):
+    __slots__ = (
+        "span_id",
+        "trace_id",
+        "project_name",
+        "parent_span_id",
+        "name",
+        "start_time",
+        "end_time",
+        "input",
+        "output",
+        "metadata",
+        "tags",
+        "type",
+        "usage",
+        "model",
+        "provider",
+        "error_info",
+        "total_cost",
+    )
+
     span_id: str
     trace_id: str
     project_name: str
@@ -85,6 +142,23 @@ class CreateSpanMessage(BaseMessage):
 class UpdateSpanMessage(BaseMessage):
     """Not recommended to use. Kept only for low level update operations in public API"""
 
+    __slots__ = (
+        "span_id",
+        "parent_span_id",
+        "trace_id",
+        "project_name",
+        "end_time",
+        "input",
+        "output",
+        "metadata",
+        "tags",
+        "usage",
+        "model",
+        "provider",
+        "error_info",
+        "total_cost",
+    )
+
     span_id: str
     parent_span_id: Optional[str]
     trace_id: str
@@ -146,9 +220,27 @@ class AddSpanFeedbackScoresBatchMessage(AddFeedbackScoresBatchMessage):
 
 @dataclasses.dataclass
 class CreateSpansBatchMessage(BaseMessage):
+    __slots__ = ("batch",)
+
     batch: List[CreateSpanMessage]
 
 
 @dataclasses.dataclass
 class CreateTraceBatchMessage(BaseMessage):
+    __slots__ = ("batch",)
+
     batch: List[CreateTraceMessage]
+
+
+@dataclasses.dataclass
+class UpdateSpansBatchMessage(BaseMessage):
+    __slots__ = ("batch",)
+
+    batch: List[UpdateSpanMessage]
+
+
+@dataclasses.dataclass
+class UpdateTracesBatchMessage(BaseMessage):
+    __slots__ = ("batch",)
+
+    batch: List[UpdateTraceMessage]
@@ -1,14 +1,23 @@
-import time
 import queue
 import threading
 from typing import Any, Optional
 
 from . import message_processors
 
-SLEEP_BETWEEN_LOOP_ITERATIONS = 0.1
-
 
 class QueueConsumer(threading.Thread):
+    """
+    Background thread which takes messages from the queue and passes them
+    to the message processor.
+
+    The consumer blocks on the queue while it is empty, so it doesn't consume
+    CPU when there is nothing to process and wakes up as soon as a new message
+    is enqueued. To wake up a consumer that is blocked on an empty queue after
+    `close()` was called, a `None` sentinel must be put into the queue.
+
+    Every message taken from the queue is marked with `task_done()` once it's processed.
+    """
+
     def __init__(
         self,
         message_queue: "queue.Queue[Any]",
@@ -19,7 +28,6 @@ class QueueConsumer(threading.Thread):
         self._message_queue = message_queue
         self._message_processor = message_processor
         self._processing_stopped = False
-        self.waiting = True
 
     def run(self) -> None:
         while self._processing_stopped is False:
@@ -28,21 +36,19 @@ class QueueConsumer(threading.Thread):
         return
 
     def _loop(self) -> None:
-        try:
-            self.waiting = True
-            message = self._message_queue.get(timeout=SLEEP_BETWEEN_LOOP_ITERATIONS)
-            self.waiting = False
+        message = self._message_queue.get()
 
+        try:
             if message is None:
                 return
 
             self._message_processor.process(message)
 
-        except queue.Empty:
-            time.sleep(SLEEP_BETWEEN_LOOP_ITERATIONS)
         except Exception:
             # TODO
             pass
+        finally:
+            self._message_queue.task_done()
 
     def close(self) -> None:
         self._processing_stopped = True
@@ -0,0 +1,131 @@
+import json
+import logging
+from typing import Any, List, Sequence
+
+import httpx
+
+from . import messages
+from .. import dict_utils, payload_truncation
+from ..jsonable_encoder import jsonable_encoder
+from ..rest_api import client as rest_api_client
+from ..rest_api import core as rest_api_core
+from ..rest_client_configurator import retry_decorators
+from .batching import sequence_splitter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+LOGGER = logging.getLogger(__name__)
+
+
+def encode_json(obj: Any) -> bytes:
+    """
+    Serializes the already encoded (see `jsonable_encoder`) object into
+    a JSON request body. Uses orjson if it's installed and falls back to
+    the standard json module for the data orjson refuses to serialize
+    (e.g. integers that don't fit into 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            LOGGER.debug("Failed to serialize request body with orjson", exc_info=True)
+
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def encode_create_batch_bodies(
+    items: Sequence[messages.BaseMessage],
+    field_name: str,
+    max_payload_size_MB: float,
+) -> List[bytes]:
+    """
+    Builds the bodies of the bulk create requests, e.g. `{"spans": [...]}`.
+
+    Every item is encoded and serialized exactly once, the bytes are used both
+    for splitting the batch by size and for building the request bodies,
+    without constructing the REST API models and serializing them once again.
+    """
+    max_item_size_bytes = int(max_payload_size_MB * 1024 * 1024)
+
+    encoded_items: List[bytes] = []
+    for item in items:
+        cleaned_kwargs = dict_utils.remove_none_from_dict(item.as_payload_dict())
+        encoded_item = encode_json(jsonable_encoder(cleaned_kwargs))
+
+        if len(encoded_item) > max_item_size_bytes:
+            # The data not captured by the decorators isn't truncated before, an item
+            # that big would be rejected by the backend. Input, output and metadata
+            # get a quarter of the limit each.
+            LOGGER.warning(
+                "The size of %s item (%d bytes) exceeds the request size limit, "
+                "its input, output and metadata are truncated",
+                field_name,
+                len(encoded_item),
+            )
+            payload_truncation.truncate_fields(
+                cleaned_kwargs,
+                names=["input", "output", "metadata"],
+                max_size_bytes=max_item_size_bytes // 4,
+            )
+            encoded_item = encode_json(jsonable_encoder(cleaned_kwargs))
+
+        encoded_items.append(encoded_item)
+
+    return join_batch_bodies(
+        encoded_items,
+        field_name=field_name,
+        max_payload_size_MB=max_payload_size_MB,
+    )
+
+
+def join_batch_bodies(
+    encoded_items: List[bytes],
+    field_name: str,
+    max_payload_size_MB: float,
+) -> List[bytes]:
+    """
+    Joins the already serialized items into the bodies of the bulk create requests,
+    splitting them into several bodies if they don't fit into `max_payload_size_MB`.
+    """
+    memory_limited_batches = sequence_splitter.split_into_batches(
+        items=encoded_items,
+        max_payload_size_MB=max_payload_size_MB,
+    )
+
+    return [
+        b"".join([b'{"', field_name.encode(), b'":[', b",".join(batch), b"]}"])
+        for batch in memory_limited_batches
+    ]
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    """
+    Raises the same ApiError the REST API client raises for the unsuccessful responses.
+    """
+    if 200 <= response.status_code < 300:
+        return
+
+    try:
+        response_body = response.json()
+    except json.JSONDecodeError:
+        response_body = response.text
+
+    raise rest_api_core.ApiError(status_code=response.status_code, body=response_body)
+
+
+@retry_decorators.connection_retry
+def post(rest_client: rest_api_client.OpikApi, path: str, body: bytes) -> None:
+    """
+    Posts the already serialized JSON body to the REST API endpoint, bypassing
+    the construction and serialization of the REST API models.
+    """
+    response = rest_client._client_wrapper.httpx_client.request(
+        path,
+        method="POST",
+        content=body,
+        headers={"content-type": "application/json"},
+    )
+    raise_for_status(response)
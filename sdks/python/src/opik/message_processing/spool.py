@@ -0,0 +1,315 @@
+import logging
+import os
+import pathlib
+import threading
+import uuid
+import weakref
+from typing import IO, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import message_serializer, messages
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SEGMENT_SIZE_BYTES = 64 * 1024 * 1024
+
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+
+_RUN_RECORD = b"R"
+_MESSAGE_RECORD = b"M"
+_ACK_RECORD = b"A"
+
+
+class MessageSpool:
+    """
+    Append-only write-ahead log of the messages passed to the Streamer.
+
+    Every message is written to the active segment file before it is put into
+    the queue or batcher. Once the message processor has sent the message,
+    it acknowledges it and an acknowledgement record is appended to the log.
+    A segment file is deleted when all its messages are acknowledged and the segments
+    of the messages acknowledged by its records are deleted, so an acknowledgement
+    is never lost while the message it refers to can still be replayed.
+
+    Messages that were not acknowledged (because the process crashed, was killed
+    or exited before everything was flushed) are loaded when the spool is created
+    for the same directory next time, so that they can be replayed.
+
+    Record format (one record per line):
+        R <run id>
+        M <sequence number> <serialized message>
+        A <sequence number>
+
+    Every segment starts with the id of the spool instance (run) which wrote it,
+    sequence numbers are unique within a run.
+
+    The spool directory must not be shared by the processes running at the same time.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_size_bytes: int = DEFAULT_MAX_SEGMENT_SIZE_BYTES,
+    ) -> None:
+        self._directory = pathlib.Path(directory).expanduser()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_segment_size_bytes = max_segment_size_bytes
+        self._lock = threading.Lock()
+        self._run_id = uuid.uuid4().hex.encode("ascii")
+
+        self._replayed_segments = self._find_segments()
+        self._messages_to_replay = self._load_unacknowledged_messages(
+            self._replayed_segments
+        )
+
+        self._next_sequence_number = 0
+        self._next_segment_number = (
+            _segment_number(self._replayed_segments[-1]) + 1
+            if len(self._replayed_segments) > 0
+            else 0
+        )
+
+        # sequence number -> number of items of the message which are not acknowledged yet
+        self._unacknowledged_items_count: Dict[int, int] = {}
+        # id(item) -> (sequence number, weak reference to the item).
+        # Weak references are used so that the messages dropped from the queue are not kept
+        # in memory, they stay unacknowledged and will be replayed on the next start.
+        self._items: Dict[int, Tuple[int, "weakref.ref[Any]"]] = {}
+        # id(item) -> sequence numbers of the messages merged into this item,
+        # they are acknowledged together with the item.
+        self._linked_sequence_numbers: Dict[int, List[int]] = {}
+        # segment path -> sequence numbers of unacknowledged messages written to it
+        self._segments: Dict[pathlib.Path, Set[int]] = {}
+        # segment path -> other segments with the messages acknowledged by its records
+        self._acknowledged_segments: Dict[pathlib.Path, Set[pathlib.Path]] = {}
+
+        self._active_segment: Optional[IO[bytes]] = None
+        self._active_segment_path: Optional[pathlib.Path] = None
+
+    def append(self, message: messages.BaseMessage) -> None:
+        data = message_serializer.serialize(message)
+
+        with self._lock:
+            sequence_number = self._next_sequence_number
+            self._next_sequence_number += 1
+
+            segment = self._get_active_segment()
+            segment.write(b"%s %d %s\n" % (_MESSAGE_RECORD, sequence_number, data))
+            segment.flush()
+
+            items = _acknowledgeable_items(message)
+            self._unacknowledged_items_count[sequence_number] = len(items)
+            for item in items:
+                self._items[id(item)] = (
+                    sequence_number,
+                    weakref.ref(item, self._item_collected_callback(id(item))),
+                )
+
+            assert self._active_segment_path is not None
+            self._segments[self._active_segment_path].add(sequence_number)
+
+    def acknowledge(self, message: messages.BaseMessage) -> None:
+        """
+        Marks the message as delivered. Batch messages created by the batchers
+        acknowledge every message they were created from.
+        """
+        with self._lock:
+            for item in _acknowledgeable_items(message):
+                entry = self._items.get(id(item))
+                if entry is None or entry[1]() is not item:
+                    continue
+
+                del self._items[id(item)]
+                self._acknowledge_item_of(entry[0])
+                for sequence_number in self._linked_sequence_numbers.pop(id(item), []):
+                    self._acknowledge_item_of(sequence_number)
+
+    def link(self, absorbed: messages.BaseMessage, into: messages.BaseMessage) -> None:
+        """
+        Registers that the `absorbed` message was merged into the `into` message
+        (e.g. by a batcher coalescing the updates), so it will never be sent
+        on its own and must be acknowledged when `into` is acknowledged.
+        """
+        with self._lock:
+            entry = self._items.get(id(absorbed))
+            if entry is None or entry[1]() is not absorbed:
+                return
+
+            del self._items[id(absorbed)]
+            linked = self._linked_sequence_numbers.setdefault(id(into), [])
+            linked.append(entry[0])
+            linked.extend(self._linked_sequence_numbers.pop(id(absorbed), []))
+
+    def pop_messages_to_replay(self) -> List[messages.BaseMessage]:
+        """
+        Returns the messages which were not acknowledged by the previous process
+        which used the same spool directory. The caller is expected to pass them
+        to `append` again before calling `remove_replayed_segments`.
+        """
+        result = self._messages_to_replay
+        self._messages_to_replay = []
+        return result
+
+    def remove_replayed_segments(self) -> None:
+        for segment_path in self._replayed_segments:
+            _remove_file(segment_path)
+
+        self._replayed_segments = []
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active_segment is not None:
+                self._active_segment.close()
+                self._active_segment = None
+                self._active_segment_path = None
+
+            self._remove_completed_segments()
+
+    def _item_collected_callback(
+        self, item_id: int
+    ) -> Callable[["weakref.ref[Any]"], None]:
+        def callback(reference: "weakref.ref[Any]") -> None:
+            # can be called by garbage collector from any thread, so no locking here
+            entry = self._items.get(item_id)
+            if entry is not None and entry[1] is reference:
+                self._items.pop(item_id, None)
+                self._linked_sequence_numbers.pop(item_id, None)
+
+        return callback
+
+    def _acknowledge_item_of(self, sequence_number: int) -> None:
+        self._unacknowledged_items_count[sequence_number] -= 1
+        if self._unacknowledged_items_count[sequence_number] == 0:
+            del self._unacknowledged_items_count[sequence_number]
+            self._write_acknowledgement(sequence_number)
+
+    def _write_acknowledgement(self, sequence_number: int) -> None:
+        segment = self._get_active_segment()
+        segment.write(b"%s %d\n" % (_ACK_RECORD, sequence_number))
+        segment.flush()
+        assert self._active_segment_path is not None
+
+        for segment_path, sequence_numbers in self._segments.items():
+            if sequence_number not in sequence_numbers:
+                continue
+
+            sequence_numbers.remove(sequence_number)
+            if segment_path != self._active_segment_path:
+                self._acknowledged_segments[self._active_segment_path].add(segment_path)
+            break
+
+        self._remove_completed_segments()
+
+    def _remove_completed_segments(self) -> None:
+        """
+        Removes the segments which are not active, have no unacknowledged messages
+        and whose acknowledgement records refer only to the removed segments.
+        Removing a segment can make the segments acknowledging it removable, so
+        the check is repeated until nothing is removed.
+        """
+        removed = True
+        while removed:
+            removed = False
+            for segment_path, sequence_numbers in list(self._segments.items()):
+                if (
+                    segment_path == self._active_segment_path
+                    or len(sequence_numbers) > 0
+                    or any(
+                        acknowledged in self._segments
+                        for acknowledged in self._acknowledged_segments[segment_path]
+                    )
+                ):
+                    continue
+
+                _remove_file(segment_path)
+                del self._segments[segment_path]
+                del self._acknowledged_segments[segment_path]
+                removed = True
+
+    def _get_active_segment(self) -> IO[bytes]:
+        if (
+            self._active_segment is not None
+            and self._active_segment.tell() < self._max_segment_size_bytes
+        ):
+            return self._active_segment
+
+        if self._active_segment is not None:
+            self._active_segment.close()
+
+        self._active_segment_path = self._directory / (
+            f"{_SEGMENT_PREFIX}{self._next_segment_number:08d}{_SEGMENT_SUFFIX}"
+        )
+        self._next_segment_number += 1
+        self._active_segment = open(self._active_segment_path, mode="ab")
+        self._active_segment.write(b"%s %s\n" % (_RUN_RECORD, self._run_id))
+        self._segments[self._active_segment_path] = set()
+        self._acknowledged_segments[self._active_segment_path] = set()
+
+        self._remove_completed_segments()
+
+        return self._active_segment
+
+    def _find_segments(self) -> List[pathlib.Path]:
+        return sorted(
+            self._directory.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"),
+            key=_segment_number,
+        )
+
+    def _load_unacknowledged_messages(
+        self, segments: List[pathlib.Path]
+    ) -> List[messages.BaseMessage]:
+        # Sequence numbers start from 0 for every spool instance, so they are unique
+        # only in combination with the run id from the header of the segment.
+        # Acknowledgements are always written after the message records by the same run.
+        message_records: Dict[Tuple[bytes, int], bytes] = {}
+
+        for segment_path in segments:
+            run_id = b""
+            with open(segment_path, mode="rb") as segment:
+                for line in segment:
+                    record = line.rstrip(b"\n").split(b" ", 2)
+                    try:
+                        if record[0] == _RUN_RECORD:
+                            run_id = record[1]
+                        elif record[0] == _MESSAGE_RECORD:
+                            message_records[(run_id, int(record[1]))] = record[2]
+                        elif record[0] == _ACK_RECORD:
+                            message_records.pop((run_id, int(record[1])), None)
+                    except (IndexError, ValueError):
+                        # the last record might be incomplete if the process crashed while writing it
+                        LOGGER.debug(
+                            "Skipping corrupted spool record in %s", segment_path
+                        )
+
+        result = []
+        for data in message_records.values():
+            try:
+                result.append(message_serializer.deserialize(data))
+            except Exception:
+                LOGGER.debug("Failed to restore spooled message", exc_info=True)
+
+        if len(result) > 0:
+            LOGGER.info(
+                "Found %d unsent messages in the spool, sending them", len(result)
+            )
+
+        return result
+
+
+def _acknowledgeable_items(message: messages.BaseMessage) -> List[Any]:
+    batch = getattr(message, "batch", None)
+    if isinstance(batch, list):
+        return batch
+
+    return [message]
+
+
+def _segment_number(path: pathlib.Path) -> int:
+    return int(path.name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+
+
+def _remove_file(path: pathlib.Path) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,11 +1,9 @@
-import queue
 import threading
 import logging
-from typing import Any, List, Optional
+from typing import List, Optional
 
-from . import messages, queue_consumer
-from .. import synchronization
-from .batching import batch_manager
+from . import message_processors, messages, message_queue, queue_consumer, spool
+from .batching import adaptive_controller, batch_manager
 
 LOGGER = logging.getLogger(__name__)
 
@@ -13,26 +11,44 @@ LOGGER = logging.getLogger(__name__)
 class Streamer:
     def __init__(
         self,
-        message_queue: "queue.Queue[Any]",
+        message_queue: message_queue.MessageQueue,
         queue_consumers: List[queue_consumer.QueueConsumer],
         batch_manager: Optional[batch_manager.BatchManager],
+        spool: Optional[spool.MessageSpool] = None,
+        message_processor: Optional[message_processors.BaseMessageProcessor] = None,
     ) -> None:
         self._lock = threading.RLock()
+        self._puts_completed = threading.Condition(self._lock)
+        self._puts_in_progress = 0
         self._message_queue = message_queue
         self._queue_consumers = queue_consumers
         self._batch_manager = batch_manager
+        self._spool = spool
+        self._message_processor = message_processor
 
         self._drain = False
+        self._closed = False
+        self._close_result = True
 
         self._start_queue_consumers()
 
         if self._batch_manager is not None:
             self._batch_manager.start()
 
+        if self._spool is not None:
+            self._replay_spooled_messages()
+
     def put(self, message: messages.BaseMessage) -> None:
         with self._lock:
             if self._drain:
                 return
+            self._puts_in_progress += 1
+
+        # Not under the lock: with "block" backpressure policy putting waits
+        # for the free space in the queue, flush() and close() must not wait for it.
+        try:
+            if self._spool is not None:
+                self._spool.append(message)
 
             if (
                 self._batch_manager is not None
@@ -41,38 +57,79 @@ class Streamer:
                 self._batch_manager.process_message(message)
             else:
                 self._message_queue.put(message)
+        finally:
+            with self._lock:
+                self._puts_in_progress -= 1
+                if self._puts_in_progress == 0:
+                    self._puts_completed.notify_all()
 
     def close(self, timeout: Optional[int]) -> bool:
         """
-        Stops data sending threads
+        Stops data sending threads. Closing already closed (or being closed) streamer has no effect.
         """
         with self._lock:
+            if self._closed:
+                return self._close_result
+            self._closed = True
             self._drain = True
+            # the messages accepted before draining are sent, the consumers are
+            # still running, so the puts waiting for the free space complete
+            self._puts_completed.wait_for(
+                lambda: self._puts_in_progress == 0,
+                timeout=timeout if timeout else None,
+            )
 
         if self._batch_manager is not None:
             self._batch_manager.stop()  # stopping causes adding remaining batch messages to the queue
 
-        self.flush(timeout)
+        self._flush(timeout)
+        queue_is_empty = self._message_queue.empty()
         self._close_queue_consumers()
+        if self._spool is not None:
+            self._spool.close()
+        if self._message_processor is not None:
+            self._message_processor.close()
+        self._close_result = queue_is_empty
 
-        return self._message_queue.empty()
+        return queue_is_empty
 
     def flush(self, timeout: Optional[int]) -> None:
+        if self._closed:
+            # queue consumers are stopped (or being stopped by close() which flushes itself),
+            # nothing will be processed anymore
+            return
+
+        self._flush(timeout)
+
+    def _flush(self, timeout: Optional[int]) -> None:
         if self._batch_manager is not None:
             self._batch_manager.flush()
 
-        synchronization.wait_for_done(
-            check_function=lambda: (
-                self.workers_waiting()
-                and self._message_queue.empty()
-                and (self._batch_manager is None or self._batch_manager.is_empty())
-            ),
-            timeout=timeout,
-            sleep_time=0.1,
+        # Waits only for the messages put before this moment (including the batches
+        # just flushed), so flushing doesn't take longer while new data keeps coming.
+        self._message_queue.wait_for_processed(
+            self._message_queue.next_sequence_number(),
+            timeout=timeout if timeout else None,
         )
 
-    def workers_waiting(self) -> bool:
-        return all([consumer.waiting for consumer in self._queue_consumers])
+    def get_message_queue_stats(self) -> message_queue.MessageQueueStats:
+        return self._message_queue.get_stats()
+
+    def get_adaptive_batching_stats(
+        self,
+    ) -> Optional[adaptive_controller.AdaptiveBatchingStats]:
+        if self._batch_manager is None:
+            return None
+
+        return self._batch_manager.get_adaptive_batching_stats()
+
+    def _replay_spooled_messages(self) -> None:
+        assert self._spool is not None
+
+        for message in self._spool.pop_messages_to_replay():
+            self.put(message)
+
+        self._spool.remove_replayed_segments()
 
     def _start_queue_consumers(self) -> None:
         for consumer in self._queue_consumers:
@@ -81,3 +138,8 @@ class Streamer:
     def _close_queue_consumers(self) -> None:
         for consumer in self._queue_consumers:
             consumer.close()
+
+        # Consumers are blocked on the shared queue while it's empty,
+        # each of them needs its own sentinel to wake up and stop.
+        for _ in self._queue_consumers:
+            self._message_queue.put(None)
@@ -1,31 +1,150 @@
-import queue
-from typing import Any, List
+from typing import List, Optional
 
-from . import queue_consumer, message_processors, streamer
+from . import (
+    async_message_processors,
+    attachment_offload,
+    async_streamer,
+    forwarding,
+    local_sink,
+    queue_consumer,
+    message_processors,
+    message_queue,
+    spool,
+    streamer,
+)
 from ..rest_api import client as rest_api_client
-from .batching import batch_manager_constuctors
+from .batching import (
+    adaptive_controller,
+    batch_manager_constuctors,
+    create_messages_tracker,
+)
 
 
 def construct_online_streamer(
     rest_client: rest_api_client.OpikApi,
     use_batching: bool,
     n_consumers: int = 1,
+    max_queue_size: int = 0,
+    max_queue_size_bytes: Optional[int] = None,
+    backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+    spill_directory: Optional[str] = None,
+    spool_directory: Optional[str] = None,
+    adaptive_batching: bool = False,
+    max_in_flight_batch_requests: int = 1,
+    attachment_offloader: Optional[attachment_offload.AttachmentOffloader] = None,
 ) -> streamer.Streamer:
-    message_processor = message_processors.MessageSender(rest_client=rest_client)
+    message_spool = (
+        spool.MessageSpool(directory=spool_directory)
+        if spool_directory is not None
+        else None
+    )
+    create_messages_tracker_ = (
+        create_messages_tracker.InFlightCreateMessagesTracker()
+        if use_batching
+        else None
+    )
+    adaptive_controller_ = (
+        adaptive_controller.AdaptiveBatchingController()
+        if use_batching and adaptive_batching
+        else None
+    )
+    message_processor = message_processors.MessageSender(
+        rest_client=rest_client,
+        spool=message_spool,
+        create_messages_tracker=create_messages_tracker_,
+        adaptive_controller=adaptive_controller_,
+        max_in_flight_batch_requests=max_in_flight_batch_requests,
+        attachment_offloader=attachment_offloader,
+    )
 
-    return construct_streamer(message_processor, n_consumers, use_batching)
+    return construct_streamer(
+        message_processor,
+        n_consumers,
+        use_batching,
+        max_queue_size=max_queue_size,
+        max_queue_size_bytes=max_queue_size_bytes,
+        backpressure_policy=backpressure_policy,
+        spill_directory=spill_directory,
+        spool=message_spool,
+        create_messages_tracker_=create_messages_tracker_,
+        adaptive_controller_=adaptive_controller_,
+    )
+
+
+def construct_forwarding_streamer(
+    address: str,
+    authkey: bytes,
+    max_queue_size: int = 0,
+    max_queue_size_bytes: Optional[int] = None,
+    backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+    spill_directory: Optional[str] = None,
+) -> streamer.Streamer:
+    # Single consumer keeps the messages in order, batching is done by the uploader
+    # which receives the messages of all the processes.
+    return construct_streamer(
+        forwarding.MessageForwarder(address=address, authkey=authkey),
+        n_consumers=1,
+        use_batching=False,
+        max_queue_size=max_queue_size,
+        max_queue_size_bytes=max_queue_size_bytes,
+        backpressure_policy=backpressure_policy,
+        spill_directory=spill_directory,
+    )
+
+
+def construct_local_sink_streamer(
+    directory: str,
+    max_queue_size: int = 0,
+    max_queue_size_bytes: Optional[int] = None,
+    backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+    spill_directory: Optional[str] = None,
+    attachment_offloader: Optional[attachment_offload.AttachmentOffloader] = None,
+) -> streamer.Streamer:
+    # Single consumer writes the messages in the order they were logged,
+    # batching is done when the files are uploaded.
+    return construct_streamer(
+        local_sink.LocalSinkWriter(
+            directory=directory, attachment_offloader=attachment_offloader
+        ),
+        n_consumers=1,
+        use_batching=False,
+        max_queue_size=max_queue_size,
+        max_queue_size_bytes=max_queue_size_bytes,
+        backpressure_policy=backpressure_policy,
+        spill_directory=spill_directory,
+    )
 
 
 def construct_streamer(
     message_processor: message_processors.BaseMessageProcessor,
     n_consumers: int,
     use_batching: bool,
+    max_queue_size: int = 0,
+    max_queue_size_bytes: Optional[int] = None,
+    backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+    spill_directory: Optional[str] = None,
+    spool: Optional[spool.MessageSpool] = None,
+    create_messages_tracker_: Optional[
+        create_messages_tracker.InFlightCreateMessagesTracker
+    ] = None,
+    adaptive_controller_: Optional[
+        adaptive_controller.AdaptiveBatchingController
+    ] = None,
 ) -> streamer.Streamer:
-    message_queue: "queue.Queue[Any]" = queue.Queue()
+    message_queue_ = message_queue.MessageQueue(
+        max_size=max_queue_size,
+        max_size_bytes=max_queue_size_bytes,
+        backpressure_policy=backpressure_policy,
+        spill_directory=spill_directory,
+        # the updates must not wait for the create messages which will never be sent
+        dropped_message_callback=create_messages_tracker_.complete
+        if create_messages_tracker_ is not None
+        else None,
+    )
 
     queue_consumers: List[queue_consumer.QueueConsumer] = [
         queue_consumer.QueueConsumer(
-            message_queue=message_queue,
+            message_queue=message_queue_,
             message_processor=message_processor,
             name=f"QueueConsumerThread_{i}",
         )
@@ -33,15 +152,58 @@ def construct_streamer(
     ]
 
     batch_manager = (
-        batch_manager_constuctors.create_batch_manager(message_queue)
+        batch_manager_constuctors.create_batch_manager(
+            message_queue_,
+            message_absorbed_callback=spool.link if spool is not None else None,
+            create_messages_tracker_=create_messages_tracker_,
+            adaptive_controller_=adaptive_controller_,
+        )
         if use_batching
         else None
     )
 
     streamer_ = streamer.Streamer(
-        message_queue=message_queue,
+        message_queue=message_queue_,
         queue_consumers=queue_consumers,
         batch_manager=batch_manager,
+        spool=spool,
+        message_processor=message_processor,
     )
 
     return streamer_
+
+
+def construct_async_online_streamer(
+    rest_client: rest_api_client.AsyncOpikApi,
+    use_batching: bool,
+    max_concurrent_messages: int = 1,
+    max_queue_size: int = 0,
+    max_queue_size_bytes: Optional[int] = None,
+    backpressure_policy: message_queue.BackpressurePolicy = "spill_to_disk",
+    spill_directory: Optional[str] = None,
+    max_in_flight_batch_requests: int = 1,
+) -> async_streamer.AsyncStreamer:
+    message_queue_ = async_streamer.AsyncMessageQueue(
+        max_size=max_queue_size,
+        max_size_bytes=max_queue_size_bytes,
+        backpressure_policy=backpressure_policy,
+        spill_directory=spill_directory,
+    )
+    message_processor = async_message_processors.AsyncMessageSender(
+        rest_client=rest_client,
+        max_in_flight_batch_requests=max_in_flight_batch_requests,
+    )
+
+    # the batchers are flushed by the streamer task, the flushing thread is never started
+    batch_manager = (
+        batch_manager_constuctors.create_batch_manager(message_queue_)
+        if use_batching
+        else None
+    )
+
+    return async_streamer.AsyncStreamer(
+        message_queue=message_queue_,
+        message_processor=message_processor,
+        batch_manager=batch_manager,
+        max_concurrent_messages=max_concurrent_messages,
+    )
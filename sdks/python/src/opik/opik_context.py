@@ -4,7 +4,9 @@ from opik import llm_usage
 from opik.api_objects import span, trace
 from opik.types import DistributedTraceHeadersDict, FeedbackScoreDict, LLMProvider
 
-from . import context_storage, exceptions
+from . import context_storage, exceptions, payload_truncation
+from .api_objects import helpers
+from .decorator import tracing_runtime_config
 
 
 def get_current_span_data() -> Optional[span.SpanData]:
@@ -13,6 +15,10 @@ def get_current_span_data() -> Optional[span.SpanData]:
     """
     span_data = context_storage.top_span_data()
     if span_data is None:
+        if not _tracing_active_in_context():
+            # tracked functions don't create spans when tracking is disabled,
+            # scripts calling this function must keep working
+            return span.SpanData(trace_id=helpers.generate_id())
         return None
 
     return span.SpanData(**span_data.__dict__)
@@ -24,6 +30,8 @@ def get_current_trace_data() -> Optional[trace.TraceData]:
     """
     trace_data = context_storage.get_trace_data()
     if trace_data is None:
+        if not _tracing_active_in_context():
+            return trace.TraceData()
         return None
 
     return trace.TraceData(**trace_data.__dict__)
@@ -33,8 +41,10 @@ def get_distributed_trace_headers() -> DistributedTraceHeadersDict:
     """
     Returns headers dictionary to be passed into tracked function on remote node.
     Requires an existing span in the context, otherwise raises an error.
+    If the current trace is not logged (sampled out or tracking is disabled),
+    the headers tell the remote node not to log its part of the trace either.
     """
-    current_span_data = context_storage.top_span_data()
+    current_span_data = get_current_span_data()
 
     if current_span_data is None:
         raise Exception("There is no span in the context.")
@@ -42,6 +52,7 @@ def get_distributed_trace_headers() -> DistributedTraceHeadersDict:
     return DistributedTraceHeadersDict(
         opik_trace_id=current_span_data.trace_id,
         opik_parent_span_id=current_span_data.id,
+        opik_sampled=_tracing_active_in_context(),
     )
 
 
@@ -91,8 +102,16 @@ def update_current_span(
     }
     current_span_data = context_storage.top_span_data()
     if current_span_data is None:
+        if not _tracing_active_in_context():
+            return
         raise exceptions.OpikException("There is no span in the context.")
 
+    payload_truncation.truncate_fields(
+        new_params,
+        names=["input", "output", "metadata"],
+        max_size_bytes=payload_truncation.get_span_field_max_bytes(),
+        attachment_min_size_bytes=payload_truncation.get_attachment_min_size_bytes(),
+    )
     current_span_data.update(**new_params)
 
 
@@ -129,11 +148,30 @@ def update_current_trace(
     }
     current_trace_data = context_storage.get_trace_data()
     if current_trace_data is None:
+        if not _tracing_active_in_context():
+            return
         raise exceptions.OpikException("There is no trace in the context.")
 
+    payload_truncation.truncate_fields(
+        new_params,
+        names=["input", "output", "metadata"],
+        max_size_bytes=payload_truncation.get_span_field_max_bytes(),
+        attachment_min_size_bytes=payload_truncation.get_attachment_min_size_bytes(),
+    )
     current_trace_data.update(**new_params)
 
 
+def _tracing_active_in_context() -> bool:
+    """
+    Returns False if tracked functions don't log the data in the current context,
+    either because tracking is disabled or because the current trace is sampled out.
+    """
+    return (
+        tracing_runtime_config.is_tracing_active()
+        and not context_storage.trace_sampled_out()
+    )
+
+
 __all__ = [
     "get_current_span_data",
     "get_current_trace_data",
@@ -0,0 +1,251 @@
+import dataclasses
+import functools
+import itertools
+from types import GeneratorType
+from typing import Any, Dict, List, MutableMapping, Optional
+
+import pydantic
+
+from . import config, jsonable_encoder
+from .message_processing import attachment_offload
+
+TRUNCATED_KEYS_MARKER = "..."
+"""The key added to the truncated dicts, its value says how many keys were removed."""
+
+_MAX_DEPTH = 100
+_SCALAR_SIZE_BYTES = 8  # rough size of a number, a boolean or null in JSON
+_NATIVE_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+# Engineer note:
+#
+# The size is estimated while the value is walked, the walk stops as soon as
+# the limit is reached, so truncating a huge value costs as much as walking
+# the part of it which is kept. Nothing is copied if the value fits the limit.
+# Containers on the way to the truncated values are copied, other values are kept
+# as they are. The fields of dataclasses and pydantic models are walked as dicts,
+# other objects are encoded with `jsonable_encoder` (it doesn't copy the strings,
+# so the data is not duplicated). They are kept as they are if they fit.
+
+
+def truncate(
+    value: Any,
+    max_size_bytes: int,
+    attachment_min_size_bytes: Optional[int] = None,
+) -> Any:
+    """
+    Returns the value if its approximate size in JSON fits into `max_size_bytes`,
+    otherwise the truncated copy of it. Long strings are cut and end with
+    "... [truncated N characters]", lists and tuples end with "[N more items truncated]",
+    dicts get the "..." key with "N more keys truncated".
+
+    If `attachment_min_size_bytes` is set, base64 strings which will be offloaded
+    as attachments (see `attachment_offload.AttachmentOffloader`) are kept whole,
+    they are not counted in the size.
+    """
+    return _Truncator(max_size_bytes, attachment_min_size_bytes).truncate(
+        value, depth=0
+    )
+
+
+def truncate_fields(
+    fields: MutableMapping[str, Any],
+    names: List[str],
+    max_size_bytes: Optional[int],
+    attachment_min_size_bytes: Optional[int] = None,
+) -> None:
+    """
+    Truncates the listed values of the mapping in place, each of them separately.
+    """
+    if max_size_bytes is None:
+        return
+
+    for name in names:
+        value = fields.get(name)
+        if value is not None:
+            fields[name] = truncate(value, max_size_bytes, attachment_min_size_bytes)
+
+
+@functools.lru_cache
+def get_span_field_max_bytes() -> Optional[int]:
+    return config.OpikConfig().span_field_max_bytes
+
+
+@functools.lru_cache
+def get_attachment_min_size_bytes() -> Optional[int]:
+    """
+    Returns the minimum size of the attachments if they are offloaded, otherwise None.
+    """
+    config_ = config.OpikConfig()
+    if config_.attachments_directory is None:
+        return None
+
+    return config_.attachment_min_size_bytes
+
+
+class _Truncator:
+    def __init__(
+        self, max_size_bytes: int, attachment_min_size_bytes: Optional[int]
+    ) -> None:
+        self._remaining = max_size_bytes
+        self._attachment_min_size_bytes = attachment_min_size_bytes
+        self._truncations = 0
+
+    def truncate(self, value: Any, depth: int) -> Any:
+        type_ = type(value)
+
+        if type_ is str:
+            return self._truncate_str(value)
+
+        if value is None or type_ in (bool, int, float):
+            self._remaining -= _SCALAR_SIZE_BYTES
+            return value
+
+        if depth >= _MAX_DEPTH:
+            return value
+
+        if type_ is dict:
+            return self._truncate_dict(value, depth)
+
+        if type_ in (list, tuple):
+            return self._truncate_sequence(value, depth)
+
+        return self._truncate_object(value, depth)
+
+    def _truncate_str(self, value: str) -> str:
+        size = len(value) + 2
+        if size <= self._remaining:
+            self._remaining -= size
+            return value
+
+        # checked only for the strings which don't fit, it scans the whole string
+        if (
+            self._attachment_min_size_bytes is not None
+            and attachment_offload.is_base64_blob(
+                value, self._attachment_min_size_bytes
+            )
+        ):
+            return value
+
+        kept = max(self._remaining - 2, 0)
+        self._remaining = 0
+        self._truncations += 1
+        return f"{value[:kept]}... [truncated {len(value) - kept} characters]"
+
+    def _truncate_dict(self, value: Dict[Any, Any], depth: int) -> Dict[Any, Any]:
+        size = _dict_scalars_size(value, self._remaining)
+        if size is not None:
+            self._remaining -= size
+            return value
+
+        self._remaining -= 2
+        result: Optional[Dict[Any, Any]] = None
+
+        for index, (key, item) in enumerate(value.items()):
+            if self._remaining <= 0:
+                if result is None:
+                    result = dict(itertools.islice(value.items(), index))
+                result[TRUNCATED_KEYS_MARKER] = (
+                    f"{len(value) - index} more keys truncated"
+                )
+                self._truncations += 1
+                return result
+
+            self._remaining -= (
+                len(key) + 4 if isinstance(key, str) else _SCALAR_SIZE_BYTES + 4
+            )
+            truncated_item = self.truncate(item, depth + 1)
+
+            if truncated_item is not item and result is None:
+                result = dict(itertools.islice(value.items(), index))
+            if result is not None:
+                result[key] = truncated_item
+
+        return value if result is None else result
+
+    def _truncate_sequence(self, value: Any, depth: int) -> Any:
+        size = _sequence_scalars_size(value, self._remaining)
+        if size is not None:
+            self._remaining -= size
+            return value
+
+        self._remaining -= 2
+        result: Optional[List[Any]] = None
+
+        for index, item in enumerate(value):
+            if self._remaining <= 0:
+                if result is None:
+                    result = list(value[:index])
+                result.append(f"[{len(value) - index} more items truncated]")
+                self._truncations += 1
+                return result
+
+            self._remaining -= 2
+            truncated_item = self.truncate(item, depth + 1)
+
+            if truncated_item is not item and result is None:
+                result = list(value[:index])
+            if result is not None:
+                result.append(truncated_item)
+
+        return value if result is None else result
+
+    def _truncate_object(self, value: Any, depth: int) -> Any:
+        if isinstance(value, GeneratorType):
+            return value  # must not be consumed before the tracked function uses it
+
+        if dataclasses.is_dataclass(value) or isinstance(value, pydantic.BaseModel):
+            encoded = getattr(value, "__dict__", None)
+        else:
+            encoded = None
+        if encoded is None:
+            encoded = jsonable_encoder.jsonable_encoder(value)
+
+        truncations_before = self._truncations
+        truncated = self.truncate(encoded, depth=depth + 1)
+
+        return value if self._truncations == truncations_before else truncated
+
+
+def _dict_scalars_size(value: Dict[Any, Any], max_size_bytes: int) -> Optional[int]:
+    """
+    Returns the approximate JSON size of the dict if it has only string keys
+    and JSON scalar values and fits into `max_size_bytes`, otherwise None.
+    It's faster than walking the items one by one.
+    """
+    size = 2
+    for key, item in value.items():
+        if not isinstance(key, str):
+            return None
+
+        item_type = type(item)
+        if item_type is str:
+            size += len(key) + len(item) + 6
+        elif item_type in _NATIVE_SCALAR_TYPES:
+            size += len(key) + _SCALAR_SIZE_BYTES + 4
+        else:
+            return None
+
+        if size > max_size_bytes:
+            return None
+
+    return size
+
+
+def _sequence_scalars_size(value: Any, max_size_bytes: int) -> Optional[int]:
+    """
+    The same as `_dict_scalars_size`, for lists and tuples.
+    """
+    size = 2
+    for item in value:
+        item_type = type(item)
+        if item_type is str:
+            size += len(item) + 4
+        elif item_type in _NATIVE_SCALAR_TYPES:
+            size += _SCALAR_SIZE_BYTES + 2
+        else:
+            return None
+
+        if size > max_size_bytes:
+            return None
+
+    return size
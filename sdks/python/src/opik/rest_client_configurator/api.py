@@ -1,12 +1,16 @@
+from typing import Union
+
 from .. import rest_api
 from . import public_methods_patcher, retry_decorators
 
 
-def configure(rest_client: rest_api.OpikApi) -> None:
+def configure(rest_client: Union[rest_api.OpikApi, rest_api.AsyncOpikApi]) -> None:
     _configure_retries(rest_client)
 
 
-def _configure_retries(rest_client: rest_api.OpikApi) -> None:
+def _configure_retries(
+    rest_client: Union[rest_api.OpikApi, rest_api.AsyncOpikApi],
+) -> None:
     domain_client_names = [
         "datasets",
         "experiments",
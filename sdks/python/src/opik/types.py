@@ -40,6 +40,13 @@ class DistributedTraceHeadersDict(TypedDict):
     opik_trace_id: str
     opik_parent_span_id: str
 
+    opik_sampled: NotRequired[bool]
+    """
+    False if the trace is not logged (sampled out or tracking is disabled),
+    the remote node doesn't log its part of the trace then.
+    The headers without this key are considered sampled.
+    """
+
 
 class FeedbackScoreDict(TypedDict):
     """
@@ -7,6 +7,7 @@ import pytest
 
 from opik import context_storage
 from opik.api_objects import opik_client
+from opik.decorator import tracing_runtime_config
 from opik.message_processing import streamer_constructors
 from . import testlib
 from .testlib import backend_emulator_message_processor
@@ -18,6 +19,12 @@ def clear_context_storage():
     context_storage.clear_all()
 
 
+@pytest.fixture(autouse=True)
+def reset_tracing_runtime_config():
+    yield
+    tracing_runtime_config.reset_tracing_to_config_default()
+
+
 @pytest.fixture(autouse=True)
 def shutdown_cached_client_after_test():
     yield
@@ -6,6 +6,7 @@ from .assert_helpers import (
     prepare_difference_report,
 )
 from .backend_emulator_message_processor import BackendEmulatorMessageProcessor
+from .message_helpers import create_span_message, update_span_message
 from .models import FeedbackScoreModel, SpanModel, TraceModel
 from .patch_helpers import patch_environ
 
@@ -22,6 +23,8 @@ __all__ = [
     "assert_dict_has_keys",
     "assert_dicts_equal",
     "assert_equal",
+    "create_span_message",
     "patch_environ",
     "prepare_difference_report",
+    "update_span_message",
 ]
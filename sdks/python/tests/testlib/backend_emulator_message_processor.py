@@ -146,6 +146,12 @@ class BackendEmulatorMessageProcessor(message_processors.BaseMessageProcessor):
         elif isinstance(message, messages.CreateTraceBatchMessage):
             for item in message.batch:
                 self.process(item)
+        elif isinstance(message, messages.UpdateSpansBatchMessage):
+            for item in message.batch:
+                self.process(item)
+        elif isinstance(message, messages.UpdateTracesBatchMessage):
+            for item in message.batch:
+                self.process(item)
         elif isinstance(message, messages.UpdateSpanMessage):
             span: SpanModel = self._observations[message.span_id]
             update_payload = {
@@ -0,0 +1,57 @@
+import datetime
+from typing import Any
+
+from opik.message_processing import messages
+
+
+def create_span_message(span_id: str, **kwargs: Any) -> messages.CreateSpanMessage:
+    """
+    Returns the create message of the span, the fields not passed in `kwargs`
+    are set to the placeholder values or None.
+    """
+    message_kwargs = {
+        "span_id": span_id,
+        "trace_id": "some-trace-id",
+        "project_name": "some-project",
+        "parent_span_id": None,
+        "name": "some-name",
+        "start_time": datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc),
+        "end_time": None,
+        "input": None,
+        "output": None,
+        "metadata": None,
+        "tags": None,
+        "type": "general",
+        "usage": None,
+        "model": None,
+        "provider": None,
+        "error_info": None,
+        "total_cost": None,
+    }
+    message_kwargs.update(kwargs)
+    return messages.CreateSpanMessage(**message_kwargs)
+
+
+def update_span_message(span_id: str, **kwargs: Any) -> messages.UpdateSpanMessage:
+    """
+    Returns the update message of the span, the fields not passed in `kwargs`
+    are set to the placeholder values or None.
+    """
+    message_kwargs = {
+        "span_id": span_id,
+        "parent_span_id": None,
+        "trace_id": "some-trace-id",
+        "project_name": "some-project",
+        "end_time": None,
+        "input": None,
+        "output": None,
+        "metadata": None,
+        "tags": None,
+        "usage": None,
+        "model": None,
+        "provider": None,
+        "error_info": None,
+        "total_cost": None,
+    }
+    message_kwargs.update(kwargs)
+    return messages.UpdateSpanMessage(**message_kwargs)
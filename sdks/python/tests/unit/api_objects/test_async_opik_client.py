@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import httpx
+import mock
+
+import opik
+from opik import httpx_client
+
+
+def _patch_httpx_client(handle_request):
+    return mock.patch.object(
+        httpx_client,
+        "get_async",
+        return_value=httpx.AsyncClient(transport=httpx.MockTransport(handle_request)),
+    )
+
+
+def test_async_opik__trace_and_span_logged__sent_in_batches_on_end():
+    requests = []
+
+    async def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    async def main():
+        with _patch_httpx_client(handle_request):
+            tested = opik.AsyncOpik(
+                project_name="some-project",
+                host="http://localhost/api",
+                _show_misconfiguration_message=False,
+            )
+        trace = tested.trace(name="some-trace")
+        trace.span(name="some-span")
+        await tested.end()
+
+        return trace
+
+    trace = asyncio.run(main())
+
+    assert sorted(request.url.path for request in requests) == [
+        "/api/v1/private/spans/batch",
+        "/api/v1/private/traces/batch",
+    ]
+    for request in requests:
+        body = json.loads(request.content)
+        for item in body.get("traces", []) + body.get("spans", []):
+            assert item["project_name"] == "some-project"
+            assert trace.id in (item["id"], item.get("trace_id"))
+
+
+def test_async_opik__concurrent_reads__all_results_returned():
+    async def handle_request(request: httpx.Request) -> httpx.Response:
+        trace_id = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(
+            200,
+            json={
+                "id": trace_id,
+                "name": "some-trace",
+                "start_time": "2025-01-01T00:00:00Z",
+            },
+        )
+
+    async def main():
+        with _patch_httpx_client(handle_request):
+            tested = opik.AsyncOpik(
+                host="http://localhost/api",
+                _show_misconfiguration_message=False,
+            )
+        traces = await asyncio.gather(
+            *[tested.get_trace_content(f"trace-{i}") for i in range(5)]
+        )
+        await tested.end()
+
+        return traces
+
+    traces = asyncio.run(main())
+
+    assert [trace.id for trace in traces] == [f"trace-{i}" for i in range(5)]
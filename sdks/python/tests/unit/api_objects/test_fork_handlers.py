@@ -0,0 +1,59 @@
+import os
+
+import mock
+import pytest
+
+from opik.api_objects import fork_handlers, opik_client
+
+
+class FakeClient:
+    def __init__(self, fail=False):
+        self.reinitialized = 0
+        self._fail = fail
+
+    def __internal_api__reinitialize_after_fork__(self):
+        if self._fail:
+            raise Exception("failed")
+        self.reinitialized += 1
+
+
+def test_reinitialize_clients__registered_clients_reinitialized():
+    client = FakeClient()
+    failing_client = FakeClient(fail=True)
+
+    with mock.patch.object(
+        fork_handlers,
+        "_clients",
+        fork_handlers.weakref.WeakSet([failing_client, client]),
+    ):
+        fork_handlers._reinitialize_clients()
+
+    assert client.reinitialized == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="os.fork() is not available")
+def test_opik_client__process_forked__child_gets_new_running_streamer():
+    client = opik_client.Opik(
+        host="http://localhost/api", _show_misconfiguration_message=False
+    )
+    parent_streamer = client._streamer
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child
+        try:
+            reinitialized = client._streamer is not parent_streamer and all(
+                consumer.is_alive() for consumer in client._streamer._queue_consumers
+            )
+            os.write(write_fd, b"1" if reinitialized else b"0")
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.waitpid(pid, 0)
+    os.close(read_fd)
+    client.end()
+
+    assert result == b"1"
+    assert client._streamer is parent_streamer
@@ -0,0 +1,17 @@
+import pytest
+
+from opik.api_objects import opik_client
+
+
+def test_opik_client__deprecated_use_batching_passed__warning_emitted_and_value_used():
+    with pytest.warns(DeprecationWarning, match="_use_batching"):
+        client = opik_client.Opik(
+            host="http://localhost/api",
+            _use_batching=True,
+            _show_misconfiguration_message=False,
+        )
+
+    try:
+        assert client._use_batching is True
+    finally:
+        client.end()
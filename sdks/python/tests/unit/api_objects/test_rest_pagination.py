@@ -0,0 +1,154 @@
+import asyncio
+import threading
+
+import httpx
+import mock
+import pytest
+
+import opik
+from opik import httpx_client
+from opik.api_objects import rest_pagination
+
+
+def _fake_pages(total_items):
+    requested_pages = []
+
+    def fetch_page(page, size):
+        requested_pages.append(page)
+        start = (page - 1) * size
+        return list(range(start, min(start + size, total_items)))
+
+    return fetch_page, requested_pages
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iterate_pages__all_pages__items_yielded_in_order(prefetch):
+    fetch_page, requested_pages = _fake_pages(total_items=25)
+
+    result = list(
+        rest_pagination.iterate_pages(fetch_page, page_size=10, prefetch=prefetch)
+    )
+
+    assert result == list(range(25))
+    assert requested_pages == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iterate_pages__max_results_reached__pages_after_it_not_requested(prefetch):
+    fetch_page, requested_pages = _fake_pages(total_items=1000)
+
+    result = list(
+        rest_pagination.iterate_pages(
+            fetch_page, page_size=10, max_results=15, prefetch=prefetch
+        )
+    )
+
+    assert result == list(range(15))
+    assert requested_pages == [1, 2]
+
+
+def test_iterate_pages__prefetch__next_page_requested_while_current_consumed():
+    next_page_requested = threading.Event()
+
+    def fetch_page(page, size):
+        if page == 2:
+            next_page_requested.set()
+        return [page] if page <= 2 else []
+
+    iterator = rest_pagination.iterate_pages(fetch_page, page_size=1)
+
+    assert next(iterator) == 1
+    assert next_page_requested.wait(timeout=5)
+    assert list(iterator) == [2]
+
+
+def test_iterate_pages__fetching_failed__error_raised_when_page_reached():
+    def fetch_page(page, size):
+        if page == 2:
+            raise RuntimeError("backend is unavailable")
+        return [page]
+
+    iterator = rest_pagination.iterate_pages(fetch_page, page_size=1)
+
+    assert next(iterator) == 1
+    with pytest.raises(RuntimeError, match="backend is unavailable"):
+        next(iterator)
+
+
+def _fake_async_pages(total_items):
+    fetch_page, requested_pages = _fake_pages(total_items)
+
+    async def async_fetch_page(page, size):
+        return fetch_page(page, size)
+
+    return async_fetch_page, requested_pages
+
+
+def test_fetch_pages__all_pages__items_returned_in_order():
+    fetch_page, requested_pages = _fake_async_pages(total_items=25)
+
+    result = asyncio.run(rest_pagination.fetch_pages(fetch_page, page_size=10))
+
+    assert result == list(range(25))
+    assert requested_pages == [1, 2, 3, 4]
+
+
+def test_fetch_pages__max_results_reached__pages_after_it_not_requested():
+    fetch_page, requested_pages = _fake_async_pages(total_items=1000)
+
+    result = asyncio.run(
+        rest_pagination.fetch_pages(fetch_page, page_size=10, max_results=15)
+    )
+
+    assert result == list(range(15))
+    assert requested_pages == [1, 2]
+
+
+def test_opik_iter_spans__spans_requested_with_page_size_and_filters():
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        page = int(request.url.params["page"])
+        content = (
+            [
+                {
+                    "id": f"span-{page}",
+                    "trace_id": "some-trace-id",
+                    "name": "some-span",
+                    "type": "general",
+                    "start_time": "2025-01-01T00:00:00Z",
+                }
+            ]
+            if page <= 2
+            else []
+        )
+        return httpx.Response(200, json={"page": page, "content": content})
+
+    with mock.patch.object(
+        httpx_client,
+        "get",
+        return_value=httpx.Client(transport=httpx.MockTransport(handle_request)),
+    ):
+        client = opik.Opik(
+            project_name="some-project",
+            host="http://localhost/api",
+            _show_misconfiguration_message=False,
+        )
+    try:
+        spans = list(
+            client.iter_spans(
+                trace_id="some-trace-id",
+                filter_string='name = "some-span"',
+                page_size=1,
+            )
+        )
+    finally:
+        client.end()
+
+    assert [span.id for span in spans] == ["span-1", "span-2"]
+    assert [request.url.params["page"] for request in requests] == ["1", "2", "3"]
+    assert all(request.url.params["size"] == "1" for request in requests)
+    assert requests[0].url.params["project_name"] == "some-project"
+    assert requests[0].url.params["trace_id"] == "some-trace-id"
+    assert "some-span" in requests[0].url.params["filters"]
@@ -0,0 +1,66 @@
+import signal
+
+import mock
+import pytest
+
+from opik.api_objects import signal_handlers
+
+
+@pytest.fixture
+def clean_signal_handlers_state():
+    original_handler = signal.getsignal(signal.SIGTERM)
+    with mock.patch.object(
+        signal_handlers, "_clients", signal_handlers.weakref.WeakSet()
+    ), mock.patch.object(signal_handlers, "_handlers_installed", False):
+        yield
+
+    signal.signal(signal.SIGTERM, original_handler)
+
+
+def test_register_flush_on_signals__sigterm_received__clients_flushed__signal_reraised_with_default_handler(
+    clean_signal_handlers_state,
+):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    client = mock.Mock()
+
+    signal_handlers.register_flush_on_signals(client)
+    with mock.patch.object(signal_handlers.os, "kill") as mock_kill:
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+    client.flush.assert_called_once()
+    mock_kill.assert_called_once_with(signal_handlers.os.getpid(), signal.SIGTERM)
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+def test_register_flush_on_signals__application_handler_installed__handler_not_replaced(
+    clean_signal_handlers_state,
+):
+    application_handler = mock.Mock()
+    signal.signal(signal.SIGTERM, application_handler)
+
+    signal_handlers.register_flush_on_signals(mock.Mock())
+
+    assert signal.getsignal(signal.SIGTERM) is application_handler
+
+
+def test_register_flush_on_signals__signal_ignored__handler_not_installed(
+    clean_signal_handlers_state,
+):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    signal_handlers.register_flush_on_signals(mock.Mock())
+
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_IGN
+
+
+def test_flush_clients__client_flush_hangs__returns_after_timeout():
+    client = mock.Mock()
+    client.flush.side_effect = lambda timeout: signal_handlers.time.sleep(10)
+
+    with mock.patch.object(
+        signal_handlers, "_clients", signal_handlers.weakref.WeakSet([client])
+    ):
+        start = signal_handlers.time.monotonic()
+        signal_handlers.flush_clients(timeout=0.2)
+
+    assert signal_handlers.time.monotonic() - start < 5
@@ -0,0 +1,90 @@
+import inspect
+
+import pytest
+
+from opik.decorator import inspect_helpers
+
+
+def _positional(a, b, c):
+    pass
+
+
+def _with_defaults(a, b=1, *, c, d=None):
+    pass
+
+
+def _positional_only(a, b=2, /, c=3):
+    pass
+
+
+def _variadic(a, *args, b=1, **kwargs):
+    pass
+
+
+class _SomeClass:
+    def method(self, x, y=0):
+        pass
+
+
+def _expected_inputs(func, args, kwargs):
+    bound_args = inspect.signature(func).bind(*args, **kwargs)
+    bound_args.apply_defaults()
+    return dict(bound_args.arguments)
+
+
+@pytest.mark.parametrize(
+    "func,args,kwargs",
+    [
+        (_positional, (1, 2, 3), {}),
+        (_positional, (1,), {"c": 3, "b": 2}),
+        (_positional, (), {"a": 1, "b": 2, "c": 3}),
+        (_with_defaults, (1,), {"c": 3}),
+        (_with_defaults, (1, 2), {"d": 4, "c": 3}),
+        (_positional_only, (1,), {}),
+        (_positional_only, (1, 2), {"c": 4}),
+        (_variadic, (1, 2, 3), {"b": 2, "x": 5}),
+        (_variadic, (1,), {}),
+    ],
+)
+def test_extract_inputs__valid_arguments__same_as_signature_bind(func, args, kwargs):
+    result = inspect_helpers.extract_inputs(func, args, kwargs)
+
+    assert result == _expected_inputs(func, args, kwargs)
+    assert list(result) == list(_expected_inputs(func, args, kwargs))
+
+
+@pytest.mark.parametrize(
+    "func,args,kwargs",
+    [
+        (_positional, (1, 2), {}),
+        (_positional, (1, 2, 3, 4), {}),
+        (_positional, (1, 2, 3), {"d": 4}),
+        (_with_defaults, (1,), {}),
+        (_positional_only, (), {"a": 1}),
+    ],
+)
+def test_extract_inputs__arguments_do_not_match_signature__raw_args_and_kwargs_returned(
+    func, args, kwargs
+):
+    result = inspect_helpers.extract_inputs(func, args, kwargs)
+
+    assert result == {"args": args, "kwargs": kwargs}
+
+
+def test_extract_inputs__method__self_not_included():
+    instance = _SomeClass()
+
+    assert inspect_helpers.extract_inputs(_SomeClass.method, (instance, 1), {}) == {
+        "x": 1,
+        "y": 0,
+    }
+    assert inspect_helpers.extract_inputs(instance.method, (1,), {"y": 2}) == {
+        "x": 1,
+        "y": 2,
+    }
+
+
+def test_get_arguments_binder__same_function__binder_cached():
+    assert inspect_helpers.get_arguments_binder(
+        _positional
+    ) is inspect_helpers.get_arguments_binder(_positional)
@@ -1,5 +1,9 @@
-from opik import opik_context
-from opik.decorator import tracker
+import asyncio
+
+import mock
+
+from opik import context_storage, opik_context
+from opik.decorator import inspect_helpers, tracing_runtime_config, tracker
 
 from ...testlib import patch_environ
 
@@ -65,3 +69,63 @@ def test_track_disabled_mode__update_current_span_and_trace_called__no_errors_ra
 
     assert len(fake_backend.trace_trees) == 0
     assert len(fake_backend.span_trees) == 0
+
+
+def test_track_disabled_mode__wrappers_short_circuited__no_spans_created_or_left_in_context(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    with patch_environ({"OPIK_TRACK_DISABLE": "true"}):
+
+        @tracker_instance.track
+        def f_sync(x):
+            assert context_storage.span_data_stack_empty()
+            return x
+
+        @tracker_instance.track
+        async def f_async(x):
+            return f_sync(x)
+
+        @tracker_instance.track
+        def f_generator(x):
+            yield f_sync(x)
+
+        with mock.patch.object(inspect_helpers, "extract_inputs") as extract_inputs:
+            assert f_sync(1, opik_distributed_trace_headers=None) == 1
+            assert asyncio.run(f_async(2)) == 2
+            assert list(f_generator(3)) == [3]
+
+        tracker.flush_tracker()
+
+    extract_inputs.assert_not_called()
+    assert context_storage.span_data_stack_empty()
+    assert context_storage.get_trace_data() is None
+    assert len(fake_backend.trace_trees) == 0
+
+
+def test_set_tracing_active__toggled_at_runtime__only_calls_started_while_active_logged(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    @tracker_instance.track
+    def f_inner():
+        return 42
+
+    @tracker_instance.track
+    def f_outer(name):
+        tracing_runtime_config.set_tracing_active(False)
+        f_inner()
+
+    f_outer("disabled-inside")
+    f_outer("not-logged")
+    tracing_runtime_config.set_tracing_active(True)
+    f_inner()
+    tracker.flush_tracker()
+
+    assert [trace_tree.name for trace_tree in fake_backend.trace_trees] == [
+        "f_outer",
+        "f_inner",
+    ]
+    assert fake_backend.trace_trees[0].spans[0].spans == []
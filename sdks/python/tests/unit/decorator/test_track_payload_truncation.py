@@ -0,0 +1,48 @@
+import pytest
+
+from opik import opik_context, payload_truncation
+from opik.decorator import tracker
+
+from ...testlib import patch_environ
+
+
+@pytest.fixture
+def span_field_max_bytes_100():
+    payload_truncation.get_span_field_max_bytes.cache_clear()
+    with patch_environ({"OPIK_SPAN_FIELD_MAX_BYTES": "100"}):
+        yield
+    payload_truncation.get_span_field_max_bytes.cache_clear()
+
+
+def test_track__input_output_and_metadata_bigger_than_limit__truncated_when_captured(
+    fake_backend, span_field_max_bytes_100
+):
+    @tracker.track
+    def f(document):
+        opik_context.update_current_span(metadata={"chunks": list(range(1000))})
+        return "b" * 1000
+
+    f("a" * 1000)
+    tracker.flush_tracker()
+
+    trace_tree = fake_backend.trace_trees[0]
+    span_tree = trace_tree.spans[0]
+    for tree in [trace_tree, span_tree]:
+        assert tree.input["document"].startswith("a" * 50)
+        assert tree.input["document"].endswith("characters]")
+        assert tree.output["output"].endswith("characters]")
+    assert span_tree.metadata["chunks"][-1].endswith("more items truncated]")
+
+
+def test_track__values_fit_the_limit__not_changed(
+    fake_backend, span_field_max_bytes_100
+):
+    @tracker.track
+    def f(x):
+        return {"y": x}
+
+    f("short")
+    tracker.flush_tracker()
+
+    assert fake_backend.trace_trees[0].input == {"x": "short"}
+    assert fake_backend.trace_trees[0].output == {"y": "short"}
@@ -0,0 +1,180 @@
+import asyncio
+
+import mock
+import pytest
+
+from opik import context_storage, opik_context
+from opik.decorator import inspect_helpers, sampling, tracker
+
+from ...testlib import patch_environ
+
+
+@pytest.fixture(autouse=True)
+def clear_cached_trace_sampler():
+    sampling.get_trace_sampler_cached.cache_clear()
+    yield
+    sampling.get_trace_sampler_cached.cache_clear()
+
+
+def test_track__trace_sample_rate_is_zero__nothing_logged__functions_work(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    with patch_environ({"OPIK_TRACE_SAMPLE_RATE": "0"}):
+
+        @tracker_instance.track
+        def f_inner(x):
+            opik_context.update_current_span(name="some-name")
+            opik_context.update_current_trace(name="some-name")
+            return x + 1
+
+        @tracker_instance.track
+        def f_outer(x):
+            return f_inner(x) * 2
+
+        with mock.patch.object(inspect_helpers, "extract_inputs") as extract_inputs:
+            assert f_outer(1) == 4
+            assert f_outer(2) == 6
+
+        tracker.flush_tracker()
+
+    extract_inputs.assert_not_called()
+    assert len(fake_backend.trace_trees) == 0
+    assert len(fake_backend.span_trees) == 0
+    assert sampling.get_stats() == sampling.SamplingStats(
+        sampled_out_traces=2, rate_limited_traces=0
+    )
+    assert not context_storage.trace_sampled_out()
+
+
+def test_track__function_raised_in_sampled_out_trace__context_restored(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    @tracker_instance.track(sample_rate=0)
+    def f_dropped():
+        raise ValueError()
+
+    @tracker_instance.track
+    def f_logged():
+        return 42
+
+    with pytest.raises(ValueError):
+        f_dropped()
+    f_logged()
+    tracker.flush_tracker()
+
+    assert len(fake_backend.trace_trees) == 1
+    assert fake_backend.trace_trees[0].name == "f_logged"
+
+
+def test_track__custom_sampler__decision_made_once_per_trace_with_root_function_arguments(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+    sampler = mock.Mock(side_effect=lambda name, args, kwargs: kwargs["user"] == "a")
+
+    @tracker_instance.track
+    def f_inner():
+        return "inner"
+
+    @tracker_instance.track(sampler=sampler)
+    def f_outer(user):
+        f_inner()
+        return user
+
+    f_outer(user="a")
+    f_outer(user="b")
+    tracker.flush_tracker()
+
+    assert sampler.call_args_list == [
+        mock.call("f_outer", (), {"user": "a"}),
+        mock.call("f_outer", (), {"user": "b"}),
+    ]
+    assert len(fake_backend.trace_trees) == 1
+    assert fake_backend.trace_trees[0].input == {"user": "a"}
+    assert len(fake_backend.trace_trees[0].spans[0].spans) == 1
+
+
+def test_track__sampled_out_generators_and_async_functions__values_returned__nothing_logged(
+    fake_backend,
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    @tracker_instance.track
+    def f_inner():
+        return 1
+
+    @tracker_instance.track(sample_rate=0)
+    def f_generator():
+        yield f_inner()
+        yield f_inner() + 1
+
+    @tracker_instance.track(sample_rate=0)
+    async def f_async():
+        await asyncio.sleep(0)
+        return f_inner()
+
+    @tracker_instance.track(sample_rate=0)
+    async def f_async_generator():
+        yield f_inner()
+
+    async def consume_async_generator():
+        return [value async for value in f_async_generator()]
+
+    assert list(f_generator()) == [1, 2]
+    assert asyncio.run(f_async()) == 1
+    assert asyncio.run(consume_async_generator()) == [1]
+    tracker.flush_tracker()
+
+    assert len(fake_backend.trace_trees) == 0
+    assert len(fake_backend.span_trees) == 0
+
+
+@pytest.mark.parametrize("sample_rate", [0.0, 1.0])
+def test_track__distributed_trace_headers__remote_node_follows_sampling_decision(
+    fake_backend, sample_rate
+):
+    tracker_instance = tracker.OpikTrackDecorator()
+
+    @tracker_instance.track
+    def f_remote():
+        return "remote-output"
+
+    @tracker_instance.track(sample_rate=sample_rate)
+    def f_caller():
+        return opik_context.get_distributed_trace_headers()
+
+    distributed_trace_headers = f_caller()
+    assert f_remote(opik_distributed_trace_headers=distributed_trace_headers) == (
+        "remote-output"
+    )
+    tracker.flush_tracker()
+
+    assert distributed_trace_headers["opik_sampled"] is (sample_rate == 1.0)
+    if sample_rate == 0.0:
+        assert len(fake_backend.trace_trees) == 0
+        assert len(fake_backend.span_trees) == 0
+    else:
+        [caller_span] = fake_backend.trace_trees[0].spans
+        assert caller_span.id == distributed_trace_headers["opik_parent_span_id"]
+        assert [span.name for span in caller_span.spans] == ["f_remote"]
+
+
+def test_trace_sampler__rate_limit_exceeded__traces_dropped_per_project():
+    with mock.patch.object(sampling.time, "monotonic", return_value=100.0):
+        tested = sampling.TraceSampler(max_traces_per_second=2)
+        decisions = [tested.should_sample("f", "project-a", (), {}) for _ in range(3)]
+        other_project_decision = tested.should_sample("f", "project-b", (), {})
+
+    with mock.patch.object(sampling.time, "monotonic", return_value=100.5):
+        refilled_decision = tested.should_sample("f", "project-a", (), {})
+
+    assert decisions == [True, True, False]
+    assert other_project_decision is True
+    assert refilled_decision is True
+    assert tested.get_stats() == sampling.SamplingStats(
+        sampled_out_traces=0, rate_limited_traces=1
+    )
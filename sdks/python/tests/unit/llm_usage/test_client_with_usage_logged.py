@@ -5,7 +5,7 @@ from ...testlib import TraceModel, SpanModel, ANY_BUT_NONE, ANY_DICT, assert_equ
 def test_span__provider_supported__usage_format_is_correct__usage_converted_to_opik_format(
     fake_backend,
 ):
-    opik_client = opik.Opik(_use_batching=True)
+    opik_client = opik.Opik(batching=True)
 
     opik_client.span(
         type="llm",
@@ -60,7 +60,7 @@ def test_span__provider_supported__usage_format_is_correct__usage_converted_to_o
 def test_span__provider_not_passed__usage_format_is_correct_for_some_provider__usage_converted_to_opik_format(
     fake_backend,
 ):
-    opik_client = opik.Opik(_use_batching=True)
+    opik_client = opik.Opik(batching=True)
 
     opik_client.span(
         type="llm",
@@ -110,7 +110,7 @@ def test_span__provider_not_passed__usage_format_is_correct_for_some_provider__u
 def test_span__unknown_provider_passed__usage_format_is_correct_for_some_provider__usage_converted_to_opik_format(
     fake_backend,
 ):
-    opik_client = opik.Opik(_use_batching=True)
+    opik_client = opik.Opik(batching=True)
 
     opik_client.span(
         type="llm",
@@ -162,7 +162,7 @@ def test_span__unknown_provider_passed__usage_format_is_correct_for_some_provide
 def test_span__unknown_provider_passed__usage_format_is_also_unknown__usage_flattened__prefix_added_to_keys__only_int_values_are_kept(
     fake_backend,
 ):
-    opik_client = opik.Opik(_use_batching=True)
+    opik_client = opik.Opik(batching=True)
 
     opik_client.span(
         type="llm",
@@ -220,7 +220,7 @@ def test_span__unknown_provider_passed__usage_format_is_also_unknown__usage_flat
 def test_span__user_added_openai_keys_to_unknown_usage_themselves__they_are_included_to_usage_dict_without_prefix(
     fake_backend,
 ):
-    opik_client = opik.Opik(_use_batching=True)
+    opik_client = opik.Opik(batching=True)
 
     opik_client.span(
         type="llm",
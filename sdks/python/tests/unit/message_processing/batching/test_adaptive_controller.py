@@ -0,0 +1,138 @@
+import queue
+
+import mock
+import pytest
+
+from opik.message_processing.batching import (
+    adaptive_controller,
+    batch_manager_constuctors,
+    batchers,
+)
+
+from ....testlib import create_span_message
+
+NOT_USED = None
+
+# @Size(max = 1000) of the batch endpoints of the backend
+BACKEND_MAX_BATCH_SIZE = 1000
+
+
+@pytest.fixture(autouse=True)
+def fake_clock():
+    # every call of adjust() happens one adjustment interval after the previous one
+    with mock.patch.object(adaptive_controller.time, "monotonic") as monotonic:
+        monotonic.side_effect = (
+            i * adaptive_controller.ADJUSTMENT_INTERVAL_SECONDS for i in range(1000)
+        )
+        yield
+
+
+def _create_controller(message_queue=None):
+    batcher = batchers.CreateSpanMessageBatcher(
+        flush_callback=NOT_USED,
+        max_batch_size=100,
+        flush_interval_seconds=2.0,
+    )
+    tested = adaptive_controller.AdaptiveBatchingController()
+    tested.attach(batchers=[batcher], message_queue=message_queue or queue.Queue())
+
+    return tested, batcher
+
+
+def test_adaptive_batching_controller__fast_requests_after_shrinking__batch_size_grows_back_to_base():
+    tested, batcher = _create_controller()
+
+    for _ in range(10):
+        tested.observe_request(items=1000, latency_seconds=10.0, failed=False)
+    tested.adjust()
+    assert batcher.max_batch_size == 50
+
+    for _ in range(10):
+        for _ in range(20):
+            tested.observe_request(items=1000, latency_seconds=0.1, failed=False)
+        tested.adjust()
+        assert batcher.max_batch_size <= 100
+
+    assert batcher.max_batch_size == 100
+    assert tested.get_stats().max_batch_sizes == {"CreateSpanMessageBatcher": 100}
+
+
+def test_adaptive_batching_controller__fast_requests_for_long_time__batches_not_larger_than_backend_limit():
+    message_queue = queue.Queue()
+    tested = adaptive_controller.AdaptiveBatchingController()
+    batch_manager = batch_manager_constuctors.create_batch_manager(
+        message_queue, adaptive_controller_=tested
+    )
+
+    for _ in range(10):
+        tested.observe_request(items=100_000, latency_seconds=0.1, failed=False)
+        tested.adjust()
+
+    for i in range(2500):
+        batch_manager.process_message(create_span_message(f"span-{i}"))
+    batch_manager.flush()
+
+    batch_sizes = []
+    while not message_queue.empty():
+        batch_sizes.append(len(message_queue.get().batch))
+
+    assert sum(batch_sizes) == 2500
+    assert max(batch_sizes) <= BACKEND_MAX_BATCH_SIZE
+
+
+def test_adaptive_batching_controller__fast_requests_and_low_send_rate__batch_size_not_changed():
+    tested, batcher = _create_controller()
+
+    tested.observe_request(items=1, latency_seconds=0.1, failed=False)
+    tested.adjust()
+
+    assert batcher.max_batch_size == 100
+
+
+@pytest.mark.parametrize(
+    "latency_seconds,failed",
+    [
+        (10.0, False),
+        (0.1, True),
+    ],
+)
+def test_adaptive_batching_controller__high_latency_or_errors__batch_size_shrinks(
+    latency_seconds, failed
+):
+    tested, batcher = _create_controller()
+
+    for _ in range(10):
+        tested.observe_request(
+            items=1000, latency_seconds=latency_seconds, failed=failed
+        )
+    tested.adjust()
+
+    assert batcher.max_batch_size == 50
+    assert batcher.flush_interval_seconds == 2.0
+    assert tested.get_stats().batch_size_factor == 0.5
+
+
+def test_adaptive_batching_controller__shallow_queue__flush_interval_is_cut_down_to_the_limit():
+    tested, batcher = _create_controller()
+
+    tested.adjust()
+    assert batcher.flush_interval_seconds == 1.0
+
+    for _ in range(5):
+        tested.adjust()
+    assert batcher.flush_interval_seconds == 0.5
+
+
+def test_adaptive_batching_controller__deep_queue__flush_interval_restored():
+    message_queue = queue.Queue()
+    tested, batcher = _create_controller(message_queue)
+
+    tested.adjust()
+    assert batcher.flush_interval_seconds == 1.0
+
+    for i in range(adaptive_controller.SHALLOW_QUEUE_SIZE + 1):
+        message_queue.put(i)
+    tested.adjust()
+
+    assert batcher.flush_interval_seconds == 2.0
+    assert tested.get_stats().queue_size == adaptive_controller.SHALLOW_QUEUE_SIZE + 1
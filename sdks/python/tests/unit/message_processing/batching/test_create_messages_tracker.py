@@ -0,0 +1,92 @@
+import threading
+
+import mock
+import pytest
+
+from opik.message_processing import message_queue, messages
+from opik.message_processing.batching import create_messages_tracker
+
+
+def _create_spans_batch(*span_ids, trace_id="trace-1"):
+    return messages.CreateSpansBatchMessage(
+        batch=[mock.Mock(span_id=span_id, trace_id=trace_id) for span_id in span_ids]
+    )
+
+
+def _update_spans_batch(*span_ids, trace_id="trace-1"):
+    return messages.UpdateSpansBatchMessage(
+        batch=[mock.Mock(span_id=span_id, trace_id=trace_id) for span_id in span_ids]
+    )
+
+
+def test_in_flight_create_messages_tracker__no_create_messages_in_flight__update_is_not_blocked():
+    tested = create_messages_tracker.InFlightCreateMessagesTracker()
+
+    assert tested.wait_for_dependencies(_update_spans_batch("span-1"), timeout=0)
+
+
+def test_in_flight_create_messages_tracker__create_message_of_updated_span_in_flight__update_blocked_until_create_completed():
+    tested = create_messages_tracker.InFlightCreateMessagesTracker()
+    create_message = _create_spans_batch("span-1", "span-2")
+    tested.register(create_message)
+
+    assert not tested.wait_for_dependencies(_update_spans_batch("span-2"), timeout=0)
+
+    timer = threading.Timer(0.1, tested.complete, args=(create_message,))
+    timer.start()
+    assert tested.wait_for_dependencies(_update_spans_batch("span-2"), timeout=5)
+    timer.join()
+
+
+def test_in_flight_create_messages_tracker__create_message_of_the_trace_of_updated_span_in_flight__update_blocked():
+    tested = create_messages_tracker.InFlightCreateMessagesTracker()
+    create_trace_message = messages.CreateTraceBatchMessage(
+        batch=[mock.Mock(trace_id="trace-1")]
+    )
+    tested.register(create_trace_message)
+
+    assert not tested.wait_for_dependencies(
+        _update_spans_batch("span-1", trace_id="trace-1"), timeout=0
+    )
+    assert tested.wait_for_dependencies(
+        _update_spans_batch("span-1", trace_id="trace-2"), timeout=0
+    )
+
+    tested.complete(create_trace_message)
+    assert tested.wait_for_dependencies(
+        _update_spans_batch("span-1", trace_id="trace-1"), timeout=0
+    )
+
+
+def test_in_flight_create_messages_tracker__not_registered_message_completed__nothing_happens():
+    tested = create_messages_tracker.InFlightCreateMessagesTracker()
+
+    tested.complete(_create_spans_batch("span-1"))
+    tested.complete("not-a-message")
+
+    assert tested.wait_for_dependencies(_update_spans_batch("span-1"), timeout=0)
+
+
+@pytest.mark.parametrize("backpressure_policy", ["drop_oldest", "drop_newest"])
+def test_in_flight_create_messages_tracker__create_message_dropped_from_queue__update_not_blocked(
+    backpressure_policy,
+):
+    tested = create_messages_tracker.InFlightCreateMessagesTracker()
+    queue = message_queue.MessageQueue(
+        max_size=1,
+        backpressure_policy=backpressure_policy,
+        dropped_message_callback=tested.complete,
+    )
+    first_message = _create_spans_batch("span-1")
+    second_message = _create_spans_batch("span-2")
+    for create_message in [first_message, second_message]:
+        tested.register(create_message)
+        queue.put(create_message)
+
+    dropped_span_id = "span-1" if backpressure_policy == "drop_oldest" else "span-2"
+    kept_span_id = "span-2" if backpressure_policy == "drop_oldest" else "span-1"
+
+    assert tested.wait_for_dependencies(_update_spans_batch(dropped_span_id), timeout=0)
+    assert not tested.wait_for_dependencies(
+        _update_spans_batch(kept_span_id), timeout=0
+    )
@@ -1,4 +1,10 @@
 import dataclasses
+import datetime
+import json
+
+import pytest
+
+from opik import jsonable_encoder
 from opik.message_processing.batching import sequence_splitter
 
 
@@ -75,3 +81,30 @@ def test_split_list_into_batches__multiple_large_objects():
         [ONE_MEGABYTE_OBJECT_B],
         [ONE_MEGABYTE_OBJECT_C],
     ]
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        "some-string",
+        'escaped "quotes", \\ backslashes \n and new lines',
+        "non-ascii characters: ü, ъ, 😀",
+        42,
+        4.2,
+        True,
+        False,
+        None,
+        [],
+        {},
+        [1, "a", None, [2.5, {"b": False}]],
+        {"a": {"b": [1, 2, {"c": "d"}]}, "e": (1, 2)},
+        {1: "int key", 2.5: "float key", None: "none key", True: "bool key"},
+        ONE_MEGABYTE_OBJECT_A,
+        datetime.datetime(2025, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        {"nested": [LongStr("value"), datetime.date(2025, 1, 1)]},
+    ],
+)
+def test_estimate_json_size_bytes__size_equals_to_the_size_of_encoded_json(obj):
+    expected_size = len(json.dumps(jsonable_encoder.jsonable_encoder(obj)))
+
+    assert sequence_splitter.estimate_json_size_bytes(obj) == expected_size
@@ -0,0 +1,285 @@
+import mock
+
+from opik.message_processing.batching import batchers
+from opik.message_processing import messages
+
+from ....testlib import create_span_message, update_span_message
+
+NOT_USED = None
+
+
+def _update_trace_message(trace_id, **kwargs):
+    message_kwargs = {
+        "trace_id": trace_id,
+        "project_name": "some-project",
+        "end_time": None,
+        "input": None,
+        "output": None,
+        "metadata": None,
+        "tags": None,
+        "error_info": None,
+        "thread_id": None,
+    }
+    message_kwargs.update(kwargs)
+    return messages.UpdateTraceMessage(**message_kwargs)
+
+
+def test_update_span_message_batcher__updates_of_different_spans__all_of_them_are_flushed_in_one_batch():
+    flush_callback = mock.Mock()
+    batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+
+    update_1 = update_span_message("span-1", output={"output": 1})
+    update_2 = update_span_message("span-2", output={"output": 2})
+
+    batcher.add(update_1)
+    batcher.add(update_2)
+    batcher.flush()
+
+    flush_callback.assert_called_once_with(
+        messages.UpdateSpansBatchMessage(batch=[update_1, update_2])
+    )
+    assert batcher.is_empty()
+
+
+def test_update_span_message_batcher__several_updates_of_the_same_span__coalesced_into_one_update__not_none_values_of_later_update_win():
+    flush_callback = mock.Mock()
+    message_absorbed_callback = mock.Mock()
+    batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+        message_absorbed_callback=message_absorbed_callback,
+    )
+
+    first_update = update_span_message(
+        "span-1", input={"input": "value"}, output={"output": "first"}
+    )
+    second_update = update_span_message(
+        "span-1", output={"output": "second"}, tags=["tag"]
+    )
+
+    batcher.add(first_update)
+    batcher.add(second_update)
+    batcher.flush()
+
+    flush_callback.assert_called_once_with(
+        messages.UpdateSpansBatchMessage(
+            batch=[
+                update_span_message(
+                    "span-1",
+                    input={"input": "value"},
+                    output={"output": "second"},
+                    tags=["tag"],
+                )
+            ]
+        )
+    )
+    message_absorbed_callback.assert_called_once_with(second_update, first_update)
+
+
+def test_update_span_message_batcher__several_updates_of_the_same_span__metadata_and_usage_deep_merged():
+    flush_callback = mock.Mock()
+    batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+
+    batcher.add(
+        update_span_message(
+            "span-1",
+            metadata={"a": 1, "nested": {"b": 2}},
+            usage={"prompt_tokens": 10},
+        )
+    )
+    batcher.add(
+        update_span_message(
+            "span-1",
+            metadata={"nested": {"c": 3}},
+            usage={"completion_tokens": 5},
+        )
+    )
+    batcher.flush()
+
+    flush_callback.assert_called_once_with(
+        messages.UpdateSpansBatchMessage(
+            batch=[
+                update_span_message(
+                    "span-1",
+                    metadata={"a": 1, "nested": {"b": 2, "c": 3}},
+                    usage={"prompt_tokens": 10, "completion_tokens": 5},
+                )
+            ]
+        )
+    )
+
+
+def test_update_span_message_batcher__coalesced_updates_do_not_count_towards_max_batch_size():
+    flush_callback = mock.Mock()
+    batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=2,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+
+    batcher.add(update_span_message("span-1", output={"output": 1}))
+    batcher.add(update_span_message("span-1", output={"output": 2}))
+    batcher.add(update_span_message("span-1", output={"output": 3}))
+    flush_callback.assert_not_called()
+
+    batcher.add(update_span_message("span-2", output={"output": 4}))
+    flush_callback.assert_called_once()
+    assert batcher.is_empty()
+
+
+def test_update_span_message_batcher__update_added_after_flush__not_merged_into_flushed_update():
+    flush_callback = mock.Mock()
+    batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+
+    first_update = update_span_message("span-1", output={"output": 1})
+    second_update = update_span_message("span-1", output={"output": 2})
+
+    batcher.add(first_update)
+    batcher.flush()
+    batcher.add(second_update)
+    batcher.flush()
+
+    assert flush_callback.call_args_list == [
+        mock.call(messages.UpdateSpansBatchMessage(batch=[first_update])),
+        mock.call(messages.UpdateSpansBatchMessage(batch=[second_update])),
+    ]
+    assert first_update.output == {"output": 1}
+
+
+def test_update_trace_message_batcher__several_updates_of_the_same_trace__coalesced_into_one_update():
+    flush_callback = mock.Mock()
+    batcher = batchers.UpdateTraceMessageBatcher(
+        max_batch_size=10,
+        flush_callback=flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+
+    batcher.add(_update_trace_message("trace-1", metadata={"key": "value"}))
+    batcher.add(_update_trace_message("trace-2", output={"output": 2}))
+    batcher.add(_update_trace_message("trace-1", thread_id="thread-1"))
+    batcher.flush()
+
+    flush_callback.assert_called_once_with(
+        messages.UpdateTracesBatchMessage(
+            batch=[
+                _update_trace_message(
+                    "trace-1", metadata={"key": "value"}, thread_id="thread-1"
+                ),
+                _update_trace_message("trace-2", output={"output": 2}),
+            ]
+        )
+    )
+
+
+def test_update_span_message_batcher__create_message_of_the_span_is_pending__update_merged_into_create_message__metadata_deep_merged():
+    create_flush_callback = mock.Mock()
+    update_flush_callback = mock.Mock()
+    message_absorbed_callback = mock.Mock()
+    create_batcher = batchers.CreateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=create_flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+    update_batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=update_flush_callback,
+        flush_interval_seconds=NOT_USED,
+        message_absorbed_callback=message_absorbed_callback,
+        create_message_batcher=create_batcher,
+    )
+
+    create_message = create_span_message(
+        "span-1", input={"input": "value"}, metadata={"a": {"b": 1}}
+    )
+    update_message = update_span_message(
+        "span-1",
+        output={"output": "value"},
+        metadata={"a": {"c": 2}},
+        model="some-model",
+    )
+
+    create_batcher.add(create_message)
+    update_batcher.add(update_message)
+    create_batcher.flush()
+    update_batcher.flush()
+
+    create_flush_callback.assert_called_once_with(
+        messages.CreateSpansBatchMessage(
+            batch=[
+                create_span_message(
+                    "span-1",
+                    input={"input": "value"},
+                    output={"output": "value"},
+                    metadata={"a": {"b": 1, "c": 2}},
+                    model="some-model",
+                )
+            ]
+        )
+    )
+    update_flush_callback.assert_not_called()
+    message_absorbed_callback.assert_called_once_with(update_message, create_message)
+
+
+def test_update_span_message_batcher__create_message_of_the_span_already_flushed__update_sent_separately():
+    create_flush_callback = mock.Mock()
+    update_flush_callback = mock.Mock()
+    create_batcher = batchers.CreateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=create_flush_callback,
+        flush_interval_seconds=NOT_USED,
+    )
+    update_batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=update_flush_callback,
+        flush_interval_seconds=NOT_USED,
+        create_message_batcher=create_batcher,
+    )
+
+    create_batcher.add(create_span_message("span-1"))
+    create_batcher.flush()
+    update_message = update_span_message("span-1", output={"output": "value"})
+    update_batcher.add(update_message)
+    update_batcher.flush()
+
+    update_flush_callback.assert_called_once_with(
+        messages.UpdateSpansBatchMessage(batch=[update_message])
+    )
+
+
+def test_update_span_message_batcher__flushed__batchers_to_flush_before_are_flushed_first():
+    calls = []
+    create_batcher = batchers.CreateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=lambda message: calls.append(message),
+        flush_interval_seconds=NOT_USED,
+    )
+    update_batcher = batchers.UpdateSpanMessageBatcher(
+        max_batch_size=10,
+        flush_callback=lambda message: calls.append(message),
+        flush_interval_seconds=NOT_USED,
+        batchers_to_flush_before=[create_batcher],
+    )
+
+    create_message = create_span_message("span-2")
+    update_message = update_span_message("span-1", output={"output": "value"})
+    create_batcher.add(create_message)
+    update_batcher.add(update_message)
+    update_batcher.flush()
+
+    assert calls == [
+        messages.CreateSpansBatchMessage(batch=[create_message]),
+        messages.UpdateSpansBatchMessage(batch=[update_message]),
+    ]
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import mock
+import pytest
+
+from opik import exceptions
+from opik.message_processing import (
+    async_message_processors,
+    async_streamer,
+    message_queue,
+    messages,
+)
+from opik.message_processing.batching import batch_manager_constuctors
+from opik.rest_api import client as rest_api_client
+
+from ...testlib import create_span_message, update_span_message
+
+
+class FakeMessageProcessor(async_message_processors.BaseAsyncMessageProcessor):
+    def __init__(self, delays=None):
+        self.processed = []
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._delays = delays or {}
+
+    async def process(self, message):
+        self._concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        await asyncio.sleep(self._delays.get(type(message), 0))
+        self._concurrent -= 1
+        self.processed.append(message)
+
+
+def _create_streamer(
+    message_processor,
+    use_batching=False,
+    max_concurrent_messages=4,
+    message_queue_=None,
+):
+    message_queue_ = message_queue_ or async_streamer.AsyncMessageQueue()
+    batch_manager = (
+        batch_manager_constuctors.create_batch_manager(message_queue_)
+        if use_batching
+        else None
+    )
+    return async_streamer.AsyncStreamer(
+        message_queue=message_queue_,
+        message_processor=message_processor,
+        batch_manager=batch_manager,
+        max_concurrent_messages=max_concurrent_messages,
+    )
+
+
+def test_async_streamer__messages_put__processed_concurrently_within_limit():
+    message_processor = FakeMessageProcessor(delays={messages.CreateSpanMessage: 0.01})
+    tested = _create_streamer(message_processor, max_concurrent_messages=3)
+
+    async def main():
+        for i in range(10):
+            tested.put(create_span_message(f"span-{i}"))
+        assert await tested.flush(timeout=5)
+        await tested.close(timeout=5)
+
+    asyncio.run(main())
+
+    assert len(message_processor.processed) == 10
+    assert message_processor.max_concurrent == 3
+
+
+def test_async_streamer__update_put_after_create__update_processed_after_create():
+    message_processor = FakeMessageProcessor(delays={messages.CreateSpanMessage: 0.05})
+    tested = _create_streamer(message_processor)
+
+    async def main():
+        tested.put(create_span_message("span-1"))
+        tested.put(update_span_message("span-1"))
+        await tested.close(timeout=5)
+
+    asyncio.run(main())
+
+    assert [type(message) for message in message_processor.processed] == [
+        messages.CreateSpanMessage,
+        messages.UpdateSpanMessage,
+    ]
+
+
+def test_async_streamer__batching_enabled__messages_processed_in_batch_on_flush():
+    message_processor = FakeMessageProcessor()
+    tested = _create_streamer(message_processor, use_batching=True)
+
+    async def main():
+        for i in range(5):
+            tested.put(create_span_message(f"span-{i}"))
+        await tested.flush(timeout=5)
+        await tested.close(timeout=5)
+
+    asyncio.run(main())
+
+    assert len(message_processor.processed) == 1
+    assert isinstance(message_processor.processed[0], messages.CreateSpansBatchMessage)
+    assert len(message_processor.processed[0].batch) == 5
+
+
+def test_async_streamer__messages_put_before_start_and_from_other_thread__all_processed():
+    message_processor = FakeMessageProcessor()
+    tested = _create_streamer(message_processor)
+    tested.put(create_span_message("before-start"))
+
+    async def main():
+        tested.start()
+        thread = threading.Thread(
+            target=tested.put, args=(create_span_message("other-thread"),)
+        )
+        thread.start()
+        thread.join()
+        assert await tested.flush(timeout=5)
+        await tested.close(timeout=5)
+
+    asyncio.run(main())
+
+    assert sorted(message.span_id for message in message_processor.processed) == [
+        "before-start",
+        "other-thread",
+    ]
+
+
+def test_async_streamer__queue_full__messages_spilled_to_disk_outside_event_loop_and_processed_in_order(
+    tmp_path,
+):
+    message_processor = FakeMessageProcessor(delays={messages.CreateSpanMessage: 0.01})
+    tested = _create_streamer(
+        message_processor,
+        max_concurrent_messages=1,
+        message_queue_=async_streamer.AsyncMessageQueue(
+            max_size=1, spill_directory=str(tmp_path)
+        ),
+    )
+    file_io_threads = set()
+    original_append = message_queue._SpillFile.append
+    original_read = message_queue._SpillFile.read
+
+    def append(spill_file, data):
+        file_io_threads.add(threading.get_ident())
+        return original_append(spill_file, data)
+
+    def read(spill_file):
+        file_io_threads.add(threading.get_ident())
+        return original_read(spill_file)
+
+    async def main():
+        for i in range(20):
+            tested.put(create_span_message(f"span-{i}"))
+        assert await tested.flush(timeout=5)
+        await tested.close(timeout=5)
+        return threading.get_ident()
+
+    with mock.patch.object(message_queue._SpillFile, "append", append):
+        with mock.patch.object(message_queue._SpillFile, "read", read):
+            event_loop_thread = asyncio.run(main())
+
+    assert [message.span_id for message in message_processor.processed] == [
+        f"span-{i}" for i in range(20)
+    ]
+    assert tested.get_message_queue_stats().spilled_messages > 0
+    assert len(file_io_threads) > 0
+    assert event_loop_thread not in file_io_threads
+
+
+def test_async_streamer__flush_timeout_expired__false_returned():
+    message_processor = FakeMessageProcessor(delays={messages.CreateSpanMessage: 1})
+    tested = _create_streamer(message_processor)
+
+    async def main():
+        tested.put(create_span_message("span-1"))
+        result = await tested.flush(timeout=0.05)
+        await tested.close(timeout=0)
+        return result
+
+    assert asyncio.run(main()) is False
+
+
+def test_async_streamer__used_from_another_event_loop__opik_exception_raised():
+    tested = _create_streamer(FakeMessageProcessor())
+
+    async def start():
+        tested.start()
+
+    asyncio.run(start())
+    with pytest.raises(exceptions.OpikException):
+        asyncio.run(start())
+
+
+def test_async_message_sender__create_spans_batch_message__spans_json_posted_to_batch_endpoint():
+    requests = []
+
+    async def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    async def main():
+        rest_client = rest_api_client.AsyncOpikApi(
+            base_url="http://localhost/api",
+            httpx_client=httpx.AsyncClient(
+                transport=httpx.MockTransport(handle_request)
+            ),
+        )
+        tested = async_message_processors.AsyncMessageSender(rest_client=rest_client)
+        await tested.process(
+            messages.CreateSpansBatchMessage(
+                batch=[
+                    create_span_message("span-1", input={"key": "value"}),
+                    create_span_message("span-2"),
+                ]
+            )
+        )
+
+    asyncio.run(main())
+
+    assert len(requests) == 1
+    assert requests[0].url == "http://localhost/api/v1/private/spans/batch"
+    spans = json.loads(requests[0].content)["spans"]
+    assert [span["id"] for span in spans] == ["span-1", "span-2"]
+    assert spans[0]["input"] == {"key": "value"}
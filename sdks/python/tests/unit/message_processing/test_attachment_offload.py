@@ -0,0 +1,148 @@
+import base64
+import hashlib
+
+import mock
+
+from opik.message_processing import (
+    attachment_offload,
+    attachment_store,
+    local_sink,
+    messages,
+)
+
+from .test_local_sink import _read_lines
+from ...testlib import create_span_message
+
+MIN_SIZE_BYTES = 1000
+
+
+def _create_offloader(tmp_path, **kwargs):
+    store = attachment_store.LocalFileAttachmentStore(
+        directory=str(tmp_path / "attachments")
+    )
+    return (
+        attachment_offload.AttachmentOffloader(
+            store=store, min_size_bytes=MIN_SIZE_BYTES, **kwargs
+        ),
+        store,
+    )
+
+
+def test_offload__data_url__replaced_with_reference_to_decoded_content(tmp_path):
+    tested, store = _create_offloader(tmp_path)
+    image = bytes(range(256)) * 10
+    data_url = "data:image/png;base64," + base64.b64encode(image).decode()
+    value = {
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "What is in the image?"},
+                    {"type": "image_url", "image_url": {"url": data_url}},
+                ],
+            },
+        ]
+    }
+
+    result = tested.offload(value)
+
+    content_hash = hashlib.sha256(image).hexdigest()
+    assert result["messages"][1]["content"][1]["image_url"]["url"] == {
+        "type": attachment_offload.ATTACHMENT_TYPE,
+        "mime_type": "image/png",
+        "size": len(image),
+        "sha256": content_hash,
+        "uri": store.get_uri(content_hash),
+    }
+    assert store.read(content_hash) == image
+
+    # the containers without attachments are not copied, the original is not changed
+    assert result["messages"][0] is value["messages"][0]
+    assert value["messages"][1]["content"][1]["image_url"]["url"] == data_url
+
+
+def test_offload__plain_base64_and_binary__offloaded(tmp_path):
+    tested, store = _create_offloader(tmp_path)
+    content = b"\x00\x01" * MIN_SIZE_BYTES
+
+    result = tested.offload(
+        {"encoded": base64.b64encode(content).decode(), "raw": bytearray(content)}
+    )
+
+    assert result["encoded"]["type"] == attachment_offload.ATTACHMENT_TYPE
+    assert result["encoded"]["mime_type"] == "application/octet-stream"
+    assert result["encoded"] == result["raw"]
+
+
+def test_offload__small_or_not_base64_values__returned_as_is(tmp_path):
+    tested, _ = _create_offloader(tmp_path)
+    value = {
+        "small": base64.b64encode(b"small").decode(),
+        "text": "Some long text. " * MIN_SIZE_BYTES,
+        "bad_data_url": "data:text/plain," + "a" * MIN_SIZE_BYTES,
+        "numbers": list(range(10)),
+    }
+
+    assert tested.offload(value) is value
+
+
+def test_offload__same_content_many_times__uploaded_once(tmp_path):
+    tested, store = _create_offloader(tmp_path, chunk_size_bytes=100)
+    encoded = base64.b64encode(b"x" * MIN_SIZE_BYTES).decode()
+
+    with mock.patch.object(store, "upload", wraps=store.upload) as upload:
+        first = tested.offload([encoded, encoded])
+        second = tested.offload({"again": encoded})
+
+    upload.assert_called_once()
+    assert first[0] == first[1] == second["again"]
+
+
+def test_offload__store_failed__value_kept(tmp_path):
+    tested, store = _create_offloader(tmp_path)
+    encoded = base64.b64encode(b"x" * MIN_SIZE_BYTES).decode()
+
+    with mock.patch.object(store, "upload", side_effect=IOError("disk is full")):
+        assert tested.offload({"data": encoded}) == {"data": encoded}
+
+
+def test_offload_message__create_batch__items_payloads_offloaded(tmp_path):
+    tested, _ = _create_offloader(tmp_path)
+    encoded = base64.b64encode(b"x" * MIN_SIZE_BYTES).decode()
+    message = messages.CreateSpansBatchMessage(
+        batch=[
+            create_span_message("span-1", input={"image": encoded}),
+            create_span_message("span-2", input={"text": "hello"}),
+        ]
+    )
+
+    tested.offload_message(message)
+
+    assert message.batch[0].input["image"]["type"] == attachment_offload.ATTACHMENT_TYPE
+    assert message.batch[1].input == {"text": "hello"}
+
+
+def test_local_sink_writer__attachment_offloader_set__records_contain_references(
+    tmp_path,
+):
+    offloader, store = _create_offloader(tmp_path)
+    tested = local_sink.LocalSinkWriter(
+        directory=str(tmp_path / "sink"), attachment_offloader=offloader
+    )
+    content = b"x" * MIN_SIZE_BYTES
+
+    tested.process(create_span_message("span-1", input={"image": content}))
+    tested.process(
+        create_span_message(
+            "span-2", input={"image": base64.b64encode(content).decode()}
+        )
+    )
+    tested.close()
+
+    (path,) = (tmp_path / "sink").iterdir()
+    references = [record["payload"]["input"]["image"] for record in _read_lines(path)]
+    # the binary value and the base64 string of the same content are stored once
+    assert references[0] == references[1]
+    assert references[0]["size"] == len(content)
+    assert store.read(references[0]["sha256"]) == content
@@ -0,0 +1,36 @@
+import hashlib
+
+import pytest
+
+from opik.message_processing import attachment_store
+
+
+def test_local_file_attachment_store__uploaded_in_chunks__content_stored_and_visible(
+    tmp_path,
+):
+    tested = attachment_store.LocalFileAttachmentStore(directory=str(tmp_path))
+    content = b"some binary content" * 1000
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    assert not tested.contains(content_hash)
+
+    tested.upload(content_hash, chunks=[content[:100], memoryview(content)[100:]])
+
+    assert tested.contains(content_hash)
+    assert tested.read(content_hash) == content
+    assert tested.get_uri(content_hash).startswith("file://")
+    assert tested.get_uri(content_hash).endswith(f"/{content_hash[:2]}/{content_hash}")
+
+
+def test_local_file_attachment_store__upload_failed__attachment_not_visible(tmp_path):
+    tested = attachment_store.LocalFileAttachmentStore(directory=str(tmp_path))
+
+    def failing_chunks():
+        yield b"first chunk"
+        raise IOError("connection lost")
+
+    with pytest.raises(IOError):
+        tested.upload("abcdef", chunks=failing_chunks())
+
+    assert not tested.contains("abcdef")
+    assert list((tmp_path / "ab").iterdir()) == []
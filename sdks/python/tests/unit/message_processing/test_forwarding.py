@@ -0,0 +1,166 @@
+import errno
+import os
+import socket
+import threading
+
+import mock
+import pytest
+
+from opik.message_processing import forwarding
+
+from ...testlib import create_span_message
+
+
+AUTHKEY = b"some-authkey"
+
+
+@pytest.fixture
+def address(tmp_path):
+    return str(tmp_path / "uploader.sock")
+
+
+@pytest.fixture
+def uploader_and_streamer(address):
+    message_streamer = mock.Mock()
+    received = threading.Semaphore(0)
+    message_streamer.put.side_effect = lambda message: received.release()
+
+    uploader = forwarding.MessageUploader(
+        address=address, message_streamer=message_streamer, authkey=AUTHKEY
+    )
+    uploader.start()
+    thread = threading.Thread(target=uploader.serve_forever, daemon=True)
+    thread.start()
+
+    yield uploader, message_streamer, received
+
+    uploader.close()
+    thread.join(timeout=5)
+
+
+def test_message_forwarder__messages_forwarded__uploader_puts_them_to_streamer_in_order(
+    address, uploader_and_streamer
+):
+    _, message_streamer, received = uploader_and_streamer
+    tested = forwarding.MessageForwarder(address=address, authkey=AUTHKEY)
+
+    for i in range(3):
+        tested.process(create_span_message(f"span-{i}", input={"key": i}))
+    for _ in range(3):
+        assert received.acquire(timeout=5)
+    tested.close()
+
+    put_messages = [call.args[0] for call in message_streamer.put.call_args_list]
+    assert [message.span_id for message in put_messages] == [
+        "span-0",
+        "span-1",
+        "span-2",
+    ]
+    assert put_messages[1].input == {"key": 1}
+
+
+def test_message_forwarder__uploader_not_running__error_logged_not_raised(address):
+    tested = forwarding.MessageForwarder(address=address, authkey=AUTHKEY)
+
+    with mock.patch.object(forwarding.LOGGER, "error") as logger_error:
+        tested.process(create_span_message("span-1"))
+
+    logger_error.assert_called_once()
+
+
+def test_message_forwarder__uploader_restarted__message_sent_over_new_connection(
+    address, uploader_and_streamer
+):
+    uploader, _, received = uploader_and_streamer
+    tested = forwarding.MessageForwarder(address=address, authkey=AUTHKEY)
+    tested.process(create_span_message("span-1"))
+    assert received.acquire(timeout=5)
+
+    # the connection of the forwarder is broken on the uploader side
+    tested._connection.close()
+    tested._connection = _BrokenConnection()
+    tested.process(create_span_message("span-2"))
+
+    assert received.acquire(timeout=5)
+
+
+class _BrokenConnection:
+    def send_bytes(self, data):
+        raise BrokenPipeError
+
+    def close(self):
+        pass
+
+
+def test_message_forwarder__wrong_authkey__message_rejected_and_error_logged(
+    address, uploader_and_streamer
+):
+    _, message_streamer, received = uploader_and_streamer
+    tested = forwarding.MessageForwarder(address=address, authkey=b"wrong-authkey")
+
+    with mock.patch.object(forwarding.LOGGER, "error") as logger_error:
+        tested.process(create_span_message("span-1"))
+
+    logger_error.assert_called_once()
+    assert not received.acquire(timeout=0.1)
+    message_streamer.put.assert_not_called()
+
+
+def test_message_uploader__another_uploader_listening__address_in_use_error_raised(
+    address, uploader_and_streamer
+):
+    tested = forwarding.MessageUploader(
+        address=address, message_streamer=mock.Mock(), authkey=AUTHKEY
+    )
+
+    with pytest.raises(OSError) as exc_info:
+        tested.start()
+
+    assert exc_info.value.errno == errno.EADDRINUSE
+    assert os.path.exists(address)
+
+
+def test_message_uploader__socket_left_by_stopped_uploader__socket_replaced(address):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+        stale_socket.bind(address)
+    message_streamer = mock.Mock()
+    received = threading.Semaphore(0)
+    message_streamer.put.side_effect = lambda message: received.release()
+
+    uploader = forwarding.MessageUploader(
+        address=address, message_streamer=message_streamer, authkey=AUTHKEY
+    )
+    uploader.start()
+    thread = threading.Thread(target=uploader.serve_forever, daemon=True)
+    thread.start()
+    try:
+        forwarding.MessageForwarder(address=address, authkey=AUTHKEY).process(
+            create_span_message("span-1")
+        )
+        assert received.acquire(timeout=5)
+    finally:
+        uploader.close()
+        thread.join(timeout=5)
+
+
+def test_get_authkey__not_configured__same_random_key_stored_and_reused(tmp_path):
+    authkey_file_path = str(tmp_path / "authkey")
+
+    first = forwarding.get_authkey(None, authkey_file_path=authkey_file_path)
+    second = forwarding.get_authkey(None, authkey_file_path=authkey_file_path)
+
+    assert len(first) == 32
+    assert first == second
+    assert os.stat(authkey_file_path).st_mode & 0o777 == 0o600
+    assert os.listdir(tmp_path) == ["authkey"]
+
+
+def test_get_authkey__configured__configured_key_used(tmp_path):
+    authkey_file_path = str(tmp_path / "authkey")
+
+    authkey = forwarding.get_authkey(
+        "configured-key", authkey_file_path=authkey_file_path
+    )
+
+    assert authkey == b"configured-key"
+    assert not os.path.exists(authkey_file_path)
@@ -1,13 +1,20 @@
+import base64
 import dataclasses
 from datetime import date, datetime, timezone
+from enum import Enum
+from pathlib import PurePosixPath
 from threading import Lock
 from typing import Any, Optional
 
 import numpy as np
+import pandas as pd
+import pydantic
 import pytest
 
 import opik.jsonable_encoder as jsonable_encoder
 
+from ...testlib import patch_environ
+
 
 @dataclasses.dataclass
 class Node:
@@ -158,7 +165,170 @@ def test_jsonable_encoder__non_serializable_lock_inside_dataclass__lock_converte
     assert encoded["b"].startswith("<unlocked _thread.lock object at 0x")
 
 
-def test_jsonable_encoder__non_serializable_to_text__bytes():
-    data = b"deadbeef"
+@pytest.mark.parametrize(
+    "data", [b"deadbeef", bytearray(b"deadbeef"), memoryview(b"deadbeef")]
+)
+def test_jsonable_encoder__small_binary_data__size_and_whole_data_in_base64(data):
+    assert jsonable_encoder.jsonable_encoder(data) == {
+        "type": type(data).__name__,
+        "size": 8,
+        "base64_prefix": "ZGVhZGJlZWY=",
+    }
+
+
+def test_jsonable_encoder__big_binary_data__size_and_base64_prefix():
+    data = bytes(range(256)) * 1000
+
+    encoded = jsonable_encoder.jsonable_encoder({"image": data})
+
+    assert encoded["image"]["size"] == 256000
+    assert base64.b64decode(encoded["image"]["base64_prefix"]) == data[:96]
+
+
+def test_jsonable_encoder__cyclic_list_and_dict__cycle_replaced_with_marker():
+    data: Any = {"items": [1]}
+    data["items"].append(data)
+
+    encoded = jsonable_encoder.jsonable_encoder(data)
+
+    assert encoded["items"][0] == 1
+    assert encoded["items"][1].startswith("<Cyclic reference to dict id=")
+
+
+def test_jsonable_encoder__deeply_nested_lists__no_recursion_error():
+    data: list = []
+    current = data
+    for _ in range(10000):
+        nested: list = []
+        current.append(nested)
+        current = nested
+
+    encoded = jsonable_encoder.jsonable_encoder(data)
+
+    depth = 0
+    while encoded:
+        encoded = encoded[0]
+        depth += 1
+    assert depth == 10000
+
+
+def test_jsonable_encoder__enums_and_paths__values_encoded():
+    class Color(str, Enum):
+        RED = "red"
+
+    class Point(Enum):
+        ORIGIN = (0, 0)
+
+    encoded = jsonable_encoder.jsonable_encoder(
+        {Color.RED: [Point.ORIGIN, PurePosixPath("/tmp/file")]}
+    )
+
+    assert encoded == {"red": [[0, 0], "/tmp/file"]}
+
+
+def test_jsonable_encoder__pydantic_model__fields_encoded():
+    class Model(pydantic.BaseModel):
+        name: str
+        children: list
+
+    encoded = jsonable_encoder.jsonable_encoder(
+        Model(name="parent", children=[Model(name="child", children=[])])
+    )
+
+    assert encoded == {
+        "name": "parent",
+        "children": [{"name": "child", "children": []}],
+    }
+
+
+def test_register_encoder_extension__type_encoded_before_registration__extension_used():
+    class Custom:
+        def __str__(self) -> str:
+            return "custom"
+
+    assert jsonable_encoder.jsonable_encoder([Custom()]) == ["custom"]
+
+    def encoder(obj: Custom) -> Any:
+        return {"encoded": True}
+
+    jsonable_encoder.register_encoder_extension(obj_type=Custom, encoder=encoder)
+    try:
+        assert jsonable_encoder.jsonable_encoder([Custom()]) == [{"encoded": True}]
+    finally:
+        jsonable_encoder._ENCODER_EXTENSIONS.discard((Custom, encoder))
+        jsonable_encoder._clear_encodings_cache()
+
+
+@pytest.fixture
+def encoded_field_max_bytes_1kb():
+    jsonable_encoder._get_encoded_field_max_bytes.cache_clear()
+    with patch_environ({"OPIK_ENCODED_FIELD_MAX_BYTES": "1024"}):
+        yield
+    jsonable_encoder._get_encoded_field_max_bytes.cache_clear()
+
+
+def test_jsonable_encoder__numpy_scalars__converted_to_python_values():
+    assert jsonable_encoder.jsonable_encoder(
+        [np.int64(1), np.float32(0.5), np.bool_(True), np.str_("a")]
+    ) == [1, 0.5, True, "a"]
+
+
+def test_jsonable_encoder__numpy_array_bigger_than_limit__summary_with_head(
+    encoded_field_max_bytes_1kb,
+):
+    array = np.arange(10000, dtype=np.float64).reshape(100, 100)[:, ::2]
+
+    encoded = jsonable_encoder.jsonable_encoder(array)
+
+    assert encoded == {
+        "type": "numpy.ndarray",
+        "dtype": "float64",
+        "shape": [100, 50],
+        "head": [float(i) for i in range(0, 84, 2)],
+    }
+
+
+def test_jsonable_encoder__small_pandas_objects__all_rows_included():
+    data_frame = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    encoded = jsonable_encoder.jsonable_encoder(
+        {"frame": data_frame, "series": data_frame["a"]}
+    )
+
+    assert encoded["frame"] == {
+        "type": "pandas.DataFrame",
+        "shape": [2, 2],
+        "columns": {"a": "int64", "b": str(data_frame.dtypes["b"])},
+        "head": [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}],
+    }
+    assert encoded["series"] == {
+        "type": "pandas.Series",
+        "name": "a",
+        "dtype": "int64",
+        "length": 2,
+        "head": [1, 2],
+    }
+
+
+def test_jsonable_encoder__pandas_data_frame_bigger_than_limit__first_rows_included(
+    encoded_field_max_bytes_1kb,
+):
+    data_frame = pd.DataFrame({"a": range(1000), "b": range(1000)})
+
+    encoded = jsonable_encoder.jsonable_encoder(data_frame)
+
+    assert encoded["shape"] == [1000, 2]
+    assert encoded["head"] == [{"a": i, "b": i} for i in range(5)]
+
+
+def test_jsonable_encoder__pil_image__image_description():
+    image_module = pytest.importorskip("PIL.Image")
+
+    encoded = jsonable_encoder.jsonable_encoder(image_module.new("RGB", (64, 32)))
 
-    assert str(data) == jsonable_encoder.jsonable_encoder(data)
+    assert encoded == {
+        "type": "PIL.Image",
+        "mode": "RGB",
+        "size": [64, 32],
+        "format": None,
+    }
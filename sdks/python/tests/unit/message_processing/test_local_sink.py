@@ -0,0 +1,248 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from opik.message_processing import local_sink, messages
+from opik.rest_api import client as rest_api_client
+
+from ...testlib import create_span_message, update_span_message
+
+
+def _read_lines(path):
+    with gzip.open(path, "rb") as file:
+        return [json.loads(line) for line in file]
+
+
+def _partial_files(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(local_sink.PARTIAL_FILE_SUFFIX)
+    )
+
+
+def _rest_client(handle_request):
+    return rest_api_client.OpikApi(
+        base_url="http://localhost/api",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handle_request)),
+    )
+
+
+def _completed_files(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(local_sink.FILE_SUFFIX)
+    )
+
+
+def test_local_sink_writer__messages_written__records_in_rest_payload_format(
+    tmp_path,
+):
+    tested = local_sink.LocalSinkWriter(directory=str(tmp_path))
+
+    tested.process(
+        messages.CreateSpansBatchMessage(
+            batch=[create_span_message("span-1"), create_span_message("span-2")]
+        )
+    )
+    tested.process(
+        messages.AddSpanFeedbackScoresBatchMessage(
+            batch=[
+                messages.FeedbackScoreMessage(
+                    id="span-1",
+                    project_name="some-project",
+                    name="accuracy",
+                    value=0.5,
+                    source="sdk",
+                )
+            ]
+        )
+    )
+    tested.process(update_span_message("span-1", output={"answer": 42}))
+
+    assert os.listdir(tmp_path)[0].endswith(local_sink.PARTIAL_FILE_SUFFIX)
+    tested.close()
+
+    [path] = _completed_files(str(tmp_path))
+    records = _read_lines(path)
+
+    assert [record["type"] for record in records] == [
+        local_sink.CREATE_SPAN,
+        local_sink.CREATE_SPAN,
+        local_sink.SPAN_FEEDBACK_SCORE,
+        local_sink.UPDATE_SPAN,
+    ]
+    assert records[0]["payload"]["id"] == "span-1"
+    assert records[0]["payload"]["start_time"] == "2025-01-01T00:00:00Z"
+    assert "output" not in records[0]["payload"]
+    assert records[2]["payload"]["name"] == "accuracy"
+    assert records[3]["payload"]["output"] == {"answer": 42}
+
+
+def test_local_sink_writer__file_size_limit_reached__file_rotated(tmp_path):
+    tested = local_sink.LocalSinkWriter(directory=str(tmp_path), max_file_size_bytes=1)
+
+    for i in range(3):
+        tested.process(create_span_message(f"span-{i}"))
+    tested.close()
+
+    paths = _completed_files(str(tmp_path))
+    assert len(paths) == 3
+    assert len(os.listdir(tmp_path)) == 3
+    assert [_read_lines(path)[0]["payload"]["id"] for path in paths] == [
+        "span-0",
+        "span-1",
+        "span-2",
+    ]
+
+
+def test_upload_directory__creates_sent_to_batch_endpoint_before_update(tmp_path):
+    writer = local_sink.LocalSinkWriter(directory=str(tmp_path))
+    writer.process(create_span_message("span-1"))
+    writer.process(create_span_message("span-2"))
+    writer.process(update_span_message("span-1", output={"answer": 42}))
+    writer.close()
+    # the file of another process which is still being written
+    (
+        tmp_path / f"other{local_sink.FILE_SUFFIX}{local_sink.PARTIAL_FILE_SUFFIX}"
+    ).touch()
+
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path, json.loads(request.content)))
+        return httpx.Response(204)
+
+    rest_client = rest_api_client.OpikApi(
+        base_url="http://localhost/api",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handle_request)),
+    )
+
+    stats = local_sink.upload_directory(
+        rest_client=rest_client, directory=str(tmp_path), delete_uploaded=True
+    )
+
+    assert stats == local_sink.UploadStats(
+        uploaded_files=1, uploaded_records=3, failed_files=0, incomplete_files=1
+    )
+    assert [(method, path) for method, path, _ in requests] == [
+        ("POST", "/api/v1/private/spans/batch"),
+        ("PATCH", "/api/v1/private/spans/span-1"),
+    ]
+    assert [span["id"] for span in requests[0][2]["spans"]] == ["span-1", "span-2"]
+    assert requests[1][2]["output"] == {"answer": 42}
+    assert _completed_files(str(tmp_path)) == []
+
+
+def test_upload_directory__request_failed__upload_stopped_and_files_kept(tmp_path):
+    writer = local_sink.LocalSinkWriter(directory=str(tmp_path), max_file_size_bytes=1)
+    writer.process(create_span_message("span-1"))
+    writer.process(update_span_message("span-1", output={"answer": 42}))
+    writer.close()
+
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(400)
+
+    stats = local_sink.upload_directory(
+        rest_client=_rest_client(handle_request),
+        directory=str(tmp_path),
+        delete_uploaded=True,
+    )
+
+    assert stats.failed_files == 1
+    assert stats.uploaded_files == 0
+    # the update from the second file is not sent before the create it applies to
+    assert len(requests) == 1
+    assert len(_completed_files(str(tmp_path))) == 2
+
+
+def test_local_sink_writer__flushed__records_readable_before_file_completed(
+    tmp_path,
+):
+    tested = local_sink.LocalSinkWriter(directory=str(tmp_path))
+    try:
+        tested.process(create_span_message("span-1"))
+        tested.flush()
+        tested.process(create_span_message("span-2"))
+        tested.flush()
+
+        [path] = _partial_files(str(tmp_path))
+        assert [record["payload"]["id"] for record in _read_lines(path)] == [
+            "span-1",
+            "span-2",
+        ]
+    finally:
+        tested.close()
+
+    [path] = _completed_files(str(tmp_path))
+    assert [record["payload"]["id"] for record in _read_lines(path)] == [
+        "span-1",
+        "span-2",
+    ]
+
+
+def test_local_sink_writer__flush_interval_passed__records_flushed_periodically(
+    tmp_path,
+):
+    tested = local_sink.LocalSinkWriter(
+        directory=str(tmp_path), flush_interval_seconds=0.05
+    )
+    try:
+        tested.process(create_span_message("span-1"))
+        time.sleep(0.3)
+
+        [path] = _partial_files(str(tmp_path))
+        assert [record["payload"]["id"] for record in _read_lines(path)] == ["span-1"]
+    finally:
+        tested.close()
+
+
+def test_upload_directory__writer_process_not_running__incomplete_file_recovered_and_uploaded(
+    tmp_path,
+):
+    finished_process = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished_process.wait()
+
+    writer = local_sink.LocalSinkWriter(directory=str(tmp_path))
+    writer.process(create_span_message("span-1"))
+    writer.flush()
+    [running_writer_path] = _partial_files(str(tmp_path))
+    # the same file as if it was left by the process which crashed
+    crashed_writer_path = running_writer_path.replace(
+        f"-{os.getpid()}-", f"-{finished_process.pid}-"
+    )
+    with open(running_writer_path, "rb") as source, open(
+        crashed_writer_path, "wb"
+    ) as target:
+        target.write(source.read())
+
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(204)
+
+    try:
+        stats = local_sink.upload_directory(
+            rest_client=_rest_client(handle_request), directory=str(tmp_path)
+        )
+    finally:
+        writer.close()
+
+    assert stats == local_sink.UploadStats(
+        uploaded_files=1,
+        uploaded_records=1,
+        failed_files=0,
+        incomplete_files=1,
+        recovered_files=1,
+    )
+    assert [span["id"] for span in requests[0]["spans"]] == ["span-1"]
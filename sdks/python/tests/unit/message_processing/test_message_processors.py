@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+
+import httpx
+import mock
+import pytest
+
+from opik.message_processing import (
+    attachment_offload,
+    attachment_store,
+    message_processors,
+    messages,
+)
+from opik.rest_api import client as rest_api_client
+from opik.rest_api import core as rest_api_core
+
+from ...testlib import create_span_message
+
+
+def _create_message_sender(handle_request, max_in_flight_batch_requests=1):
+    rest_client = rest_api_client.OpikApi(
+        base_url="http://localhost/api",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handle_request)),
+    )
+    return message_processors.MessageSender(
+        rest_client=rest_client,
+        max_in_flight_batch_requests=max_in_flight_batch_requests,
+    )
+
+
+def test_message_sender__create_spans_batch_message__spans_json_posted_to_batch_endpoint():
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    tested = _create_message_sender(handle_request)
+    tested.process(
+        messages.CreateSpansBatchMessage(
+            batch=[
+                create_span_message("span-1", input={"key": "value"}),
+                create_span_message("span-2"),
+            ]
+        )
+    )
+
+    assert len(requests) == 1
+    assert requests[0].method == "POST"
+    assert requests[0].url == "http://localhost/api/v1/private/spans/batch"
+    assert requests[0].headers["content-type"] == "application/json"
+
+    spans = json.loads(requests[0].content)["spans"]
+    assert [span["id"] for span in spans] == ["span-1", "span-2"]
+    assert spans[0]["input"] == {"key": "value"}
+    assert spans[0]["start_time"] == "2025-01-01T00:00:00Z"
+    assert "input" not in spans[1]
+
+
+def test_message_sender__create_spans_batch_message_bigger_than_memory_limit__split_into_several_requests():
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    tested = _create_message_sender(handle_request)
+    one_megabyte_input = {"key": "a" * 1024 * 1024}
+    with mock.patch.object(message_processors, "BATCH_MEMORY_LIMIT_MB", 2.5):
+        tested.process(
+            messages.CreateSpansBatchMessage(
+                batch=[
+                    create_span_message(f"span-{i}", input=one_megabyte_input)
+                    for i in range(3)
+                ]
+            )
+        )
+
+    assert [len(json.loads(request.content)["spans"]) for request in requests] == [
+        2,
+        1,
+    ]
+
+
+def test_message_sender__create_traces_batch_message_rejected__api_error_reported():
+    tested = _create_message_sender(
+        lambda request: httpx.Response(400, json={"errors": ["bad request"]})
+    )
+    message = messages.CreateTraceBatchMessage(batch=[mock.Mock()])
+    message.batch[0].as_payload_dict.return_value = {"id": "trace-1"}
+
+    with mock.patch.object(message_processors, "LOGGER") as logger:
+        tested.process(message)
+
+    logger.error.assert_called_once()
+    assert "400" in str(logger.error.call_args)
+
+
+@pytest.mark.parametrize("status_code", [200, 201, 204])
+def test_message_sender__post_request_body__success_status__no_error(status_code):
+    tested = _create_message_sender(lambda request: httpx.Response(status_code))
+
+    tested._post_request_body(
+        path=message_processors.CREATE_TRACES_BATCH_PATH, body=b'{"traces":[]}'
+    )
+
+
+def test_message_sender__post_request_body__error_status__api_error_raised():
+    tested = _create_message_sender(lambda request: httpx.Response(500, text="oops"))
+
+    with pytest.raises(rest_api_core.ApiError) as exc_info:
+        tested._post_request_body(
+            path=message_processors.CREATE_TRACES_BATCH_PATH, body=b'{"traces":[]}'
+        )
+
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.body == "oops"
+
+
+def test_message_sender__create_spans_batch_message_split_into_several_requests__requests_sent_concurrently_within_limit():
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+    sent_spans = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.2)
+        with lock:
+            in_flight[0] -= 1
+            sent_spans.extend(json.loads(request.content)["spans"])
+        return httpx.Response(204)
+
+    tested = _create_message_sender(handle_request, max_in_flight_batch_requests=2)
+    one_megabyte_input = {"key": "a" * 1024 * 1024}
+    with mock.patch.object(message_processors, "BATCH_MEMORY_LIMIT_MB", 1.5):
+        tested.process(
+            messages.CreateSpansBatchMessage(
+                batch=[
+                    create_span_message(f"span-{i}", input=one_megabyte_input)
+                    for i in range(6)
+                ]
+            )
+        )
+
+    assert max_in_flight[0] == 2
+    assert sorted(span["id"] for span in sent_spans) == [f"span-{i}" for i in range(6)]
+
+
+def test_message_sender__one_of_concurrent_requests_failed__other_parts_sent__error_reported():
+    sent_spans = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        spans = json.loads(request.content)["spans"]
+        if spans[0]["id"] == "span-1":
+            return httpx.Response(400, json={"errors": ["bad request"]})
+
+        sent_spans.extend(spans)
+        return httpx.Response(204)
+
+    tested = _create_message_sender(handle_request, max_in_flight_batch_requests=2)
+    one_megabyte_input = {"key": "a" * 1024 * 1024}
+    with mock.patch.object(
+        message_processors, "BATCH_MEMORY_LIMIT_MB", 1.5
+    ), mock.patch.object(message_processors, "LOGGER") as logger:
+        tested.process(
+            messages.CreateSpansBatchMessage(
+                batch=[
+                    create_span_message(f"span-{i}", input=one_megabyte_input)
+                    for i in range(3)
+                ]
+            )
+        )
+
+    assert sorted(span["id"] for span in sent_spans) == ["span-0", "span-2"]
+    logger.error.assert_called_once()
+
+
+def test_message_sender__attachment_offloader_set__references_sent_instead_of_data(
+    tmp_path,
+):
+    requests = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    rest_client = rest_api_client.OpikApi(
+        base_url="http://localhost/api",
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handle_request)),
+    )
+    tested = message_processors.MessageSender(
+        rest_client=rest_client,
+        attachment_offloader=attachment_offload.AttachmentOffloader(
+            store=attachment_store.LocalFileAttachmentStore(str(tmp_path)),
+            min_size_bytes=1000,
+        ),
+    )
+    tested.process(
+        messages.CreateSpansBatchMessage(
+            batch=[create_span_message("span-1", input={"data": b"x" * 1000})]
+        )
+    )
+
+    (span,) = json.loads(requests[0].content)["spans"]
+    assert span["input"]["data"]["type"] == attachment_offload.ATTACHMENT_TYPE
+    assert span["input"]["data"]["size"] == 1000
@@ -0,0 +1,178 @@
+import queue
+import threading
+
+import mock
+import pytest
+
+from opik.message_processing import message_queue
+
+from ...testlib import create_span_message
+
+
+def test_message_queue__no_limits__all_messages_are_accepted():
+    tested = message_queue.MessageQueue()
+
+    for i in range(100):
+        tested.put(i)
+
+    assert [tested.get() for _ in range(100)] == list(range(100))
+    assert tested.get_stats().dropped_messages == 0
+
+
+def test_message_queue__drop_newest__new_messages_are_discarded_when_full():
+    tested = message_queue.MessageQueue(max_size=2, backpressure_policy="drop_newest")
+
+    for i in range(5):
+        tested.put(i)
+
+    assert [tested.get(), tested.get()] == [0, 1]
+    assert tested.empty()
+    assert tested.get_stats().dropped_messages == 3
+
+
+def test_message_queue__drop_oldest__oldest_messages_are_discarded_when_full():
+    tested = message_queue.MessageQueue(max_size=2, backpressure_policy="drop_oldest")
+
+    for i in range(5):
+        tested.put(i)
+
+    assert [tested.get(), tested.get()] == [3, 4]
+    assert tested.empty()
+    assert tested.get_stats().dropped_messages == 3
+
+
+def test_message_queue__max_size_bytes__size_of_messages_is_limited():
+    tested = message_queue.MessageQueue(
+        max_size_bytes=1500, backpressure_policy="drop_newest"
+    )
+
+    tested.put(create_span_message("span-1", input={"text": "a" * 1000}))
+    tested.put(create_span_message("span-2", input={"text": "a" * 1000}))
+
+    assert tested.qsize() == 1
+    assert tested.get().span_id == "span-1"
+    assert tested.get_stats().dropped_messages == 1
+    assert tested.get_stats().size_bytes == 0
+
+
+def test_message_queue__block__caller_waits_until_there_is_free_space():
+    tested = message_queue.MessageQueue(max_size=1, backpressure_policy="block")
+    tested.put(0)
+
+    with pytest.raises(queue.Full):
+        tested.put(1, timeout=0.05)
+
+    threading.Timer(0.05, tested.get).start()
+    tested.put(1, timeout=1)
+
+    assert tested.get() == 1
+    assert tested.get_stats().dropped_messages == 0
+
+
+def test_message_queue__spill_to_disk__messages_are_restored_in_fifo_order(tmp_path):
+    tested = message_queue.MessageQueue(
+        max_size=2,
+        backpressure_policy="spill_to_disk",
+        spill_directory=str(tmp_path),
+    )
+    span_messages = [create_span_message(f"span-{i}") for i in range(5)]
+
+    for span_message in span_messages:
+        tested.put(span_message)
+
+    assert tested.qsize() == 5
+    assert tested.get_stats().spilled_messages == 3
+    assert [tested.get() for _ in range(5)] == span_messages
+    assert tested.empty()
+
+
+def test_message_queue__sentinel__never_dropped():
+    tested = message_queue.MessageQueue(max_size=1, backpressure_policy="drop_newest")
+    tested.put(0)
+    tested.put(None)
+
+    assert [tested.get(), tested.get()] == [0, None]
+
+
+def test_message_queue__sentinel_put_after_messages_spilled__sentinel_taken_after_them(
+    tmp_path,
+):
+    tested = message_queue.MessageQueue(
+        max_size=2,
+        backpressure_policy="spill_to_disk",
+        spill_directory=str(tmp_path),
+    )
+    span_messages = [create_span_message(f"span-{i}") for i in range(4)]
+
+    for span_message in span_messages:
+        tested.put(span_message)
+    tested.put(None)
+
+    assert [tested.get() for _ in range(5)] == span_messages + [None]
+    assert tested.empty()
+
+
+def test_message_queue__wait_for_processed__messages_put_later_are_not_waited_for():
+    tested = message_queue.MessageQueue()
+    tested.put("message-1")
+    barrier = tested.next_sequence_number()
+    tested.put("message-2")
+
+    assert tested.wait_for_processed(barrier, timeout=0.01) is False
+
+    assert tested.get() == "message-1"
+    assert tested.wait_for_processed(barrier, timeout=0.01) is False
+
+    tested.task_done()
+    assert tested.wait_for_processed(barrier, timeout=0.01) is True
+    assert tested.wait_for_processed(tested.next_sequence_number(), 0.01) is False
+
+
+def test_message_queue__wait_for_processed__messages_processed_out_of_order__waits_for_all_earlier():
+    tested = message_queue.MessageQueue()
+    tested.put("message-1")
+    tested.put("message-2")
+    barrier = tested.next_sequence_number()
+
+    first_sequence_number, _ = tested.get_with_sequence_number()
+    second_sequence_number, _ = tested.get_with_sequence_number()
+    tested.task_done(second_sequence_number)
+    assert tested.wait_for_processed(barrier, timeout=0.01) is False
+
+    tested.task_done(first_sequence_number)
+    assert tested.wait_for_processed(barrier, timeout=0.01) is True
+
+
+def test_message_queue__wait_for_processed__waiting_messages_dropped__wait_finished():
+    tested = message_queue.MessageQueue(max_size=1, backpressure_policy="drop_oldest")
+    tested.put("message-1")
+    barrier = tested.next_sequence_number()
+
+    waiter_result = []
+    waiter = threading.Thread(
+        target=lambda: waiter_result.append(tested.wait_for_processed(barrier, 5))
+    )
+    waiter.start()
+    tested.put("message-2")
+    waiter.join(timeout=5)
+
+    assert waiter_result == [True]
+
+
+def test_message_queue__messages_dropped__warning_logged_once_per_interval():
+    tested = message_queue.MessageQueue(max_size=1, backpressure_policy="drop_newest")
+    tested.put(0)
+
+    with mock.patch.object(message_queue, "LOGGER") as logger, mock.patch.object(
+        message_queue.time, "monotonic", return_value=100.0
+    ) as monotonic:
+        for i in range(5):
+            tested.put(i)
+        assert logger.warning.call_count == 1
+
+        monotonic.return_value = 100.0 + message_queue._DROP_WARNING_INTERVAL_SECONDS
+        tested.put(5)
+
+    assert logger.warning.call_count == 2
+    # the number of messages dropped since the previous warning and the total
+    assert logger.warning.call_args[0][1:] == (5, 6)
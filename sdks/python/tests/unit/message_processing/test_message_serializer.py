@@ -0,0 +1,48 @@
+import datetime
+
+from opik.message_processing import message_serializer, messages
+
+
+class NonSerializableObject:
+    def __str__(self):
+        return "non-serializable-object"
+
+
+def test_message_serializer__batch_message__restored_with_nested_messages():
+    feedback_score = messages.FeedbackScoreMessage(
+        id="some-span-id",
+        project_name="some-project",
+        name="some-metric",
+        value=0.5,
+        source="sdk",
+    )
+    message = messages.AddSpanFeedbackScoresBatchMessage(batch=[feedback_score])
+
+    restored = message_serializer.deserialize(message_serializer.serialize(message))
+
+    assert restored == message
+
+
+def test_message_serializer__datetime_and_non_serializable_values__restored_in_jsonable_form():
+    start_time = datetime.datetime(2025, 1, 1, 10, 30, tzinfo=datetime.timezone.utc)
+    message = messages.CreateTraceMessage(
+        trace_id="some-trace-id",
+        project_name="some-project",
+        name="some-name",
+        start_time=start_time,
+        end_time=None,
+        input={"object": NonSerializableObject()},
+        output={"result": 42},
+        metadata=None,
+        tags=["tag"],
+        error_info=None,
+        thread_id=None,
+    )
+
+    restored = message_serializer.deserialize(message_serializer.serialize(message))
+
+    assert isinstance(restored, messages.CreateTraceMessage)
+    assert restored.start_time == start_time
+    assert restored.input == {"object": "non-serializable-object"}
+    assert restored.output == {"result": 42}
+    assert restored.tags == ["tag"]
@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 import mock
 from opik.message_processing import streamer_constructors
@@ -151,3 +154,94 @@ def test_streamer__trace__batching_enabled__messages_that_support_batching_are_p
         )
     finally:
         tested.close(timeout=1)
+
+
+def test_streamer__flush__returns_when_messages_put_before_are_processed():
+    processing_started = threading.Event()
+    processing_allowed = threading.Event()
+    processed = []
+
+    def process(message):
+        processing_started.set()
+        processing_allowed.wait(timeout=5)
+        processed.append(message)
+
+    mock_message_processor = mock.Mock()
+    mock_message_processor.process.side_effect = process
+    tested = streamer_constructors.construct_streamer(
+        message_processor=mock_message_processor,
+        n_consumers=1,
+        use_batching=False,
+    )
+    try:
+        tested.put("message-1")
+        assert processing_started.wait(timeout=5)
+
+        # message is taken from the queue, but is not processed yet
+        threading.Timer(0.2, processing_allowed.set).start()
+        tested.flush(timeout=5)
+
+        assert processed == ["message-1"]
+    finally:
+        tested.close(timeout=1)
+
+
+def test_streamer__put_blocked_by_full_queue__close_not_blocked_and_accepted_messages_sent():
+    processing_allowed = threading.Event()
+    processed = []
+
+    def process(message):
+        processing_allowed.wait(timeout=5)
+        processed.append(message)
+
+    mock_message_processor = mock.Mock()
+    mock_message_processor.process.side_effect = process
+    tested = streamer_constructors.construct_streamer(
+        message_processor=mock_message_processor,
+        n_consumers=1,
+        use_batching=False,
+        max_queue_size=1,
+        backpressure_policy="block",
+    )
+
+    tested.put("message-1")  # taken by the consumer
+    tested.put("message-2")  # fills the queue
+    blocked_put = threading.Thread(target=tested.put, args=("message-3",))
+    blocked_put.start()
+    time.sleep(0.1)  # waits for the free space in the queue
+
+    close_thread = threading.Thread(target=tested.close, args=(5,))
+    close_thread.start()
+    time.sleep(0.1)  # waits for the blocked put to complete
+
+    # the streamer is draining, the new message is rejected right away
+    rejected_put = threading.Thread(target=tested.put, args=("message-4",))
+    rejected_put.start()
+    rejected_put.join(timeout=1)
+    assert not rejected_put.is_alive()
+    assert blocked_put.is_alive()
+
+    processing_allowed.set()
+    close_thread.join(timeout=5)
+    blocked_put.join(timeout=5)
+
+    assert not close_thread.is_alive()
+    assert processed == ["message-1", "message-2", "message-3"]
+
+
+def test_streamer__closed_concurrently__closed_only_once():
+    message_processor = mock.Mock()
+    tested = streamer_constructors.construct_streamer(
+        message_processor=message_processor,
+        n_consumers=1,
+        use_batching=False,
+    )
+    message_processor.close.side_effect = lambda: time.sleep(0.1)
+
+    close_threads = [threading.Thread(target=tested.close, args=(1,)) for _ in range(5)]
+    for thread in close_threads:
+        thread.start()
+    for thread in close_threads:
+        thread.join(timeout=5)
+
+    message_processor.close.assert_called_once()
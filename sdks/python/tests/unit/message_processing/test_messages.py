@@ -0,0 +1,28 @@
+from opik.message_processing import messages
+
+from ...testlib import create_span_message
+
+
+def test_create_span_message__slotted__no_instance_dict():
+    message = create_span_message("span-id")
+
+    assert not hasattr(message, "__dict__")
+
+
+def test_as_payload_dict__slotted_message__all_fields_returned():
+    payload = create_span_message(
+        "span-id", input={"x": 1}, tags=["tag"]
+    ).as_payload_dict()
+
+    assert payload["id"] == "span-id"
+    assert payload["input"] == {"x": 1}
+    assert payload["tags"] == ["tag"]
+    assert payload["total_estimated_cost"] is None
+    assert len(payload) == 17
+
+
+def test_create_span_batch_message__items_of_slotted_messages__payload_contains_items():
+    span_message = create_span_message("span-id")
+    batch_message = messages.CreateSpansBatchMessage(batch=[span_message])
+
+    assert batch_message.as_payload_dict() == {"batch": [span_message]}
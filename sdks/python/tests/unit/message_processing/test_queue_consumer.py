@@ -0,0 +1,43 @@
+import queue
+import threading
+import time
+
+import mock
+
+from opik.message_processing import queue_consumer
+
+
+def test_queue_consumer__message_put_into_idle_queue__message_processed_without_polling_delay():
+    message_queue = queue.Queue()
+    processed = threading.Event()
+    message_processor = mock.Mock()
+    message_processor.process.side_effect = lambda _: processed.set()
+
+    tested = queue_consumer.QueueConsumer(
+        message_queue=message_queue, message_processor=message_processor
+    )
+    tested.start()
+    try:
+        time.sleep(0.3)  # let consumer become idle
+
+        message_queue.put("some-message")
+        assert processed.wait(timeout=0.05)
+        message_processor.process.assert_called_once_with("some-message")
+    finally:
+        tested.close()
+        message_queue.put(None)
+        tested.join(timeout=1)
+
+
+def test_queue_consumer__closed_and_woken_up_with_sentinel__thread_stops_immediately():
+    message_queue = queue.Queue()
+    tested = queue_consumer.QueueConsumer(
+        message_queue=message_queue, message_processor=mock.Mock()
+    )
+    tested.start()
+
+    tested.close()
+    message_queue.put(None)
+    tested.join(timeout=0.05)
+
+    assert not tested.is_alive()
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from opik.message_processing import request_body
+
+from ...testlib import create_span_message
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"a": [1, 2.5, None, True, "non-ascii ü, 😀"], "b": {"c": "d"}},
+        {1: "int key"},
+        {"very-big-int": 2**100},
+        [],
+    ],
+)
+def test_encode_json__result_is_json_of_the_object(obj):
+    expected = json.loads(json.dumps(obj))
+
+    assert json.loads(request_body.encode_json(obj)) == expected
+
+
+def test_encode_create_batch_bodies__item_bigger_than_limit__payload_truncated():
+    span_message = create_span_message(
+        "span-id", input={"document": "a" * 3_000_000}, output={"output": "small"}
+    )
+
+    bodies = request_body.encode_create_batch_bodies(
+        [span_message], field_name="spans", max_payload_size_MB=1
+    )
+
+    assert len(bodies) == 1
+    assert len(bodies[0]) < 1024 * 1024
+    span = json.loads(bodies[0])["spans"][0]
+    assert span["input"]["document"].endswith("characters]")
+    assert span["output"] == {"output": "small"}
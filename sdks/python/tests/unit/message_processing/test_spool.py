@@ -0,0 +1,185 @@
+import datetime
+
+import mock
+
+from opik.message_processing import messages, spool, streamer_constructors
+
+
+def _create_trace_message(trace_id):
+    return messages.CreateTraceMessage(
+        trace_id=trace_id,
+        project_name="some-project",
+        name="some-name",
+        start_time=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc),
+        end_time=None,
+        input={"input": "some-input"},
+        output=None,
+        metadata=None,
+        tags=None,
+        error_info=None,
+        thread_id=None,
+    )
+
+
+def test_spool__messages_not_acknowledged__replayed_by_next_spool(tmp_path):
+    tested = spool.MessageSpool(directory=str(tmp_path))
+    trace_messages = [_create_trace_message(f"trace-{i}") for i in range(3)]
+
+    for trace_message in trace_messages:
+        tested.append(trace_message)
+    tested.acknowledge(trace_messages[1])
+    tested.close()
+
+    next_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert next_spool.pop_messages_to_replay() == [
+        trace_messages[0],
+        trace_messages[2],
+    ]
+
+
+def test_spool__all_messages_acknowledged__nothing_to_replay__segments_removed(
+    tmp_path,
+):
+    tested = spool.MessageSpool(directory=str(tmp_path), max_segment_size_bytes=300)
+    trace_messages = [_create_trace_message(f"trace-{i}") for i in range(10)]
+
+    for trace_message in trace_messages:
+        tested.append(trace_message)
+    assert len(list(tmp_path.iterdir())) > 1
+
+    for trace_message in trace_messages:
+        tested.acknowledge(trace_message)
+    tested.close()
+
+    assert list(tmp_path.iterdir()) == []
+    assert spool.MessageSpool(directory=str(tmp_path)).pop_messages_to_replay() == []
+
+
+def test_spool__crash_after_middle_segment_removed__acknowledged_messages_not_replayed(
+    tmp_path,
+):
+    tested = spool.MessageSpool(directory=str(tmp_path))
+    message_x, message_y, message_z = [
+        _create_trace_message(f"trace-{name}") for name in "xyz"
+    ]
+
+    # segment 0: x, z
+    tested.append(message_x)
+    tested.append(message_z)
+    # segment 1: y and the acknowledgement of x
+    tested._max_segment_size_bytes = 0
+    tested.append(message_y)
+    tested._max_segment_size_bytes = spool.DEFAULT_MAX_SEGMENT_SIZE_BYTES
+    tested.acknowledge(message_x)
+    # segment 2: the acknowledgement of y, segment 1 has no unacknowledged messages
+    # now, but it is kept because it acknowledges x from segment 0 which still exists
+    tested._max_segment_size_bytes = 0
+    tested.acknowledge(message_y)
+    # the process crashes, the spool is not closed
+
+    next_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert next_spool.pop_messages_to_replay() == [message_z]
+
+
+def test_spool__segment_with_first_sequence_number_removed__runs_not_mixed(
+    tmp_path,
+):
+    first_spool = spool.MessageSpool(directory=str(tmp_path))
+    first_message = _create_trace_message("first-0")
+    first_spool.append(first_message)  # never acknowledged
+
+    second_spool = spool.MessageSpool(directory=str(tmp_path), max_segment_size_bytes=1)
+    second_messages = [_create_trace_message(f"second-{i}") for i in range(2)]
+    for message in second_messages:
+        second_spool.append(message)
+    # the segment with the sequence number 0 of the second run is removed,
+    # its acknowledgement must not be applied to the message of the first run
+    second_spool.acknowledge(second_messages[0])
+
+    third_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert third_spool.pop_messages_to_replay() == [first_message, second_messages[1]]
+
+
+def test_spool__batch_message_acknowledged__messages_it_was_created_from_are_acknowledged(
+    tmp_path,
+):
+    tested = spool.MessageSpool(directory=str(tmp_path))
+    trace_messages = [_create_trace_message(f"trace-{i}") for i in range(3)]
+
+    for trace_message in trace_messages:
+        tested.append(trace_message)
+    tested.acknowledge(messages.CreateTraceBatchMessage(batch=trace_messages[:2]))
+    tested.close()
+
+    next_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert next_spool.pop_messages_to_replay() == [trace_messages[2]]
+
+
+def test_spool__replayed_messages_not_acknowledged_again__replayed_once_more(
+    tmp_path,
+):
+    first_spool = spool.MessageSpool(directory=str(tmp_path))
+    first_spool.append(_create_trace_message("trace-1"))
+    first_spool.close()
+
+    second_spool = spool.MessageSpool(directory=str(tmp_path))
+    for message in second_spool.pop_messages_to_replay():
+        second_spool.append(message)
+    second_spool.remove_replayed_segments()
+    second_spool.append(_create_trace_message("trace-2"))
+    second_spool.close()
+
+    third_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert [message.trace_id for message in third_spool.pop_messages_to_replay()] == [
+        "trace-1",
+        "trace-2",
+    ]
+
+
+def test_streamer__spool_enabled__unsent_messages_are_processed_after_restart(
+    tmp_path,
+):
+    trace_message = _create_trace_message("trace-1")
+
+    first_streamer = streamer_constructors.construct_streamer(
+        message_processor=mock.Mock(),  # doesn't acknowledge anything
+        n_consumers=1,
+        use_batching=False,
+        spool=spool.MessageSpool(directory=str(tmp_path)),
+    )
+    first_streamer.put(trace_message)
+    first_streamer.close(timeout=1)
+
+    message_processor = mock.Mock()
+    second_streamer = streamer_constructors.construct_streamer(
+        message_processor=message_processor,
+        n_consumers=1,
+        use_batching=False,
+        spool=spool.MessageSpool(directory=str(tmp_path)),
+    )
+    second_streamer.flush(timeout=1)
+    second_streamer.close(timeout=1)
+
+    message_processor.process.assert_called_once_with(trace_message)
+
+
+def test_spool__message_linked_to_another_one__acknowledged_together_with_it(
+    tmp_path,
+):
+    tested = spool.MessageSpool(directory=str(tmp_path))
+    trace_messages = [_create_trace_message(f"trace-{i}") for i in range(3)]
+
+    for trace_message in trace_messages:
+        tested.append(trace_message)
+    tested.link(absorbed=trace_messages[2], into=trace_messages[0])
+    tested.acknowledge(trace_messages[0])
+    tested.close()
+
+    next_spool = spool.MessageSpool(directory=str(tmp_path))
+
+    assert next_spool.pop_messages_to_replay() == [trace_messages[1]]
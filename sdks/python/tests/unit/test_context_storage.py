@@ -0,0 +1,82 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from opik import context_storage
+from opik.api_objects import span
+
+
+@pytest.fixture(autouse=True)
+def clear_context():
+    context_storage.clear_all()
+    yield
+    context_storage.clear_all()
+
+
+def _span_data(name: str) -> span.SpanData:
+    return span.SpanData(trace_id="trace-id", name=name)
+
+
+def test_span_data_stack__push_and_pop__last_in_first_out():
+    first, second = _span_data("first"), _span_data("second")
+
+    context_storage.add_span_data(first)
+    context_storage.add_span_data(second)
+
+    assert context_storage.top_span_data() is second
+    assert context_storage.pop_span_data() is second
+    assert context_storage.top_span_data() is first
+    assert context_storage.pop_span_data() is first
+    assert context_storage.span_data_stack_empty()
+    assert context_storage.top_span_data() is None
+    assert context_storage.pop_span_data() is None
+
+
+def test_span_data_stack__changed_in_copied_context__original_context_not_affected():
+    parent = _span_data("parent")
+    context_storage.add_span_data(parent)
+
+    def push_and_pop_in_copy():
+        context_storage.add_span_data(_span_data("child"))
+        context_storage.pop_span_data()
+        context_storage.pop_span_data()
+        context_storage.add_span_data(_span_data("other"))
+
+    contextvars.copy_context().run(push_and_pop_in_copy)
+
+    assert context_storage.top_span_data() is parent
+    assert context_storage.pop_span_data() is parent
+    assert context_storage.span_data_stack_empty()
+
+
+def test_span_data_stack__concurrent_asyncio_tasks__each_task_sees_its_own_stack():
+    parent = _span_data("parent")
+
+    async def task(name):
+        task_span_data = _span_data(name)
+        context_storage.add_span_data(task_span_data)
+        await asyncio.sleep(0)
+        top = context_storage.top_span_data()
+        context_storage.pop_span_data()
+        return top is task_span_data and context_storage.top_span_data() is parent
+
+    async def main():
+        context_storage.add_span_data(parent)
+        return await asyncio.gather(task("a"), task("b"))
+
+    assert asyncio.run(main()) == [True, True]
+    assert context_storage.span_data_stack_empty()
+
+
+def test_span_data_stack__deep_stack__pushed_and_popped():
+    spans_data = [_span_data(str(i)) for i in range(10000)]
+
+    for span_data in spans_data:
+        context_storage.add_span_data(span_data)
+
+    assert context_storage.top_span_data() is spans_data[-1]
+    assert [
+        context_storage.pop_span_data() for _ in range(len(spans_data))
+    ] == spans_data[::-1]
+    assert context_storage.span_data_stack_empty()
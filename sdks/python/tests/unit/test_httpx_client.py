@@ -0,0 +1,52 @@
+import gzip
+
+import httpx
+import pytest
+
+from opik import httpx_client
+
+
+def _create_client(compression, threshold_bytes, requests):
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    transport = httpx_client.CompressingTransport(
+        transport=httpx.MockTransport(handle_request),
+        compression=compression,
+        threshold_bytes=threshold_bytes,
+    )
+    return httpx.Client(transport=transport, base_url="http://localhost/api")
+
+
+def test_compressing_transport__bulk_endpoint_body_above_threshold__body_compressed():
+    requests = []
+    client = _create_client("gzip", threshold_bytes=100, requests=requests)
+    body = b'{"spans":[' + b",".join([b'{"name":"some-span"}'] * 100) + b"]}"
+
+    client.post("/v1/private/spans/batch", content=body)
+
+    assert requests[0].headers["Content-Encoding"] == "gzip"
+    assert int(requests[0].headers["Content-Length"]) == len(requests[0].content)
+    assert len(requests[0].content) < len(body)
+    assert gzip.decompress(requests[0].content) == body
+
+
+@pytest.mark.parametrize(
+    "method,path,body",
+    [
+        ("POST", "/v1/private/spans/batch", b"small"),
+        ("POST", "/v1/private/spans", b"x" * 1000),
+        ("GET", "/v1/private/spans/batch", b""),
+    ],
+)
+def test_compressing_transport__body_below_threshold_or_not_bulk_endpoint__body_not_compressed(
+    method, path, body
+):
+    requests = []
+    client = _create_client("gzip", threshold_bytes=100, requests=requests)
+
+    client.request(method, path, content=body)
+
+    assert "Content-Encoding" not in requests[0].headers
+    assert requests[0].content == body
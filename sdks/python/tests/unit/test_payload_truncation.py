@@ -0,0 +1,98 @@
+import base64
+import dataclasses
+
+import pydantic
+
+from opik import payload_truncation
+
+
+def test_truncate__value_fits__same_object_returned():
+    value = {"messages": [{"role": "user", "content": "hello"}], "n": 1}
+
+    assert payload_truncation.truncate(value, max_size_bytes=1000) is value
+
+
+def test_truncate__long_string__string_cut_with_marker():
+    truncated = payload_truncation.truncate({"document": "a" * 10000}, 100)
+
+    assert truncated["document"].startswith("a" * 50)
+    assert truncated["document"].endswith("characters]")
+    assert len(truncated["document"]) < 150
+
+
+def test_truncate__long_list__remaining_items_replaced_with_marker():
+    truncated = payload_truncation.truncate(list(range(1000)), max_size_bytes=100)
+
+    assert truncated[:5] == [0, 1, 2, 3, 4]
+    assert truncated[-1] == f"[{1000 - len(truncated) + 1} more items truncated]"
+    assert len(truncated) < 20
+
+
+def test_truncate__dict_with_many_keys__remaining_keys_replaced_with_marker():
+    value = {f"key-{i}": i for i in range(1000)}
+
+    truncated = payload_truncation.truncate(value, max_size_bytes=100)
+
+    kept_keys = len(truncated) - 1
+    assert truncated[payload_truncation.TRUNCATED_KEYS_MARKER] == (
+        f"{1000 - kept_keys} more keys truncated"
+    )
+    assert list(truncated)[:kept_keys] == list(value)[:kept_keys]
+
+
+def test_truncate__only_the_path_to_truncated_value_copied():
+    small = {"a": 1}
+    value = {"small": small, "big": ["x" * 10000]}
+
+    truncated = payload_truncation.truncate(value, max_size_bytes=100)
+
+    assert truncated is not value
+    assert truncated["small"] is small
+    assert truncated["big"][0].endswith("characters]")
+    assert value["big"][0] == "x" * 10000
+
+
+def test_truncate__models_and_dataclasses__walked_by_fields():
+    class Model(pydantic.BaseModel):
+        text: str
+
+    @dataclasses.dataclass
+    class Data:
+        text: str
+
+    small_model = Model(text="small")
+    truncated = payload_truncation.truncate(
+        [small_model, Model(text="b" * 1000), Data(text="c" * 1000)], 200
+    )
+
+    assert truncated[0] is small_model
+    assert truncated[1]["text"].endswith("characters]")
+    assert truncated[2] == "[1 more items truncated]"
+
+
+def test_truncate__generator__not_consumed():
+    generator = (i for i in range(10))
+
+    assert payload_truncation.truncate({"g": generator}, 10)["g"] is generator
+    assert list(generator) == list(range(10))
+
+
+def test_truncate_fields__limit_not_set__nothing_truncated():
+    fields = {"input": {"text": "a" * 1000}}
+
+    payload_truncation.truncate_fields(fields, ["input"], max_size_bytes=None)
+
+    assert fields == {"input": {"text": "a" * 1000}}
+
+
+def test_truncate__attachment_min_size_set__base64_blobs_kept_whole():
+    image = "data:image/png;base64," + base64.b64encode(b"x" * 3000).decode()
+
+    truncated = payload_truncation.truncate(
+        {"image": image, "text": "Some text. " * 100},
+        200,
+        attachment_min_size_bytes=1000,
+    )
+
+    assert truncated["image"] is image
+    assert truncated["text"].endswith("characters]")
@@ -0,0 +1,102 @@
+import http.server
+import logging
+import os
+import threading
+import time
+
+import click
+
+# all the logged data has to be delivered for a fair comparison, and nothing should be reported to Sentry
+os.environ["OPIK_MESSAGE_QUEUE_BACKPRESSURE_POLICY"] = "block"
+os.environ["OPIK_SENTRY_ENABLE"] = "false"
+
+import opik  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(asctime)s]: %(message)s")
+
+LOGGER = logging.getLogger(__name__)
+
+
+class StubOpikRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Accepts every request and replies with an empty response, counting the requests by endpoint."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self) -> None:
+        content_length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(content_length)
+
+        path = self.path.split("?")[0]
+        endpoint = f"{self.command} {path.rsplit('/', 1)[0] if self.command == 'PATCH' else path}"
+        with self.server.lock:
+            self.server.requests[endpoint] = self.server.requests.get(endpoint, 0) + 1
+
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_POST = _reply
+    do_PATCH = _reply
+    do_PUT = _reply
+    do_GET = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubOpikRequestHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def log_spans(client: opik.Opik, num_spans: int, spans_per_trace: int) -> None:
+    for _ in range(num_spans // spans_per_trace):
+        trace = client.trace(name="trace", input={"input": "some input"})
+        for _ in range(spans_per_trace):
+            # agent frameworks usually create a span first and patch it once it's finished
+            span = trace.span(name="span", input={"input": "some input"})
+            span.end(output={"output": "some output"})
+        trace.end(output={"output": "some output"})
+
+
+def measure(num_spans: int, spans_per_trace: int, batching: bool) -> None:
+    server = start_stub_server()
+    client = opik.Opik(
+        host=f"http://127.0.0.1:{server.server_address[1]}/api",
+        project_name="performance_test",
+        batching=batching,
+        _show_misconfiguration_message=False,
+    )
+
+    start_time = time.perf_counter()
+    log_spans(client, num_spans, spans_per_trace)
+    logging_time = time.perf_counter() - start_time
+    client.flush(timeout=600)
+    total_time = time.perf_counter() - start_time
+    client.end()
+    server.shutdown()
+
+    total_requests = sum(server.requests.values())
+    LOGGER.info(
+        f"batching={str(batching):<5} | logging {logging_time:6.2f} s | logged and sent {total_time:6.2f} s "
+        f"| {num_spans / total_time:9.0f} spans/s | {total_requests:>6} requests"
+    )
+    for endpoint, count in sorted(server.requests.items()):
+        LOGGER.info(f"    {endpoint:<35} {count:>6}")
+
+
+@click.command()
+@click.option('--num-spans', default=100_000, help='Number of spans to log')
+@click.option('--spans-per-trace', default=10, help='Number of spans in every trace')
+def main(num_spans, spans_per_trace):
+    LOGGER.info("\n---------------- Batching throughput results ----------------")
+    measure(num_spans, spans_per_trace, batching=True)
+    measure(num_spans, spans_per_trace, batching=False)
+
+
+if __name__ == "__main__":
+    main()
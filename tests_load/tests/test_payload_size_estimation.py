@@ -0,0 +1,73 @@
+import datetime
+import json
+import logging
+import time
+import uuid
+from typing import Callable, List
+
+import click
+from opik import jsonable_encoder
+from opik.message_processing.batching import sequence_splitter
+from opik.rest_api.types import span_write
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(asctime)s]: %(message)s")
+
+LOGGER = logging.getLogger(__name__)
+
+
+def legacy_payload_size_MB(item) -> float:
+    # the way the splitter measured the items before: encoding them once again only to measure
+    encoded_for_json = jsonable_encoder.jsonable_encoder(item)
+    json_str = json.dumps(encoded_for_json)
+    return len(json_str.encode("utf-8")) / (1024 * 1024)
+
+
+def create_spans(batch_size: int, input_size_kb: int) -> List[span_write.SpanWrite]:
+    text = "Some long LLM prompt with \"quotes\" and new lines.\n" * (input_size_kb * 1024 // 50)
+    return [
+        span_write.SpanWrite(
+            id=str(uuid.uuid4()),
+            trace_id=str(uuid.uuid4()),
+            name="llm-call",
+            type="llm",
+            start_time=datetime.datetime.now(datetime.timezone.utc),
+            end_time=datetime.datetime.now(datetime.timezone.utc),
+            input={"messages": [{"role": "system", "content": text}, {"role": "user", "content": text}]},
+            output={"choices": [{"message": {"role": "assistant", "content": text}}]},
+            metadata={"model": "some-model", "temperature": 0.7, "tags": ["a", "b", "c"]},
+            usage={"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+        )
+        for _ in range(batch_size)
+    ]
+
+
+def measure_cpu_time(function: Callable[[], None], repetitions: int) -> float:
+    start = time.process_time()
+    for _ in range(repetitions):
+        function()
+    return (time.process_time() - start) / repetitions
+
+
+@click.command()
+@click.option('--batch-size', default=1000, help='Number of spans in the batch')
+@click.option('--input-size-kb', default=8, help='Approximate size of every text field of the span in KB')
+@click.option('--repetitions', default=5, help='Number of times the batch is split')
+def main(batch_size, input_size_kb, repetitions):
+    spans = create_spans(batch_size, input_size_kb)
+
+    with_legacy_measurement = measure_cpu_time(
+        lambda: [legacy_payload_size_MB(span) for span in spans], repetitions
+    )
+    with_estimation = measure_cpu_time(
+        lambda: sequence_splitter.split_into_batches(spans, max_payload_size_MB=50), repetitions
+    )
+
+    LOGGER.info("\n---------------- Payload size estimation results ----------------")
+    LOGGER.info(f"{batch_size} spans, ~{3 * input_size_kb} KB of text each")
+    LOGGER.info(f"encoding and dumping every span: {with_legacy_measurement * 1000:8.1f} ms CPU per batch")
+    LOGGER.info(f"size estimation:                 {with_estimation * 1000:8.1f} ms CPU per batch")
+    LOGGER.info(f"CPU saved per batch:             {(with_legacy_measurement - with_estimation) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import gzip
+import http.server
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import click
+
+# all the logged data has to be delivered for a fair comparison, and nothing should be reported to Sentry
+os.environ["OPIK_MESSAGE_QUEUE_BACKPRESSURE_POLICY"] = "block"
+os.environ["OPIK_SENTRY_ENABLE"] = "false"
+
+import opik  # noqa: E402
+from opik import httpx_client  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(asctime)s]: %(message)s")
+
+LOGGER = logging.getLogger(__name__)
+
+PROMPT = (
+    "You are a helpful assistant. Answer the question using only the context below.\n"
+    "Context: Opik is an open-source platform for evaluating, testing and monitoring LLM applications.\n"
+)
+
+
+class DecodingOpikRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Accepts every request, decodes the compressed bodies and counts the bytes received and decoded."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self) -> None:
+        content_length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(content_length)
+
+        content_encoding = self.headers.get("Content-Encoding")
+        if content_encoding == "gzip":
+            decoded_body = gzip.decompress(body)
+        else:
+            decoded_body = body
+
+        if len(decoded_body) > 0:
+            json.loads(decoded_body)
+
+        with self.server.lock:
+            self.server.bytes_received += len(body)
+            self.server.bytes_decoded += len(decoded_body)
+
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_POST = _reply
+    do_PATCH = _reply
+    do_PUT = _reply
+    do_GET = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), DecodingOpikRequestHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.bytes_received = 0
+    server.bytes_decoded = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_body(num_spans: int) -> bytes:
+    spans = [
+        {
+            "id": str(uuid.uuid4()),
+            "trace_id": str(uuid.uuid4()),
+            "name": "llm-call",
+            "type": "llm",
+            "input": {"messages": [{"role": "system", "content": PROMPT}, {"role": "user", "content": f"Question {i}?"}]},
+            "output": {"choices": [{"message": {"role": "assistant", "content": PROMPT * 3}}]},
+        }
+        for i in range(num_spans)
+    ]
+    return json.dumps({"spans": spans}).encode("utf-8")
+
+
+def measure_compression_cpu(compression: str, body: bytes, repetitions: int = 5) -> None:
+    start = time.process_time()
+    for _ in range(repetitions):
+        compressed_body = httpx_client.compress(body, compression)
+    cpu_time = (time.process_time() - start) / repetitions
+
+    LOGGER.info(
+        f"{compression:<5} | {len(body) / 1024:8.0f} KB -> {len(compressed_body) / 1024:6.0f} KB "
+        f"(x{len(body) / len(compressed_body):4.1f}) | {cpu_time * 1000:7.1f} ms CPU per batch"
+    )
+
+
+def measure_ingestion(compression, num_spans: int) -> None:
+    server = start_stub_server()
+    if compression is not None:
+        os.environ["OPIK_REQUEST_COMPRESSION"] = compression
+    client = opik.Opik(
+        host=f"http://127.0.0.1:{server.server_address[1]}/api",
+        project_name="performance_test",
+        batching=True,
+        _show_misconfiguration_message=False,
+    )
+    os.environ.pop("OPIK_REQUEST_COMPRESSION", None)
+
+    start_time = time.perf_counter()
+    for i in range(num_spans // 10):
+        trace = client.trace(name="trace", input={"input": PROMPT})
+        for _ in range(10):
+            span = trace.span(name="span", type="llm", input={"prompt": PROMPT, "question": f"Question {i}?"})
+            span.end(output={"output": PROMPT * 3})
+        trace.end(output={"output": PROMPT})
+    client.flush(timeout=600)
+    total_time = time.perf_counter() - start_time
+    client.end()
+    server.shutdown()
+
+    LOGGER.info(
+        f"{str(compression):<5} | {server.bytes_received / 1024 / 1024:8.2f} MB on the wire "
+        f"| {server.bytes_decoded / 1024 / 1024:8.2f} MB of JSON | logged and sent {total_time:6.2f} s"
+    )
+
+
+@click.command()
+@click.option('--num-spans', default=20_000, help='Number of spans to log with every compression setting')
+@click.option('--batch-size', default=1000, help='Number of spans in the batch used to measure the compression CPU cost')
+def main(num_spans, batch_size):
+    compressions = ["gzip"]
+
+    LOGGER.info("\n---------------- Request compression CPU cost ----------------")
+    body = create_body(batch_size)
+    for compression in compressions:
+        measure_compression_cpu(compression, body)
+
+    LOGGER.info("\n---------------- Bytes on the wire ----------------")
+    for compression in [None] + compressions:
+        measure_ingestion(compression, num_spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import logging
+import statistics
+import threading
+import time
+from typing import List
+
+import click
+from opik.message_processing import message_processors, streamer_constructors
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(asctime)s]: %(message)s")
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LatencyRecordingMessageProcessor(message_processors.BaseMessageProcessor):
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def process(self, message: float) -> None:
+        latency = time.perf_counter() - message
+        with self._lock:
+            self.latencies.append(latency)
+
+
+def measure(n_consumers: int, num_messages: int, message_interval: float, idle_time: float):
+    message_processor = LatencyRecordingMessageProcessor()
+    streamer = streamer_constructors.construct_streamer(
+        message_processor=message_processor,
+        n_consumers=n_consumers,
+        use_batching=False,
+    )
+
+    # Idle CPU: nothing is enqueued, consumers should not wake up at all
+    time.sleep(0.5)
+    cpu_start = time.process_time()
+    time.sleep(idle_time)
+    idle_cpu_percent = (time.process_time() - cpu_start) / idle_time * 100
+
+    # Enqueue-to-send latency: messages arrive one by one while consumers are idle
+    for _ in range(num_messages):
+        streamer.put(time.perf_counter())
+        time.sleep(message_interval)
+
+    streamer.close(timeout=10)
+
+    latencies_ms = sorted(latency * 1000 for latency in message_processor.latencies)
+    p50 = statistics.median(latencies_ms)
+    p99 = latencies_ms[int(len(latencies_ms) * 0.99) - 1]
+
+    LOGGER.info(
+        f"consumers={n_consumers:>2} | idle CPU {idle_cpu_percent:6.2f}% "
+        f"| latency p50 {p50:7.3f} ms, p99 {p99:7.3f} ms, max {latencies_ms[-1]:7.3f} ms"
+    )
+
+
+@click.command()
+@click.option('--num-messages', default=50, help='Number of messages to enqueue for every consumers configuration')
+@click.option('--message-interval', default=0.15, help='Pause between enqueued messages in seconds')
+@click.option('--idle-time', default=3.0, help='Time in seconds to measure idle CPU usage')
+def main(num_messages, message_interval, idle_time):
+    LOGGER.info("\n---------------- Streamer latency results ----------------")
+    for n_consumers in [1, 2, 4, 8, 16]:
+        measure(n_consumers, num_messages, message_interval, idle_time)
+
+
+if __name__ == "__main__":
+    main()